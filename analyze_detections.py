@@ -4,10 +4,14 @@ import argparse
 import re
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
 
-import matplotlib.pyplot as plt
-import pandas as pd
+from yolo_runner.log_scan import resolve_logs, scan_logs
+from yolo_runner.raw_cache import load_raw_detections, read_raw_meta, refilter
+from yolo_runner.summary import FrameCoverage
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 def parse_args() -> argparse.Namespace:
@@ -15,9 +19,12 @@ def parse_args() -> argparse.Namespace:
         description="Inspect Parquet detection logs and report fish coverage."
     )
     parser.add_argument(
-        "parquet",
-        type=Path,
-        help="Path to the Parquet file produced by run_video.py --log-parquet.",
+        "logs",
+        nargs="+",
+        help=(
+            "Parquet logs produced by run_video.py --log-parquet: files, directories "
+            "or glob patterns (e.g. 'dataset/outputs/logs/detections_202501*.parquet')."
+        ),
     )
     parser.add_argument(
         "--min-fish",
@@ -32,46 +39,178 @@ def parse_args() -> argparse.Namespace:
         default=None,
         help="Save a bar chart; optionally pass a path or directory for the PNG.",
     )
+    parser.add_argument(
+        "--conf",
+        type=float,
+        default=0.25,
+        help="Confidence threshold applied to raw detection caches (run_video.py --raw-cache).",
+    )
+    parser.add_argument(
+        "--iou",
+        type=float,
+        default=0.7,
+        help="NMS IoU threshold applied to raw detection caches.",
+    )
+    parser.add_argument(
+        "--classes",
+        type=int,
+        nargs="*",
+        default=None,
+        help="Keep only these class ids when re-filtering a raw detection cache.",
+    )
+    parser.add_argument(
+        "--conf-grid",
+        type=float,
+        nargs="+",
+        default=None,
+        help="Report coverage for each of these confidence thresholds (raw caches only).",
+    )
+    parser.add_argument(
+        "--iou-grid",
+        type=float,
+        nargs="+",
+        default=None,
+        help="Report coverage for each of these NMS IoU thresholds (raw caches only).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Threads scanning logs concurrently (defaults to the CPU count).",
+    )
+    parser.add_argument(
+        "--rescan",
+        action="store_true",
+        help="Ignore <log>.summary.json sidecars and rescan every log (sidecars are rewritten).",
+    )
     return parser.parse_args()
 
 
+def frame_counts(df: pd.DataFrame, per_box: bool = False) -> tuple[pd.Series, str]:
+    """Per-frame fish counts and what was counted.
+
+    Tracked logs count unique track ids and untracked logs unique classes;
+    ``per_box`` counts boxes instead, which is what re-filtered raw caches
+    need since they are never tracked.
+    """
+    if per_box:
+        return df.groupby("frame").size(), "detections"
+    if df["track_id"].notna().any():
+        return df.groupby("frame")["track_id"].nunique(), "tracks"
+    return df.groupby("frame")["class_id"].nunique(), "classes"
+
+
+def report_grid(raw: pd.DataFrame, fps: float, args: argparse.Namespace) -> None:
+    """Print coverage for every confidence/IoU combination without rerunning the model."""
+    confs = args.conf_grid or [args.conf]
+    ious = args.iou_grid or [args.iou]
+    print(f"{'conf':>6} {'iou':>6} {'frames':>8} {'complete':>9} {'coverage':>9}")
+    for conf in confs:
+        for iou in ious:
+            df = refilter(raw, conf=conf, iou=iou, classes=args.classes, fps=fps)
+            counts, _ = frame_counts(df, per_box=True)
+            total_frames = counts.index.size
+            complete_frames = int((counts >= args.min_fish).sum())
+            coverage = (complete_frames / total_frames) * 100 if total_frames else 0.0
+            print(
+                f"{conf:>6.2f} {iou:>6.2f} {total_frames:>8} "
+                f"{complete_frames:>9} {coverage:>8.2f}%"
+            )
+
+
+def raw_coverage(path: Path, args: argparse.Namespace) -> FrameCoverage:
+    """Re-filter a raw detection cache in memory and count boxes per frame."""
+    raw, meta = load_raw_detections(path)
+    df = refilter(raw, conf=args.conf, iou=args.iou, classes=args.classes, fps=meta.fps)
+    if df.empty:
+        return FrameCoverage(path=path, counted="detections")
+    counts, counted = frame_counts(df, per_box=True)
+    return FrameCoverage.from_counts(path, counts, counted, rows=len(df))
+
+
+def report_files(coverages: list[FrameCoverage], min_fish: int) -> None:
+    print(f"{'log':<48} {'rows':>10} {'frames':>8} {'complete':>9} {'coverage':>9}")
+    for coverage in coverages:
+        print(
+            f"{coverage.path.name:<48} {coverage.rows:>10} {coverage.frames:>8} "
+            f"{coverage.complete(min_fish):>9} {coverage.coverage(min_fish):>8.2f}%"
+        )
+    print()
+
+
 def main() -> None:
     args = parse_args()
-    if not args.parquet.exists():
-        raise FileNotFoundError(f"Parquet file not found: {args.parquet}")
+    paths = resolve_logs(args.logs)
 
-    df = pd.read_parquet(args.parquet)
-    if df.empty:
-        print("No detections found in the Parquet file.")
+    if args.conf_grid or args.iou_grid:
+        if len(paths) != 1 or read_raw_meta(paths[0]) is None:
+            raise ValueError("--conf-grid/--iou-grid need a single raw detection cache.")
+        raw, meta = load_raw_detections(paths[0])
+        report_grid(raw, meta.fps, args)
         return
 
-    has_tracks = df["track_id"].notna().any()
-    column = "track_id" if has_tracks else "class_id"
-    counts = df.groupby("frame")[column].nunique()
-    total_frames = counts.index.size
-    complete_frames = counts[counts >= args.min_fish].index.size
-    coverage = (complete_frames / total_frames) * 100 if total_frames else 0.0
+    # raw caches are recognised inside the scan workers, not in a serial pre-pass
+    coverages = scan_logs(
+        paths, args.workers, rescan=args.rescan, raw=lambda path: raw_coverage(path, args)
+    )
+    if len(coverages) > 1:
+        report_files(coverages, args.min_fish)
+    # tracks, classes and raw detections are different units; never sum them together
+    units: Dict[str, List[FrameCoverage]] = {}
+    for coverage in coverages:
+        units.setdefault(coverage.counted, []).append(coverage)
+    if len(units) > 1:
+        print(
+            "Logs count different units ("
+            + ", ".join(f"{unit}: {len(group)}" for unit, group in units.items())
+            + "); reporting each separately."
+        )
+    for unit, group in units.items():
+        suffix = ""
+        if len(units) > 1:
+            print(f"\n== Logs counting {unit} ==")
+            suffix = f"_{unit}"
+        report_combined(FrameCoverage.combine(group), len(group), args, paths[0], suffix)
+
+
+def report_combined(
+    combined: FrameCoverage, logs: int, args: argparse.Namespace, first_path: Path, suffix: str
+) -> None:
+    if not combined.frames:
+        print("No detections found in the Parquet logs.")
+        return
 
+    total_frames = combined.frames
+    complete_frames = combined.complete(args.min_fish)
+    coverage = combined.coverage(args.min_fish)
+    if logs > 1:
+        print(f"Logs analyzed: {logs}")
     print(f"Frames analyzed: {total_frames}")
     print(
         f"Frames with ≥{args.min_fish} unique "
-        f"{'tracks' if has_tracks else 'classes'}: {complete_frames} ({coverage:.2f}%)"
+        f"{combined.counted}: {complete_frames} ({coverage:.2f}%)"
     )
+    if combined.tracks:
+        print(f"Unique tracks: {combined.tracks}")
 
-    freq = counts.value_counts().sort_index()
+    freq = dict(sorted(combined.histogram.items()))
     print("\nFrames per unique-fish count:")
     for num, frames in freq.items():
         pct = (frames / total_frames) * 100 if total_frames else 0.0
         print(f"{int(num)} fish: {frames} frames ({pct:.2f}%)")
 
     if args.plot is not None:
+        import pandas as pd
+
         plot_arg = Path(args.plot) if args.plot else None
-        output = resolve_plot_path(plot_arg, args.parquet)
-        plot_fish_frequency(freq, output)
+        output = resolve_plot_path(plot_arg, first_path, suffix)
+        plot_fish_frequency(pd.Series(freq), output)
 
 
 def plot_fish_frequency(freq: pd.Series, output: Path) -> None:
     """Save a bar chart showing how many frames had 1,2,3... fish detected."""
+    import matplotlib.pyplot as plt
+
     output.parent.mkdir(parents=True, exist_ok=True)
     ax = freq.plot(kind="bar", color="#1f77b4")
     ax.set_xlabel("Unique fish per frame")
@@ -86,18 +225,22 @@ def plot_fish_frequency(freq: pd.Series, output: Path) -> None:
 TIMESTAMP_RE = re.compile(r"(20\d{2}[01]\d[0-3]\d_[0-2]\d[0-5]\d[0-5]\d)")
 
 
-def resolve_plot_path(arg: Optional[Path], parquet_path: Path) -> Path:
-    """Return a timestamped plot path, matching the Parquet file if possible."""
+def resolve_plot_path(arg: Optional[Path], parquet_path: Path, suffix: str = "") -> Path:
+    """Return a timestamped plot path, matching the Parquet file if possible.
+
+    ``suffix`` keeps the charts of different count units apart.
+    """
     timestamp = extract_timestamp(parquet_path)
+    name = f"fish_counts_{timestamp}{suffix}.png"
     if arg is None:
         directory = parquet_path.parent
-        return directory / f"fish_counts_{timestamp}.png"
+        return directory / name
     if arg.suffix:
         arg.parent.mkdir(parents=True, exist_ok=True)
-        return arg
+        return arg.with_name(f"{arg.stem}{suffix}{arg.suffix}")
     directory = arg
     directory.mkdir(parents=True, exist_ok=True)
-    return directory / f"fish_counts_{timestamp}.png"
+    return directory / name
 
 
 def extract_timestamp(path: Path) -> str:
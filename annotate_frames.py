@@ -0,0 +1,296 @@
+"""Annotate a batch of selected video frames in one pass.
+
+Replaces the old run_one_frame scripts: the model is loaded once, the video
+is decoded in a single forward pass over the sorted frame list, inference runs
+in batches and the JPEGs are written from a thread pool.
+
+Example usage:
+   python annotate_frames.py --source videos/first_hour.mp4.webm \
+    --weights runs/detect/train/weights/best.pt --timestamps 12.5 90 301.2
+
+   # frames from a log where fewer than 3 fish were seen, boxes taken from the log
+   python annotate_frames.py --source videos/first_hour.mp4.webm \
+    --log dataset/outputs/logs/detections_20250101_120000.parquet \
+    --fewer-than 3 --overlay-log
+"""
+
+from __future__ import annotations
+
+import argparse
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from yolo_runner.args import DEFAULT_SOURCE, DEFAULT_WEIGHTS
+from yolo_runner.overlay import draw_records
+from yolo_runner.records import load_samples
+from yolo_runner.video_utils import iter_frames_at, read_fps
+
+DEFAULT_OUTPUT_DIR = Path("dataset/outputs/frames")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Run YOLO on selected frames of a video (or on a single image) and "
+            "save annotated copies."
+        )
+    )
+    parser.add_argument(
+        "--source",
+        type=Path,
+        default=DEFAULT_SOURCE,
+        help="Path to an image or video.",
+    )
+    parser.add_argument(
+        "--weights",
+        type=Path,
+        default=DEFAULT_WEIGHTS,
+        help="Checkpoint to load (ignored with --overlay-log).",
+    )
+    parser.add_argument(
+        "--frames",
+        type=int,
+        nargs="*",
+        default=[],
+        help="Frame numbers to annotate.",
+    )
+    parser.add_argument(
+        "--timestamps",
+        type=float,
+        nargs="*",
+        default=[],
+        help="Timestamps (seconds) to annotate.",
+    )
+    parser.add_argument(
+        "--log",
+        type=Path,
+        default=None,
+        help="Parquet log from run_video.py --log-parquet (for --fewer-than / --overlay-log).",
+    )
+    parser.add_argument(
+        "--fewer-than",
+        type=int,
+        default=None,
+        help="Also select logged frames with fewer than N unique fish.",
+    )
+    parser.add_argument(
+        "--log-stride",
+        type=int,
+        default=None,
+        help=(
+            "--stride the log was recorded with, so frames without detections count as 0 fish "
+            "(default: the recorded .samples.npz sidecar, else inferred from the logged frames)."
+        ),
+    )
+    parser.add_argument(
+        "--log-start-seconds",
+        type=float,
+        default=None,
+        help="--start-seconds of the logged run (default: the first logged frame).",
+    )
+    parser.add_argument(
+        "--log-end-seconds",
+        type=float,
+        default=None,
+        help="--end-seconds of the logged run (default: the last logged frame).",
+    )
+    parser.add_argument(
+        "--overlay-log",
+        action="store_true",
+        help="Draw the boxes stored in --log instead of running the model.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=8,
+        help="Frames per inference batch.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Threads used to encode and write images.",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=DEFAULT_OUTPUT_DIR,
+        help="Directory for annotated images (or a file path for a single image source).",
+    )
+    return parser.parse_args()
+
+
+def load_log(path: Path):
+    if not path.exists():
+        raise FileNotFoundError(f"Parquet file not found: {path}")
+    import pandas as pd
+
+    return pd.read_parquet(path)
+
+
+def sampled_frames(
+    df,
+    stride: Optional[int],
+    start_frame: Optional[int],
+    end_frame: Optional[int],
+    samples: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Every frame the logged run processed, including those without detections.
+
+    Frames with no detections have no log rows, so unless the run recorded
+    its ``samples`` the sampling grid is rebuilt from ``start/stride/end``;
+    missing values come from the log.
+    """
+    logged = np.unique(df["frame"].to_numpy(dtype=np.int64))
+    if samples is not None and stride is None and start_frame is None and end_frame is None:
+        return np.union1d(samples, logged)
+    if not len(logged):
+        return logged
+    if stride is None:
+        gaps = np.diff(logged)
+        stride = int(np.gcd.reduce(gaps)) if len(gaps) else 1
+    if start_frame is None:
+        start_frame = int(logged[0])
+    if end_frame is None:
+        end_frame = int(logged[-1])
+    return np.arange(start_frame, end_frame + 1, max(1, stride))
+
+
+def frames_with_fewer_fish(df, threshold: int, candidates: np.ndarray) -> List[int]:
+    """Return sampled frames whose unique track (or class) count is below ``threshold``."""
+    column = "track_id" if df["track_id"].notna().any() else "class_id"
+    counts = df.groupby("frame")[column].nunique().reindex(candidates, fill_value=0)
+    return counts[counts < threshold].index.astype(int).tolist()
+
+
+def select_frames(args: argparse.Namespace, log_df) -> List[int]:
+    frames = set(args.frames)
+    if args.timestamps:
+        fps = read_fps(args.source)
+        frames.update(int(round(ts * fps)) for ts in args.timestamps)
+    if args.fewer_than is not None:
+        fps = read_fps(args.source)
+        candidates = sampled_frames(
+            log_df,
+            args.log_stride,
+            None if args.log_start_seconds is None else int(args.log_start_seconds * fps),
+            None if args.log_end_seconds is None else int(args.log_end_seconds * fps),
+            load_samples(args.log, log_df["frame"].unique()),
+        )
+        frames.update(frames_with_fewer_fish(log_df, args.fewer_than, candidates))
+    if not frames and args.overlay_log and log_df is not None:
+        frames.update(log_df["frame"].unique().astype(int).tolist())
+    if not frames:
+        frames.add(0)
+    return sorted(frames)
+
+
+def write_image(path: Path, image) -> Path:
+    if not cv2.imwrite(str(path), image):
+        raise RuntimeError(f"Failed to write frame to {path}")
+    return path
+
+
+def annotate_image(args: argparse.Namespace) -> None:
+    """Single-image path kept from run_one_frame.py."""
+    from ultralytics import YOLO
+
+    image = cv2.imread(str(args.source))
+    model = YOLO(str(args.weights))
+    result = model(image, verbose=False)[0]
+    for box in result.boxes:
+        print(f"class {int(box.cls[0])} conf {float(box.conf[0]):.2f} box {box.xyxy[0].tolist()}")
+    output = args.output
+    if output.suffix.lower() not in {".jpg", ".jpeg", ".png"}:
+        output = output / f"{args.source.stem}_annotated.jpg"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    write_image(output, result.plot())
+    print(f"Annotated image saved to {output}")
+
+
+def main() -> None:
+    args = parse_args()
+    if not args.source.exists():
+        raise FileNotFoundError(f"Source path does not exist: {args.source}")
+    if args.batch_size < 1:
+        raise ValueError("--batch-size must be at least 1.")
+    if (args.fewer_than is not None or args.overlay_log) and args.log is None:
+        raise ValueError("--fewer-than and --overlay-log require --log.")
+
+    if cv2.haveImageReader(str(args.source)):
+        annotate_image(args)
+        return
+
+    log_df = load_log(args.log) if args.log is not None else None
+    frames = select_frames(args, log_df)
+
+    model = None
+    rows_by_frame: Dict[int, List[dict]] = {}
+    if args.overlay_log:
+        subset = log_df[log_df["frame"].isin(frames)]
+        for frame_idx, group in subset.groupby("frame"):
+            rows_by_frame[int(frame_idx)] = group.to_dict("records")
+    else:
+        if not args.weights.exists():
+            raise FileNotFoundError(f"Missing model weights: {args.weights}")
+        from ultralytics import YOLO
+
+        model = YOLO(str(args.weights))
+
+    args.output.mkdir(parents=True, exist_ok=True)
+    stem = args.source.stem.split(".")[0]
+
+    def target(frame_idx: int) -> Path:
+        return args.output / f"{stem}_frame{frame_idx:06d}.jpg"
+
+    written = 0
+    pending: "deque[Future]" = deque()
+    batch: List[tuple] = []
+    # bound the annotated frames waiting for the encoder so memory stays flat
+    in_flight = threading.BoundedSemaphore(max(1, args.workers) * 4)
+
+    def submit_write(pool: ThreadPoolExecutor, frame_idx: int, image) -> None:
+        nonlocal written
+        in_flight.acquire()
+        future = pool.submit(write_image, target(frame_idx), image)
+        future.add_done_callback(lambda _: in_flight.release())
+        pending.append(future)
+        # drain finished writes so errors surface early and nothing accumulates
+        while pending and pending[0].done():
+            pending.popleft().result()
+            written += 1
+
+    def run_batch(pool: ThreadPoolExecutor) -> None:
+        results = model.predict([frame for _, frame in batch], verbose=False)
+        for (frame_idx, _), result in zip(batch, results):
+            submit_write(pool, frame_idx, result.plot())
+        batch.clear()
+
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        for frame_idx, frame in iter_frames_at(args.source, frames):
+            if model is None:
+                submit_write(pool, frame_idx, draw_records(frame, rows_by_frame.get(frame_idx, [])))
+                continue
+            batch.append((frame_idx, frame))
+            if len(batch) >= args.batch_size:
+                run_batch(pool)
+        if batch:
+            run_batch(pool)
+        while pending:
+            pending.popleft().result()
+            written += 1
+
+    missing = len(frames) - written
+    print(f"Saved {written} annotated frames to {args.output}")
+    if missing:
+        print(f"{missing} requested frames were past the end of the video.")
+
+
+if __name__ == "__main__":
+    main()
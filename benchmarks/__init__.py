@@ -0,0 +1 @@
+"""Offline benchmarks for the yolo_runner pipeline (synthetic videos, stub detector)."""
@@ -0,0 +1,329 @@
+"""Reproducible benchmarks for the detection, tracker, logging and frame-extraction paths.
+
+Runs offline on CPU: synthetic tank videos are generated on first use and the
+deterministic stub detector needs no weights. Pass --yolo-weights to also
+benchmark a real (small) checkpoint.
+
+Example usage:
+   python -m benchmarks.run_benchmarks --save-baseline benchmarks/baseline.json
+   # after a change
+   python -m benchmarks.run_benchmarks --baseline benchmarks/baseline.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from datetime import datetime
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .synthetic import CODECS, VideoSpec, generate_video
+
+DEFAULT_VIDEO_DIR = Path("benchmarks/videos")
+DEFAULT_RESULTS_DIR = Path("benchmarks/results")
+CASES = ("detect", "track", "log", "extract")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the yolo_runner pipeline offline.")
+    parser.add_argument(
+        "--cases",
+        nargs="+",
+        choices=CASES,
+        default=list(CASES),
+        help="Which paths to benchmark.",
+    )
+    parser.add_argument("--frames", type=int, default=300, help="Frames per synthetic video.")
+    parser.add_argument(
+        "--resolutions",
+        nargs="+",
+        default=["640x360"],
+        help="Synthetic video sizes as WIDTHxHEIGHT.",
+    )
+    parser.add_argument("--fish", type=int, default=3, help="Fish per synthetic video.")
+    parser.add_argument(
+        "--codecs",
+        nargs="+",
+        choices=sorted(CODECS),
+        default=["mjpg"],
+        help="Containers/codecs to generate (missing encoders are skipped).",
+    )
+    parser.add_argument("--stride", type=int, default=1, help="Inference stride for detect/track.")
+    parser.add_argument(
+        "--stub-latency-ms",
+        type=float,
+        default=0.0,
+        help="Fixed per-frame cost added to the stub detector.",
+    )
+    parser.add_argument(
+        "--yolo-weights",
+        type=Path,
+        default=None,
+        help="Also run detect/track with this real checkpoint (e.g. yolov8n.pt).",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case; the fastest is kept.")
+    parser.add_argument(
+        "--video-dir",
+        type=Path,
+        default=DEFAULT_VIDEO_DIR,
+        help="Where synthetic videos are generated and reused.",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=DEFAULT_RESULTS_DIR,
+        help="Results JSON file or directory (timestamped file).",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=None,
+        help="Compare against this results file and exit 1 on regressions.",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        type=Path,
+        default=None,
+        help="Also store these results as the new baseline.",
+    )
+    parser.add_argument(
+        "--fps-tolerance",
+        type=float,
+        default=0.15,
+        help="Allowed relative fps drop before flagging a regression.",
+    )
+    parser.add_argument(
+        "--memory-tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed relative peak-RSS growth before flagging a regression.",
+    )
+    return parser.parse_args()
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _load_model(model: str, stub_latency_ms: float, weights: Optional[str]):
+    if model == "stub":
+        from .stub_model import StubYOLO
+
+        return StubYOLO(latency_ms=stub_latency_ms)
+    from ultralytics import YOLO
+
+    return YOLO(weights)
+
+
+def _run_case(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Executed in a fresh process so peak RSS belongs to this case alone."""
+    from yolo_runner.profiling import StageProfiler
+    from yolo_runner.records import DetectionLogger
+    from yolo_runner.video_utils import read_fps
+
+    case, video = job["case"], Path(job["video"])
+    profiler = StageProfiler(enabled=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        start = time.perf_counter()
+        if case in {"detect", "track"}:
+            from yolo_runner.detection import run_detection_mode, run_tracker_mode
+
+            model = _load_model(job["model"], job["stub_latency_ms"], job["weights"])
+            start = time.perf_counter()
+            runner = run_tracker_mode if case == "track" else run_detection_mode
+            runner(
+                model=model,
+                source=video,
+                stride=job["stride"],
+                display=False,
+                logger=DetectionLogger(tmp_dir / "log.parquet"),
+                fps=read_fps(video),
+                start_frame=0,
+                end_frame=None,
+                profiler=profiler,
+            )
+            frames = profiler.frames
+        elif case == "log":
+            from .stub_model import StubBoxes, StubResult
+            import numpy as np
+
+            rng = np.random.default_rng(0)
+            results = [
+                StubResult(
+                    None,
+                    StubBoxes(
+                        rng.uniform(0, 600, size=(job["fish"], 4)).astype(np.float32),
+                        rng.uniform(0.3, 1.0, size=job["fish"]).astype(np.float32),
+                        np.arange(job["fish"]),
+                    ),
+                    {},
+                )
+                for _ in range(256)
+            ]
+            logger = DetectionLogger(tmp_dir / "log.parquet")
+            frames = job["frames"] * 20
+            start = time.perf_counter()
+            for frame_idx in range(frames):
+                with profiler.stage("log"):
+                    logger.add(results[frame_idx % len(results)], frame_idx, 30.0)
+            with profiler.stage("log_flush"):
+                logger.flush()
+        else:
+            import extract_dataset_frames
+
+            frames = max(1, job["frames"] // 10)
+            sys.argv = [
+                "extract_dataset_frames.py",
+                "--video", str(video),
+                "--output", str(tmp_dir / "dataset"),
+                "--frame-gap", str(10 / read_fps(video)),
+                "--max-frames", str(frames),
+            ]
+            with profiler.stage("extract"):
+                extract_dataset_frames.main()
+        elapsed = time.perf_counter() - start
+    stages = {name: hist.to_dict() for name, hist in profiler.stages.items()}
+    return {
+        **job,
+        "frames": frames,
+        "elapsed_s": elapsed,
+        "fps": frames / elapsed if elapsed > 0 else 0.0,
+        "peak_rss_mb": _peak_rss_mb(),
+        "stages": {name: stats["total_s"] for name, stats in stages.items()},
+    }
+
+
+def build_jobs(args: argparse.Namespace, videos: List[Path]) -> List[Dict[str, Any]]:
+    models = ["stub"]
+    if args.yolo_weights is not None:
+        if args.yolo_weights.exists():
+            models.append("yolo")
+        else:
+            print(f"Skipping real-model runs: {args.yolo_weights} not found.")
+    jobs = []
+    for video in videos:
+        for case in args.cases:
+            for model in models if case in {"detect", "track"} else ["none"]:
+                jobs.append(
+                    {
+                        "case": case,
+                        "model": model,
+                        "video": str(video),
+                        "frames": args.frames,
+                        "fish": args.fish,
+                        "stride": args.stride,
+                        "stub_latency_ms": args.stub_latency_ms,
+                        "weights": str(args.yolo_weights) if model == "yolo" else None,
+                    }
+                )
+    return jobs
+
+
+def result_key(row: Dict[str, Any]) -> str:
+    return f"{row['case']}/{row['model']}/{Path(row['video']).name}"
+
+
+def compare(
+    current: List[Dict[str, Any]],
+    baseline: List[Dict[str, Any]],
+    fps_tolerance: float,
+    memory_tolerance: float,
+) -> List[str]:
+    """Return human-readable regressions of ``current`` against ``baseline``."""
+    previous = {result_key(row): row for row in baseline}
+    problems = []
+    for row in current:
+        base = previous.get(result_key(row))
+        if base is None:
+            continue
+        if row["fps"] < base["fps"] * (1 - fps_tolerance):
+            problems.append(
+                f"{result_key(row)}: fps {row['fps']:.1f} < baseline {base['fps']:.1f}"
+            )
+        if row["peak_rss_mb"] > base["peak_rss_mb"] * (1 + memory_tolerance):
+            problems.append(
+                f"{result_key(row)}: peak RSS {row['peak_rss_mb']:.0f} MB > "
+                f"baseline {base['peak_rss_mb']:.0f} MB"
+            )
+    return problems
+
+
+def main() -> None:
+    args = parse_args()
+    videos = []
+    for resolution in args.resolutions:
+        width, height = (int(value) for value in resolution.lower().split("x"))
+        for codec in args.codecs:
+            spec = VideoSpec(frames=args.frames, width=width, height=height, fish=args.fish, codec=codec)
+            path = generate_video(spec, args.video_dir)
+            if path is None:
+                print(f"Skipping {spec.name}: no {codec} encoder in this OpenCV build.")
+                continue
+            videos.append(path)
+
+    results = []
+    context = get_context("spawn")
+    for job in build_jobs(args, videos):
+        runs = []
+        for _ in range(max(1, args.repeat)):
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                runs.append(pool.submit(_run_case, job).result())
+        best = max(runs, key=lambda row: row["fps"])
+        results.append(best)
+        print(
+            f"{result_key(best):<55} {best['fps']:>9.1f} fps "
+            f"{best['peak_rss_mb']:>8.1f} MB peak"
+        )
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "opencv": __import__("cv2").__version__,
+        },
+        "settings": {
+            "frames": args.frames,
+            "fish": args.fish,
+            "stride": args.stride,
+            "stub_latency_ms": args.stub_latency_ms,
+            "spec_defaults": asdict(VideoSpec()),
+        },
+        "results": results,
+    }
+    output = args.output
+    if output.suffix.lower() != ".json":
+        output = output / f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Wrote results to {output}")
+    if args.save_baseline is not None:
+        args.save_baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.save_baseline.write_text(json.dumps(report, indent=2))
+        print(f"Saved baseline to {args.save_baseline}")
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text())["results"]
+        problems = compare(results, baseline, args.fps_tolerance, args.memory_tolerance)
+        if problems:
+            print("Regressions against baseline:")
+            for problem in problems:
+                print(f"  {problem}")
+            sys.exit(1)
+        print("No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import time
+from typing import Dict, Iterator, List, Optional
+
+import cv2
+import numpy as np
+
+
+class _Array:
+    """Tensor look-alike exposing the ``.cpu().numpy()`` chain used by yolo_runner."""
+
+    def __init__(self, values: np.ndarray) -> None:
+        self._values = values
+
+    def cpu(self) -> "_Array":
+        return self
+
+    def numpy(self) -> np.ndarray:
+        return self._values
+
+    @property
+    def shape(self):
+        return self._values.shape
+
+
+class StubBoxes:
+    def __init__(self, xyxy: np.ndarray, conf: np.ndarray, ids: Optional[np.ndarray] = None) -> None:
+        self.xyxy = _Array(xyxy)
+        self.conf = _Array(conf)
+        self.cls = _Array(np.zeros(len(conf), dtype=np.float32))
+        self.id = _Array(ids) if ids is not None else None
+        self.data = _Array(np.zeros((len(conf), 6), dtype=np.float32))
+
+    def __len__(self) -> int:
+        return len(self.conf.numpy())
+
+
+class StubResult:
+    def __init__(self, frame: np.ndarray, boxes: StubBoxes, speed: Dict[str, float]) -> None:
+        self.orig_img = frame
+        self.boxes = boxes
+        self.speed = speed
+
+    def plot(self) -> np.ndarray:
+        annotated = self.orig_img.copy()
+        for x1, y1, x2, y2 in self.boxes.xyxy.numpy().astype(int):
+            cv2.rectangle(annotated, (x1, y1), (x2, y2), (56, 56, 255), 2)
+        return annotated
+
+
+class StubYOLO:
+    """Deterministic detector for the synthetic tank videos.
+
+    Fish are the only saturated orange pixels, so a colour threshold plus
+    connected components finds them exactly. ``latency_ms`` adds a fixed
+    per-frame sleep to emulate model cost; tracking is greedy nearest-centre
+    matching so the tracker loop runs without ultralytics.
+    """
+
+    def __init__(self, latency_ms: float = 0.0, min_area: int = 40) -> None:
+        self.latency = latency_ms / 1000
+        self.min_area = min_area
+        self._tracks: Dict[int, np.ndarray] = {}
+        self._next_id = 1
+
+    def _detect(self, frame: np.ndarray) -> StubResult:
+        start = time.perf_counter()
+        frame_i = frame.astype(np.int16)
+        mask = ((frame_i[..., 2] - frame_i[..., 0]) > 120).astype(np.uint8)
+        count, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+        keep = stats[1:, cv2.CC_STAT_AREA] >= self.min_area
+        stats = stats[1:][keep]
+        xyxy = np.stack(
+            [
+                stats[:, cv2.CC_STAT_LEFT],
+                stats[:, cv2.CC_STAT_TOP],
+                stats[:, cv2.CC_STAT_LEFT] + stats[:, cv2.CC_STAT_WIDTH],
+                stats[:, cv2.CC_STAT_TOP] + stats[:, cv2.CC_STAT_HEIGHT],
+            ],
+            axis=1,
+        ).astype(np.float32).reshape(-1, 4)
+        conf = np.clip(0.5 + stats[:, cv2.CC_STAT_AREA] / 2000, 0, 0.99).astype(np.float32)
+        if self.latency:
+            time.sleep(self.latency)
+        elapsed = (time.perf_counter() - start) * 1000
+        speed = {"preprocess": 0.0, "inference": elapsed, "postprocess": 0.0}
+        return StubResult(frame, StubBoxes(xyxy, conf), speed)
+
+    def predict(self, source, verbose: bool = False, **kwargs) -> List[StubResult]:
+        frames = source if isinstance(source, list) else [source]
+        return [self._detect(frame) for frame in frames]
+
+    __call__ = predict
+
+    def _assign_ids(self, result: StubResult) -> StubResult:
+        xyxy = result.boxes.xyxy.numpy()
+        centres = (xyxy[:, :2] + xyxy[:, 2:]) / 2
+        ids = np.zeros(len(centres), dtype=np.int64)
+        free = dict(self._tracks)
+        for i, centre in enumerate(centres):
+            best, best_dist = None, 60.0
+            for track_id, previous in free.items():
+                dist = float(np.hypot(*(centre - previous)))
+                if dist < best_dist:
+                    best, best_dist = track_id, dist
+            if best is None:
+                best = self._next_id
+                self._next_id += 1
+            else:
+                del free[best]
+            ids[i] = best
+            self._tracks[best] = centre
+        result.boxes = StubBoxes(xyxy, result.boxes.conf.numpy(), ids)
+        return result
+
+    def track(self, source=None, stream: bool = False, vid_stride: int = 1, **kwargs):
+        if isinstance(source, np.ndarray):
+            return [self._assign_ids(self._detect(source))]
+        return self._track_video(str(source), vid_stride)
+
+    def _track_video(self, source: str, stride: int) -> Iterator[StubResult]:
+        cap = cv2.VideoCapture(source)
+        index = 0
+        try:
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                if index % stride == 0:
+                    yield self._assign_ids(self._detect(frame))
+                index += 1
+        finally:
+            cap.release()
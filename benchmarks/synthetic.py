@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import cv2
+import numpy as np
+
+# container/fourcc pairs; unavailable encoders are skipped at generation time
+CODECS = {
+    "mjpg": (".avi", "MJPG"),
+    "mp4v": (".mp4", "mp4v"),
+    "vp8": (".webm", "VP80"),
+}
+
+
+@dataclass(frozen=True)
+class VideoSpec:
+    frames: int = 300
+    width: int = 640
+    height: int = 360
+    fish: int = 3
+    codec: str = "mjpg"
+    fps: float = 30.0
+    seed: int = 0
+
+    @property
+    def name(self) -> str:
+        return f"{self.width}x{self.height}_{self.fish}fish_{self.frames}f_{self.codec}"
+
+
+def textured_background(width: int, height: int, rng: np.random.Generator) -> np.ndarray:
+    """Gravel-like grey texture with a vertical light gradient (no saturated colours)."""
+    noise = rng.integers(0, 255, size=(height // 4 + 1, width // 4 + 1), dtype=np.uint8)
+    noise = cv2.resize(noise, (width, height), interpolation=cv2.INTER_CUBIC)
+    noise = cv2.GaussianBlur(noise, (5, 5), 0)
+    gradient = np.linspace(0.6, 1.0, height, dtype=np.float32)[:, None]
+    grey = (noise.astype(np.float32) * 0.35 + 80) * gradient
+    return cv2.cvtColor(np.clip(grey, 0, 255).astype(np.uint8), cv2.COLOR_GRAY2BGR)
+
+
+def generate_video(spec: VideoSpec, directory: Path) -> Optional[Path]:
+    """Write moving orange ellipses over a textured background; ``None`` if the codec is missing."""
+    suffix, fourcc = CODECS[spec.codec]
+    path = directory / f"{spec.name}{suffix}"
+    if path.exists():
+        return path
+    directory.mkdir(parents=True, exist_ok=True)
+    writer = cv2.VideoWriter(
+        str(path), cv2.VideoWriter_fourcc(*fourcc), spec.fps, (spec.width, spec.height)
+    )
+    if not writer.isOpened():
+        writer.release()
+        path.unlink(missing_ok=True)
+        return None
+
+    rng = np.random.default_rng(spec.seed)
+    background = textured_background(spec.width, spec.height, rng)
+    axes = rng.uniform(12, 30, size=(spec.fish, 2)) * [1.0, 0.45]
+    pos = rng.uniform([40, 40], [spec.width - 40, spec.height - 40], size=(spec.fish, 2))
+    vel = rng.uniform(-4, 4, size=(spec.fish, 2))
+    colors = [(int(rng.integers(0, 60)), int(rng.integers(90, 170)), 255) for _ in range(spec.fish)]
+    try:
+        for _ in range(spec.frames):
+            frame = background.copy()
+            for i in range(spec.fish):
+                angle = float(np.degrees(np.arctan2(vel[i, 1], vel[i, 0])))
+                center = (int(pos[i, 0]), int(pos[i, 1]))
+                size = (int(axes[i, 0]), int(axes[i, 1]))
+                cv2.ellipse(frame, center, size, angle, 0, 360, colors[i], -1, cv2.LINE_AA)
+            writer.write(frame)
+            vel += rng.normal(0, 0.3, size=vel.shape)
+            pos += vel
+            for axis, limit in ((0, spec.width), (1, spec.height)):
+                low = pos[:, axis] < 30
+                high = pos[:, axis] > limit - 30
+                vel[low | high, axis] *= -1
+                pos[:, axis] = np.clip(pos[:, axis], 30, limit - 30)
+    finally:
+        writer.release()
+    return path
@@ -0,0 +1,86 @@
+"""Pack tracked detection logs into memory-mapped sequences for the behavior classifier.
+
+Per-track features (centre, size, velocity, confidence) are written once to
+contiguous float32 shards, and every labelled window becomes an offset into
+them, so training reads windows with ``yolo_runner.sequences.SequenceWindows``
+instead of querying logs per sample.
+
+Example usage:
+   python build_behavior_shards.py dataset/outputs/logs --labels dataset/behavior_labels.csv
+
+   # 10 s windows at 2 samples/s, a new window every second
+   python build_behavior_shards.py 'dataset/outputs/logs/*_tracked.parquet' \
+    --labels dataset/behavior_labels.csv --window 20 --stride 2
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+
+from yolo_runner.log_scan import resolve_logs
+from yolo_runner.sequences import SHARD_ROWS, build_shards
+
+DEFAULT_OUTPUT_DIR = Path("dataset/behavior_shards")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Build float32 sequence shards and a window index from tracked logs."
+    )
+    parser.add_argument(
+        "logs",
+        nargs="+",
+        help="Tracked Parquet logs: files, directories or glob patterns.",
+    )
+    parser.add_argument(
+        "--labels",
+        type=Path,
+        required=True,
+        help="behavior_labels table (CSV/Parquet: log, track_id, start, end[, label]).",
+    )
+    parser.add_argument(
+        "--window",
+        type=int,
+        default=20,
+        help="Samples per window.",
+    )
+    parser.add_argument(
+        "--stride",
+        type=int,
+        default=5,
+        help="Samples between consecutive window starts.",
+    )
+    parser.add_argument(
+        "--shard-rows",
+        type=int,
+        default=SHARD_ROWS,
+        help="Approximate samples per shard file.",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=DEFAULT_OUTPUT_DIR,
+        help="Directory for the shards, windows.npy and manifest.json.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    paths = resolve_logs(args.logs)
+    start = time.perf_counter()
+    manifest = build_shards(
+        paths, args.labels, args.output, args.window, args.stride, args.shard_rows
+    )
+    print(
+        f"Wrote {manifest['windows']} windows in {len(manifest['shards'])} shards "
+        f"from {len(paths)} logs to {args.output} in {time.perf_counter() - start:.2f}s"
+    )
+    for name, count in zip(manifest["classes"], manifest["class_counts"]):
+        print(f"  {name}: {count}")
+
+
+if __name__ == "__main__":
+    main()
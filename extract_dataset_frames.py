@@ -8,13 +8,23 @@ Exampl Usage:
     --max-frames 100 \
     --val-ratio 0.2
 
+   # many recordings at once, skipping near-identical static shots
+   python extract_dataset_frames.py --video videos/*.webm --max-frames 3000 --dedup-threshold 3
+
 """
 
 import argparse
 import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import List
 import cv2
 
+from yolo_runner.frame_hash import HashIndex, dhash
+from yolo_runner.video_utils import iter_frames_at
+
 
 logging.basicConfig(format="%(levelname)s: %(message)s")
 LOGGER = logging.getLogger(__name__)
@@ -29,8 +39,9 @@ def parse_cli_args() -> argparse.Namespace:
     parser.add_argument(
         "--video",
         type=Path,
-        default=Path("first_hour.mp4.webm"),
-        help="Path to the source video.",
+        nargs="+",
+        default=[Path("first_hour.mp4.webm")],
+        help="Path(s) to the source video(s); several videos are decoded in parallel.",
     )
     parser.add_argument(
         "--output",
@@ -48,7 +59,7 @@ def parse_cli_args() -> argparse.Namespace:
         "--max-frames",
         type=int,
         default=60,
-        help="Total number of frames to export.",
+        help="Total number of frames to export (across all videos).",
     )
     parser.add_argument(
         "--val-ratio",
@@ -56,6 +67,22 @@ def parse_cli_args() -> argparse.Namespace:
         default=0.2,
         help="Fraction of frames routed to validation images (0-1).",
     )
+    parser.add_argument(
+        "--dedup-threshold",
+        type=int,
+        default=-1,
+        help=(
+            "Skip frames whose 64-bit perceptual hash is within this many bits of an "
+            "already kept frame (default -1: keep every sampled frame; try 2-3 to thin "
+            "out static shots)."
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Threads encoding and writing JPEGs.",
+    )
     parser.add_argument(
         "--verbose",
         action="store_true",
@@ -64,33 +91,87 @@ def parse_cli_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
+_END = object()
+PREFETCH_FRAMES = 8
+
+
+def sample_indices(video_path: Path, frame_gap: float) -> range:
+    """Frame indices ``frame_gap`` seconds apart over the whole video."""
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        raise RuntimeError(f"Could not open video: {video_path}")
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    if fps <= 0:
+        raise RuntimeError(f"FPS reported as zero; check the video file: {video_path}")
+    step = max(1, int(fps * frame_gap))
+    if count <= 0:
+        # some containers (webm) report no frame count; decoding stops at the real end
+        count = int(fps * 24 * 3600)
+    return range(0, count, step)
+
+
+def decode_video(
+    video_path: Path, indices: range, frames: queue.Queue, stop: threading.Event, hashing: bool
+) -> None:
+    """Producer thread: one forward pass over the video, hashing each sampled frame if asked."""
+    sampled = iter_frames_at(video_path, indices)
+    try:
+        for frame_idx, frame in sampled:
+            item = (frame_idx, frame, dhash(frame) if hashing else None)
+            while not stop.is_set():
+                try:
+                    frames.put(item, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+            if stop.is_set():
+                break
+    finally:
+        sampled.close()
+        frames.put(_END)
+
+
+def video_prefixes(videos: List[Path]) -> List[str]:
+    """Filename prefix per video: the stem, plus the parent folder or position when stems clash."""
+    if len(videos) == 1:
+        return [""]
+    stems = [video.stem.split(".")[0] for video in videos]
+    prefixes = [
+        f"{video.parent.name}_{stem}" if stems.count(stem) > 1 else stem
+        for video, stem in zip(videos, stems)
+    ]
+    if len(set(prefixes)) < len(prefixes):
+        prefixes = [f"{index:02d}_{prefix}" for index, prefix in enumerate(prefixes)]
+    return [f"{prefix}_" for prefix in prefixes]
+
+
+def write_frame(filename: Path, frame) -> None:
+    if not cv2.imwrite(str(filename), frame):
+        raise RuntimeError(f"Failed to write frame to {filename}")
+
+
 def main() -> None:
     """Entry point that parses arguments, samples frames, and writes them to train/val folders."""
     # --- CLI inputs & validation ---
     args = parse_cli_args() # this first step - it builts the ArgumentParser object and return the parsed (processed) Namespace with all its attribuutes (default /user)
     LOGGER.setLevel(logging.INFO if args.verbose else logging.WARNING)
-    video_path = args.video
+    videos = args.video
     output_root = args.output
     val_ratio = max(0.0, min(1.0, args.val_ratio))
     LOGGER.info(
-        "Config parsed | video=%s output=%s frame_gap=%ss max_frames=%s val_ratio=%.2f",
-        video_path,
+        "Config parsed | videos=%s output=%s frame_gap=%ss max_frames=%s val_ratio=%.2f dedup=%s",
+        len(videos),
         output_root,
         args.frame_gap,
         args.max_frames,
         val_ratio,
+        args.dedup_threshold,
     )
-
-    # --- Video capture setup ---
-    cap = cv2.VideoCapture(str(video_path))
-    if not cap.isOpened():
-        raise RuntimeError(f"Could not open video: {video_path}")
-
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    if fps <= 0:
-        raise RuntimeError("FPS reported as zero; check the video file.")
-
-    step = max(1, int(fps * args.frame_gap))
+    for video_path in videos:
+        if not video_path.exists():
+            raise FileNotFoundError(f"Video not found: {video_path}")
     val_interval = int(round(1 / val_ratio)) if val_ratio > 0 else 0
 
     # --- Output structure prep ---
@@ -100,30 +181,72 @@ def main() -> None:
     if val_ratio > 0:
         val_dir.mkdir(parents=True, exist_ok=True)
 
+    # --- One decoder thread per video, each doing a single forward pass ---
+    stop = threading.Event()
+    streams = []
+    for video_path, prefix in zip(videos, video_prefixes(videos)):
+        frames: queue.Queue = queue.Queue(PREFETCH_FRAMES)
+        thread = threading.Thread(
+            target=decode_video,
+            args=(
+                video_path,
+                sample_indices(video_path, args.frame_gap),
+                frames,
+                stop,
+                args.dedup_threshold >= 0,
+            ),
+            name=f"decode-{video_path.stem}",
+            daemon=True,
+        )
+        thread.start()
+        streams.append((prefix, frames, thread))
+
+    # --- Round-robin over the videos so the selection does not depend on thread timing ---
+    index = HashIndex()
+    saved = skipped = 0
+    active = list(streams)
+    writes = []
+    # bound the frames waiting for the encoder so memory stays flat
+    in_flight = threading.BoundedSemaphore(max(1, args.workers) * 4)
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        while active and saved < args.max_frames:
+            for stream in list(active):
+                prefix, frames, _ = stream
+                item = frames.get()
+                if item is _END:
+                    active.remove(stream)
+                    continue
+                frame_idx, frame, frame_hash = item
+                if args.dedup_threshold >= 0 and not index.add_if_new(frame_hash, args.dedup_threshold):
+                    skipped += 1
+                    continue
+
+                use_val = val_ratio > 0 and (saved + 1) % val_interval == 0
+                target_dir = val_dir if use_val else train_dir
+                suffix = "val" if use_val else "train"
+                filename = target_dir / f"fish_{suffix}_{prefix}{frame_idx:06d}.jpg"
+                in_flight.acquire()
+                write = pool.submit(write_frame, filename, frame)
+                write.add_done_callback(lambda _: in_flight.release())
+                writes.append(write)
+                saved += 1 # saved = saved + 1
+                if saved >= args.max_frames:
+                    break
+        stop.set()
+        for future in writes:
+            future.result()
+    for _, frames, thread in streams:
+        # drain so a producer blocked on a full queue can see the stop flag
+        while thread.is_alive():
+            try:
+                frames.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        thread.join()
 
-  # --- Frame sampling loop ---
-    frame_idx = 0
-    saved = 0
-
-    while saved < args.max_frames:
-        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx) # cv2.CAP_PROP_POS_FRAMES is the property code for  “current frame index” inside a VideoCapture while frame_idx is the integer index we want to jump to.
-        ok, frame = cap.read()  # cap.read() returns a tuple where ,  When ok is True, the second value (frame) is a NumPy array containing the current frame’s pixel data (or None if the read failed).
-        if not ok:
-            break
-
-        use_val = val_ratio > 0 and (saved + 1) % val_interval == 0
-        target_dir = val_dir if use_val else train_dir
-        suffix = "val" if use_val else "train"
-        filename = target_dir / f"fish_{suffix}_{frame_idx:06d}.jpg"
-        if not cv2.imwrite(str(filename), frame):
-            raise RuntimeError(f"Failed to write frame to {filename}")
-
-        saved += 1 # saved = saved + 1
-        frame_idx += step # frame_idx = frame_idx + step;
-
-    cap.release()
     print(
         f"Saved {saved} frames ({train_dir} / {val_dir if val_ratio > 0 else 'no val'})"
+        + (f", skipped {skipped} near-duplicates" if skipped else "")
     )
 
 
@@ -1,18 +1,28 @@
+import asyncio
 import logging
 from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 
 from fastapi import FastAPI, Form, Request
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse
 from fastapi.templating import Jinja2Templates
 
-from yolo_runner.args import DEFAULT_LOG_DIR, DEFAULT_SOURCE, DEFAULT_WEIGHTS
-from yolo_runner.main import run as run_yolo
+from yolo_runner.args import (
+    DEFAULT_LOG_DIR,
+    DEFAULT_SOURCE,
+    DEFAULT_WEIGHTS,
+    is_live_source,
+    parse_source,
+)
+from yolo_runner.profiling import active_profiler
 
 app = FastAPI()
 templates = Jinja2Templates(directory="templates")
 logger = logging.getLogger("uvicorn.error")
+# one run at a time: each run loads a model and owns the profiler behind /metrics
+runner = ThreadPoolExecutor(max_workers=1, thread_name_prefix="yolo-run")
 
 
 def _str_path(value: str | None, default: Path) -> Path:
@@ -57,7 +67,6 @@ async def form(request: Request):
         "end_seconds": "",
         "stride": "1",
         "tracker": False,
-        "display": False,
         "log_enabled": False,
         "log_path": "",
         "progress_interval": "0",
@@ -81,7 +90,7 @@ async def run(
     log_path: str = Form(default=""),
     progress_interval: str = Form(default="0"),
 ):
-    source_path = _str_path(source, DEFAULT_SOURCE)
+    source_path = parse_source(source) if source.strip() else DEFAULT_SOURCE
     weights_path = _str_path(weights, DEFAULT_WEIGHTS)
     start_value = _float(start_seconds, 0.0)
     end_value = _optional_float(end_seconds)
@@ -106,6 +115,7 @@ async def run(
         tracker=tracker_enabled,
         log_parquet=log_parquet,
         progress_interval=progress_value,
+        metrics=True,
     )
 
     logger.info(
@@ -124,7 +134,18 @@ async def run(
 
     message: str
     try:
-        log_file = run_yolo(args)
+        if display_enabled:
+            # OpenCV windows only work from the main thread; use run_video.py --display
+            raise ValueError("display is not available from the web form.")
+        if is_live_source(source_path) and end_value is None:
+            # runs are serialized, so an endless capture would block every later request
+            raise ValueError("Live sources need an end time.")
+
+        # imported per request so the server starts without loading cv2/ultralytics
+        from yolo_runner.main import run as run_yolo
+
+        # run off the event loop so /metrics stays responsive during a run
+        log_file = await asyncio.get_running_loop().run_in_executor(runner, run_yolo, args)
         if log_file:
             message = f"Run completed. Log saved to {log_file}"
             logger.info("Run finished. Log saved to %s", log_file)
@@ -142,7 +163,6 @@ async def run(
         "end_seconds": end_seconds,
         "stride": stride,
         "tracker": tracker_enabled,
-        "display": display_enabled,
         "log_enabled": log_enabled_flag,
         "log_path": log_path,
         "progress_interval": progress_interval,
@@ -150,3 +170,12 @@ async def run(
     return templates.TemplateResponse(
         "index.html", {"request": request, "message": message, "defaults": defaults}
     )
+
+
+@app.get("/metrics")
+async def metrics(format: str = "prometheus"):
+    """Stage timings, throughput and memory of the current (or last) run."""
+    profiler = active_profiler()
+    if format == "json":
+        return JSONResponse(profiler.to_dict())
+    return PlainTextResponse(profiler.to_prometheus())
@@ -0,0 +1,82 @@
+"""Keep YOLO models warm in a long-lived local process and run jobs submitted to it.
+
+Example usage:
+   python inference_daemon.py serve --weights runs/detect/train/weights/best.pt &
+   python run_video.py --source videos/clip.mp4 --tracker --log-parquet --daemon
+   python inference_daemon.py status
+   python inference_daemon.py stop
+"""
+
+from __future__ import annotations
+
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+from yolo_runner.args import DEFAULT_DAEMON_SOCKET, DEFAULT_WEIGHTS
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Serve run_video.py jobs from a daemon that keeps models loaded."
+    )
+    parser.add_argument(
+        "command",
+        choices=("serve", "status", "stop"),
+        help="Start the daemon, list its jobs, or shut it down.",
+    )
+    parser.add_argument(
+        "--socket",
+        type=Path,
+        default=DEFAULT_DAEMON_SOCKET,
+        help="Unix socket the daemon listens on.",
+    )
+    parser.add_argument(
+        "--weights",
+        type=Path,
+        action="append",
+        default=None,
+        help="Checkpoint to load and warm at startup (repeatable; defaults to the training output).",
+    )
+    return parser.parse_args()
+
+
+def print_status(response: dict) -> None:
+    models = response["models"]
+    print(f"Warm models: {', '.join(models) if models else 'none'}")
+    if not response["jobs"]:
+        print("No jobs submitted yet.")
+        return
+    print(f"{'job':>4} {'status':<8} {'submitted':<19} {'secs':>7}  source / result")
+    for job in response["jobs"]:
+        submitted = datetime.fromtimestamp(job["submitted"]).strftime("%Y-%m-%d %H:%M:%S")
+        secs = (
+            f"{job['finished'] - job['started']:.1f}"
+            if job["finished"] and job["started"]
+            else "-"
+        )
+        detail = job["error"] or job["result"] or job["args"].get("source")
+        print(f"{job['id']:>4} {job['status']:<8} {submitted:<19} {secs:>7}  {detail}")
+
+
+def main() -> None:
+    args = parse_args()
+    from yolo_runner.daemon import InferenceDaemon, request
+
+    if args.command == "serve":
+        preload = args.weights
+        if preload is None:
+            preload = [DEFAULT_WEIGHTS] if DEFAULT_WEIGHTS.exists() else []
+        for weights in preload:
+            if not weights.exists():
+                raise FileNotFoundError(f"Missing model weights: {weights}")
+        InferenceDaemon(args.socket, preload).serve_forever()
+    elif args.command == "status":
+        print_status(request(args.socket, {"op": "status"}))
+    else:
+        request(args.socket, {"op": "shutdown"})
+        print(f"Asked the inference daemon at {args.socket} to stop.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""Render occupancy heatmaps and trajectories from detection logs.
+
+Box centres are binned into a coarse grid while the logs stream through in
+batches, so a whole day of recordings renders in bounded memory.
+
+Example usage:
+   python plot_occupancy.py dataset/outputs/logs --reference videos/first_hour.mp4.webm
+
+   # hourly layers, per-track layers and trajectories, folding new logs into saved grids
+   python plot_occupancy.py 'dataset/outputs/logs/detections_20250101_*.parquet' \
+    --reference videos/first_hour.mp4.webm --window-seconds 3600 --tracks --trajectories \
+    --state dataset/outputs/heatmaps/day.npz
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import cv2
+import numpy as np
+
+from yolo_runner.heatmap import (
+    DEFAULT_CELL,
+    OccupancyAccumulator,
+    accumulate_logs,
+    frame_size_from_logs,
+    render_heatmap,
+    render_trajectories,
+)
+from yolo_runner.log_scan import resolve_logs
+from yolo_runner.video_utils import iter_frames_at, read_fps
+
+DEFAULT_OUTPUT_DIR = Path("dataset/outputs/heatmaps")
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".bmp"}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Bin logged box centres into occupancy heatmaps and trajectory plots."
+    )
+    parser.add_argument(
+        "logs",
+        nargs="+",
+        help="Parquet logs: files, directories or glob patterns.",
+    )
+    parser.add_argument(
+        "--reference",
+        type=Path,
+        default=None,
+        help="Image or video whose frame is drawn under the heatmap (also sets the frame size).",
+    )
+    parser.add_argument(
+        "--reference-seconds",
+        type=float,
+        default=0.0,
+        help="Timestamp of the reference frame when --reference is a video.",
+    )
+    parser.add_argument(
+        "--size",
+        default=None,
+        help="Frame size as WIDTHxHEIGHT when there is no reference (default: from the logs).",
+    )
+    parser.add_argument(
+        "--cell",
+        type=int,
+        default=None,
+        help=f"Grid cell size in pixels (default: {DEFAULT_CELL}).",
+    )
+    parser.add_argument(
+        "--window-seconds",
+        type=float,
+        default=None,
+        help="Also render one layer per log and time window of this length (video time).",
+    )
+    parser.add_argument(
+        "--tracks",
+        action="store_true",
+        help="Also render one layer per track.",
+    )
+    parser.add_argument(
+        "--top-tracks",
+        type=int,
+        default=10,
+        help="With --tracks, render only the N tracks with the most detections.",
+    )
+    parser.add_argument(
+        "--trajectories",
+        action="store_true",
+        help="Draw per-track trajectories.",
+    )
+    parser.add_argument(
+        "--alpha",
+        type=float,
+        default=0.6,
+        help="Heatmap opacity over the reference frame.",
+    )
+    parser.add_argument(
+        "--state",
+        type=Path,
+        default=None,
+        help="Load/save the accumulated grids here so later runs only add new logs.",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=DEFAULT_OUTPUT_DIR,
+        help="Directory for the PNGs (a timestamped subfolder is created).",
+    )
+    return parser.parse_args()
+
+
+def load_reference(path: Path, seconds: float) -> np.ndarray:
+    if not path.exists():
+        raise FileNotFoundError(f"Reference not found: {path}")
+    if path.suffix.lower() in IMAGE_SUFFIXES:
+        frame = cv2.imread(str(path))
+        if frame is None:
+            raise RuntimeError(f"Could not read image: {path}")
+        return frame
+    frame_idx = int(seconds * read_fps(path))
+    for _, frame in iter_frames_at(path, [frame_idx]):
+        return frame
+    raise RuntimeError(f"Could not read frame {frame_idx} from {path}")
+
+
+def save(image: np.ndarray, output: Path) -> None:
+    if not cv2.imwrite(str(output), image):
+        raise RuntimeError(f"Failed to write {output}")
+
+
+def main() -> None:
+    args = parse_args()
+    paths = resolve_logs(args.logs)
+    background: Optional[np.ndarray] = None
+    if args.reference is not None:
+        background = load_reference(args.reference, args.reference_seconds)
+
+    size = tuple(int(value) for value in args.size.lower().split("x")) if args.size else None
+    if args.state is not None and args.state.exists():
+        accumulator = OccupancyAccumulator.load(args.state)
+        mismatch = accumulator.settings_mismatch(
+            size, args.cell, args.window_seconds, args.tracks, args.trajectories
+        )
+        if mismatch:
+            raise ValueError(
+                f"{args.state} was built with different settings: {', '.join(mismatch)}. "
+                "Drop the conflicting options or start a new --state file."
+            )
+        print(f"Loaded {len(accumulator.sources)} logs from {args.state}")
+    else:
+        if background is not None:
+            size = (background.shape[1], background.shape[0])
+        elif size is None:
+            size = frame_size_from_logs(paths)
+        accumulator = OccupancyAccumulator(
+            size,
+            cell=args.cell or DEFAULT_CELL,
+            window_seconds=args.window_seconds,
+            track_layers=args.tracks,
+            trajectories=args.trajectories,
+        )
+
+    start = time.perf_counter()
+    added = accumulate_logs(accumulator, paths)
+    print(
+        f"Binned {accumulator.detections} detections from {len(accumulator.sources)} logs "
+        f"({added} new) in {time.perf_counter() - start:.2f}s"
+    )
+    if args.state is not None:
+        accumulator.save(args.state)
+        print(f"Saved grids to {args.state}")
+
+    output = args.output / f"occupancy_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    output.mkdir(parents=True, exist_ok=True)
+    save(render_heatmap(accumulator, background=background, alpha=args.alpha), output / "occupancy.png")
+    for key in sorted(accumulator.windows.keys):
+        save(
+            render_heatmap(accumulator, accumulator.windows.layer(key), background, args.alpha),
+            output / f"{accumulator.window_layer_name(key)}.png",
+        )
+    if accumulator.tracks:
+        totals = accumulator.tracks.totals()
+        ranked = sorted(totals, key=lambda key: -totals[key])
+        for key in ranked[: args.top_tracks]:
+            save(
+                render_heatmap(accumulator, accumulator.tracks.layer(key), background, args.alpha),
+                output / f"{accumulator.track_layer_name(key)}.png",
+            )
+    if accumulator.canvas is not None:
+        save(render_trajectories(accumulator, background), output / "trajectories.png")
+    print(f"Saved heatmaps to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Replay detection logs through ByteTrack without the video or the model.
+
+Example usage:
+   # tracked copy of a detection-mode log
+   python retrack_detections.py dataset/outputs/logs/detections_20250101_120000.parquet
+
+   # sweep tracker settings in parallel and rank them
+   python retrack_detections.py dataset/outputs/logs/detections_20250101_120000.parquet \
+    --grid track_high_thresh=0.4,0.5,0.6 --grid match_thresh=0.7,0.8,0.9 --workers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from yolo_runner.raw_cache import load_raw_detections, read_raw_meta, refilter
+from yolo_runner.records import load_samples, write_samples
+from yolo_runner.retrack import TRACKER_FRAME_RATE, LoggedDetections, retrack, run_grid, score_tracks
+from yolo_runner.summary import summarize_frame, write_summary
+
+
+def _parse_value(text: str) -> Any:
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            pass
+    if text.lower() in {"true", "false"}:
+        return text.lower() == "true"
+    return text
+
+
+def _parse_assignment(text: str) -> tuple[str, List[Any]]:
+    if "=" not in text:
+        raise argparse.ArgumentTypeError(f"Expected key=value, got {text!r}")
+    key, values = text.split("=", 1)
+    return key.strip(), [_parse_value(v.strip()) for v in values.split(",") if v.strip()]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Run ByteTrack over logged detections and write a tracked log."
+    )
+    parser.add_argument(
+        "parquet",
+        type=Path,
+        help="Detection log from run_video.py --log-parquet (or a --raw-cache file).",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="Tracked log destination (defaults to <log>_tracked.parquet).",
+    )
+    parser.add_argument(
+        "--set",
+        dest="overrides",
+        type=_parse_assignment,
+        action="append",
+        default=[],
+        help="Override a bytetrack.yaml value, e.g. --set track_buffer=60.",
+    )
+    parser.add_argument(
+        "--grid",
+        type=_parse_assignment,
+        action="append",
+        default=[],
+        help="Sweep a tracker value, e.g. --grid match_thresh=0.7,0.8 (repeatable).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Processes used for --grid (defaults to the CPU count).",
+    )
+    parser.add_argument(
+        "--min-fish",
+        type=int,
+        default=3,
+        help="Tracks needed in a frame for it to count towards coverage.",
+    )
+    parser.add_argument(
+        "--conf",
+        type=float,
+        default=0.1,
+        help="Confidence floor when the input is a raw detection cache.",
+    )
+    parser.add_argument(
+        "--fps",
+        type=float,
+        default=None,
+        help=(
+            "Frame rate of the logged source (default: from the log's timestamps; "
+            "required for live logs, whose timestamps are wall-clock times)."
+        ),
+    )
+    parser.add_argument(
+        "--frame-rate",
+        type=int,
+        default=TRACKER_FRAME_RATE,
+        help="Frame rate handed to ByteTrack (scales track_buffer).",
+    )
+    return parser.parse_args()
+
+
+def load_detections(path: Path, conf: float, fps: Optional[float] = None) -> LoggedDetections:
+    if not path.exists():
+        raise FileNotFoundError(f"Parquet file not found: {path}")
+    if read_raw_meta(path) is not None:
+        raw, meta = load_raw_detections(path)
+        # raw caches are written at a fixed stride, so their samples follow from the meta
+        samples = None
+        if meta.frames_processed:
+            samples = meta.start_frame + meta.stride * np.arange(meta.frames_processed)
+        fps = fps or meta.fps
+        return LoggedDetections.from_frame(refilter(raw, conf=conf, fps=fps), fps, samples)
+    df = pd.read_parquet(path)
+    return LoggedDetections.from_frame(df, fps, load_samples(path, df["frame"].unique()))
+
+
+def main() -> None:
+    args = parse_args()
+    detections = load_detections(args.parquet, args.conf, args.fps)
+    overrides: Dict[str, Any] = {key: values[0] for key, values in args.overrides}
+
+    if args.grid:
+        grid = {key: [values[0]] for key, values in args.overrides}
+        grid.update(dict(args.grid))
+        rows = run_grid(detections, grid, args.min_fish, args.workers, args.frame_rate)
+        print(pd.DataFrame(rows).to_string(index=False))
+        return
+
+    records = retrack(detections, overrides, args.frame_rate)
+    total_frames = sum(1 for _ in detections.iter_frames())
+    scores = score_tracks(records, total_frames, args.min_fish)
+    print(
+        f"{scores['tracks']} tracks, {scores['id_births']} id births, "
+        f"coverage {scores['coverage']:.2f}% (≥{args.min_fish} tracks)"
+    )
+    if not records:
+        print("No tracks produced; skipping Parquet write.")
+        return
+    output = args.output or args.parquet.with_name(f"{args.parquet.stem}_tracked.parquet")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tracked = pd.DataFrame(records)
+    tracked.to_parquet(output)
+    write_summary(output, summarize_frame(tracked))
+    samples = detections.sample_frames()
+    fps = detections.fps
+    write_samples(output, samples, samples / fps if fps else np.full(len(samples), np.nan))
+    print(f"Wrote {len(records)} tracked detections to {output}")
+
+
+if __name__ == "__main__":
+    main()
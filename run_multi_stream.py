@@ -0,0 +1,132 @@
+"""Run one shared YOLO model over several videos/streams at once.
+
+Example usage:
+   python run_multi_stream.py \
+    --source videos/tank_a.webm --source videos/tank_b.webm \
+    --source rtsp://192.168.1.20/stream --batch-size 4 --tracker --log-parquet
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+from yolo_runner.args import DEFAULT_LOG_DIR, DEFAULT_PROFILE_DIR, DEFAULT_WEIGHTS, parse_source
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Batch frames from several videos or streams through a single YOLO model "
+            "and log each stream to its own Parquet file."
+        )
+    )
+    parser.add_argument(
+        "--source",
+        dest="sources",
+        type=parse_source,
+        action="append",
+        required=True,
+        help="Video file, stream URL or camera index (repeat for each stream).",
+    )
+    parser.add_argument(
+        "--weights",
+        type=Path,
+        default=DEFAULT_WEIGHTS,
+        help="Checkpoint to load (e.g. runs/detect/train*/weights/best.pt).",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=4,
+        help="Maximum frames per inference batch (filled round-robin across streams).",
+    )
+    parser.add_argument(
+        "--stride",
+        type=int,
+        default=1,
+        help="Run inference every N frames of each video file.",
+    )
+    parser.add_argument(
+        "--tracker",
+        action="store_true",
+        help="Keep a separate ByteTrack state per stream.",
+    )
+    parser.add_argument(
+        "--display",
+        action="store_true",
+        help="Show one window per stream (press q to stop).",
+    )
+    parser.add_argument(
+        "--start-seconds",
+        type=float,
+        default=0.0,
+        help="Skip everything before this timestamp in each video file.",
+    )
+    parser.add_argument(
+        "--end-seconds",
+        type=float,
+        default=None,
+        help="Stop each video at this timestamp (run duration for live streams).",
+    )
+    parser.add_argument(
+        "--log-parquet",
+        type=Path,
+        nargs="?",
+        const=DEFAULT_LOG_DIR,
+        default=None,
+        help="Directory for the per-stream Parquet logs (defaults to dataset/outputs/logs/).",
+    )
+    parser.add_argument(
+        "--progress-interval",
+        type=int,
+        default=0,
+        help="Print progress every N processed frames per stream (0 disables).",
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        nargs="?",
+        const=DEFAULT_PROFILE_DIR,
+        default=None,
+        help="Print per-stage timings and write a JSON report (directory or .json path).",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if not args.weights.exists():
+        raise FileNotFoundError(f"Missing model weights: {args.weights}")
+    if args.batch_size < 1:
+        raise ValueError("--batch-size must be at least 1.")
+
+    from ultralytics import YOLO
+
+    from yolo_runner.multi_stream import run_multi_stream
+    from yolo_runner.profiling import StageProfiler
+
+    profiler = StageProfiler(enabled=args.profile is not None)
+    with profiler.stage("model_load"):
+        model = YOLO(str(args.weights))
+    run_multi_stream(
+        model=model,
+        sources=args.sources,
+        stride=args.stride,
+        batch_size=args.batch_size,
+        tracker=args.tracker,
+        display=args.display,
+        log_dir=args.log_parquet,
+        progress_interval=args.progress_interval,
+        start_seconds=args.start_seconds,
+        end_seconds=args.end_seconds,
+        profiler=profiler,
+    )
+    profiler.finish()
+    if args.profile is not None:
+        print(profiler.summary())
+        print(f"Wrote profile to {profiler.write_json(args.profile)}")
+
+
+if __name__ == "__main__":
+    main()
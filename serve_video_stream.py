@@ -0,0 +1,113 @@
+"""Serve a looping video file as an MJPEG HTTP stream (stand-in for a tank camera).
+
+Example usage:
+   python serve_video_stream.py --video videos/first_hour.mp4.webm --port 8554
+   python run_video.py --source http://127.0.0.1:8554/stream.mjpg --end-seconds 60
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import cv2
+
+BOUNDARY = "frame"
+# consecutive rewinds that yield no frame before a client's stream is dropped
+MAX_FAILED_REWINDS = 3
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Loop a video file as an MJPEG stream.")
+    parser.add_argument("--video", type=Path, required=True, help="Video file to loop.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind.")
+    parser.add_argument("--port", type=int, default=8554, help="Port to listen on.")
+    parser.add_argument(
+        "--fps",
+        type=float,
+        default=None,
+        help="Playback rate (defaults to the file's FPS).",
+    )
+    parser.add_argument(
+        "--quality",
+        type=int,
+        default=80,
+        help="JPEG quality of the streamed frames.",
+    )
+    return parser.parse_args()
+
+
+def make_handler(video: Path, fps: float, quality: int):
+    class StreamHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802 - http.server naming
+            if self.path != "/stream.mjpg":
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={BOUNDARY}")
+            self.end_headers()
+            interval = 1.0 / fps
+            cap = cv2.VideoCapture(str(video))
+            next_time = time.monotonic()
+            failed_rewinds = 0
+            try:
+                while True:
+                    ret, frame = cap.read()
+                    if not ret:
+                        if failed_rewinds >= MAX_FAILED_REWINDS:
+                            print(f"Could not read {video} after rewinding; closing the stream.")
+                            return
+                        failed_rewinds += 1
+                        # back off instead of spinning while the file is unreadable
+                        time.sleep(interval * failed_rewinds)
+                        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                        continue
+                    failed_rewinds = 0
+                    ok, jpeg = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+                    if not ok:
+                        continue
+                    payload = jpeg.tobytes()
+                    self.wfile.write(
+                        f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                        f"Content-Length: {len(payload)}\r\n\r\n".encode()
+                    )
+                    self.wfile.write(payload)
+                    self.wfile.write(b"\r\n")
+                    next_time += interval
+                    time.sleep(max(0.0, next_time - time.monotonic()))
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            finally:
+                cap.release()
+
+        def log_message(self, format: str, *args) -> None:  # noqa: A002
+            pass
+
+    return StreamHandler
+
+
+def main() -> None:
+    args = parse_args()
+    if not args.video.exists():
+        raise FileNotFoundError(f"Video not found: {args.video}")
+    cap = cv2.VideoCapture(str(args.video))
+    fps = args.fps or cap.get(cv2.CAP_PROP_FPS) or 30.0
+    readable = cap.isOpened() and cap.read()[0]
+    cap.release()
+    if not readable:
+        raise RuntimeError(f"Could not read a frame from {args.video}")
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args.video, fps, args.quality))
+    print(f"Streaming {args.video} at {fps:.1f} fps on http://{args.host}:{args.port}/stream.mjpg")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
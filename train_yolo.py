@@ -1,34 +1,122 @@
+"""Train the fish detector.
+
+Decoded, resized training images are kept in a memory-mapped cache under
+``--image-cache`` so later epochs and later runs skip JPEG decoding. The
+cache is keyed by a hash of the image set and rebuilt (reusing unchanged
+images) when frames are added, removed or edited.
+
+Example usage:
+   python train_yolo.py --epochs 100 --batch 32 --workers 4
+
+   # continue the most recent interrupted run
+   python train_yolo.py --resume
+"""
+
+from __future__ import annotations
+
+import argparse
 from datetime import datetime
 from pathlib import Path
-
-from ultralytics import YOLO
+from typing import Optional
 
 DATA_CONFIG = Path("dataset/fish.yaml")
 MODEL_WEIGHTS = Path("yolov8n.pt")
 EPOCHS = 50
 IMAGE_SIZE = 640
 RUNS_DIR = Path("runs/detect")
+IMAGE_CACHE_DIR = Path("dataset/cache/images")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Train YOLO on the fish dataset.")
+    parser.add_argument("--data", type=Path, default=DATA_CONFIG, help="Dataset YAML.")
+    parser.add_argument("--weights", type=Path, default=MODEL_WEIGHTS, help="Base checkpoint.")
+    parser.add_argument("--epochs", type=int, default=EPOCHS, help="Number of epochs.")
+    parser.add_argument("--imgsz", type=int, default=IMAGE_SIZE, help="Training image size.")
+    parser.add_argument("--batch", type=int, default=16, help="Batch size (-1 for auto).")
+    parser.add_argument("--workers", type=int, default=8, help="Dataloader workers.")
+    parser.add_argument("--device", default=None, help="Device, e.g. cpu, 0 or 0,1.")
+    parser.add_argument("--project", type=Path, default=RUNS_DIR, help="Directory for runs.")
+    parser.add_argument(
+        "--name",
+        default=None,
+        help="Run name (default: train_<timestamp>).",
+    )
+    parser.add_argument(
+        "--image-cache",
+        type=Path,
+        default=IMAGE_CACHE_DIR,
+        help="Directory for the memory-mapped image cache.",
+    )
+    parser.add_argument(
+        "--no-image-cache",
+        action="store_true",
+        help="Decode images from disk every epoch.",
+    )
+    parser.add_argument(
+        "--resume",
+        nargs="?",
+        type=Path,
+        const=Path(),
+        default=None,
+        help="Resume an interrupted run from its last.pt (default: the newest run in --project).",
+    )
+    return parser.parse_args()
+
+
+def latest_checkpoint(project: Path) -> Path:
+    checkpoints = list(project.glob("*/weights/last.pt"))
+    if not checkpoints:
+        raise FileNotFoundError(f"No last.pt to resume under {project}")
+    return max(checkpoints, key=lambda path: path.stat().st_mtime)
 
 
 def main() -> None:
-    if not DATA_CONFIG.exists():
-        raise FileNotFoundError(f"Missing data config: {DATA_CONFIG}")
+    args = parse_args()
+    from ultralytics import YOLO
+
+    trainer = None
+    if not args.no_image_cache:
+        from yolo_runner.training import cached_detection_trainer
+
+        trainer = cached_detection_trainer(args.image_cache)
+
+    if args.resume is not None:
+        checkpoint = args.resume if args.resume != Path() else latest_checkpoint(args.project)
+        if not checkpoint.exists():
+            raise FileNotFoundError(f"Missing checkpoint: {checkpoint}")
+        print(f"Resuming {checkpoint}")
+        # data, epochs and imgsz come from the checkpoint; workers/batch/device may change
+        overrides = {"workers": args.workers, "batch": args.batch}
+        if args.device is not None:
+            overrides["device"] = args.device
+        YOLO(str(checkpoint)).train(resume=True, trainer=trainer, cache=False, **overrides)
+        return
+
+    if not args.data.exists():
+        raise FileNotFoundError(f"Missing data config: {args.data}")
 
-    if not MODEL_WEIGHTS.exists():
+    if not args.weights.exists():
         raise FileNotFoundError(
-            f"Missing base weights: {MODEL_WEIGHTS}. "
+            f"Missing base weights: {args.weights}. "
             "Place yolov8n.pt (or your chosen checkpoint) in the repository root."
         )
 
-    RUNS_DIR.mkdir(parents=True, exist_ok=True)
-    run_name = datetime.now().strftime("train_%Y%m%d_%H%M%S")
+    args.project.mkdir(parents=True, exist_ok=True)
+    run_name: Optional[str] = args.name or datetime.now().strftime("train_%Y%m%d_%H%M%S")
 
-    model = YOLO(str(MODEL_WEIGHTS))
+    model = YOLO(str(args.weights))
     model.train(
-        data=str(DATA_CONFIG),
-        epochs=EPOCHS,
-        imgsz=IMAGE_SIZE,
-        project=str(RUNS_DIR),
+        trainer=trainer,
+        data=str(args.data),
+        epochs=args.epochs,
+        imgsz=args.imgsz,
+        batch=args.batch,
+        workers=args.workers,
+        device=args.device,
+        # the memmap cache replaces ultralytics' own ram/disk caching
+        cache=False,
+        project=str(args.project),
         name=run_name,
     )
 
@@ -1,5 +1,20 @@
 """Utilities for running YOLO detections/tracking on videos."""
 
-from .main import run_cli
+
+def run_cli() -> None:
+    # parse first so --help and argument errors never pay for cv2/ultralytics imports
+    from .args import parse_args
+
+    args = parse_args()
+    if args.daemon is not None:
+        from .daemon import submit
+
+        job = submit(args, args.daemon)
+        print(f"Submitted job {job} to the inference daemon at {args.daemon}")
+        return
+    from .main import run
+
+    run(args)
+
 
 __all__ = ["run_cli"]
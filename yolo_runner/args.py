@@ -1,11 +1,74 @@
 from __future__ import annotations
 
 import argparse
+import tempfile
 from pathlib import Path
+from typing import Optional, Union
 
 DEFAULT_SOURCE = Path("videos/first_hour.mp4.webm")
 DEFAULT_WEIGHTS = Path("runs/detect/train/weights/best.pt")
 DEFAULT_LOG_DIR = Path("dataset/outputs/logs")
+DEFAULT_RAW_CACHE_DIR = Path("dataset/outputs/raw_cache")
+DEFAULT_PROFILE_DIR = Path("dataset/outputs/profiles")
+DEFAULT_VIDEO_DIR = Path("dataset/outputs/videos")
+DEFAULT_DAEMON_SOCKET = Path(tempfile.gettempdir()) / "yolo_runner.sock"
+REALTIME = "realtime"
+LIVE_SCHEMES = ("rtsp://", "rtmp://", "http://", "https://", "udp://", "tcp://")
+
+
+def is_live_source(source: Union[Path, str]) -> bool:
+    """Stream URLs and camera indices are kept as ``str``; files are ``Path``."""
+    return isinstance(source, str) and (
+        source.isdigit() or source.lower().startswith(LIVE_SCHEMES)
+    )
+
+
+def parse_source(value: str) -> Union[Path, str]:
+    """Keep stream URLs / camera indices verbatim (``Path`` would collapse ``//``)."""
+    if value.isdigit() or value.lower().startswith(LIVE_SCHEMES):
+        return value
+    return Path(value).expanduser()
+
+
+def parse_time_budget(value: str) -> Union[float, str]:
+    """``600``, ``90s``, ``10m``, ``1.5h`` (seconds) or ``realtime``."""
+    text = value.strip().lower()
+    if text == REALTIME:
+        return REALTIME
+    scale = {"s": 1, "m": 60, "h": 3600}.get(text[-1:])
+    try:
+        seconds = float(text[:-1]) * scale if scale else float(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"Invalid time budget {value!r}; use e.g. 600, 10m, 1h or realtime."
+        ) from None
+    if seconds <= 0:
+        raise argparse.ArgumentTypeError("The time budget must be positive.")
+    return seconds
+
+
+def live_conflicts(args: argparse.Namespace) -> Optional[str]:
+    """Error message naming options set on ``args`` that mean nothing for a live source."""
+    if not is_live_source(args.source):
+        return None
+    conflicts = []
+    if getattr(args, "frame_cache", None) is not None:
+        conflicts.append("--frame-cache")
+    if getattr(args, "raw_cache", None) is not None:
+        conflicts.append("--raw-cache")
+    if getattr(args, "stride", 1) != 1:
+        conflicts.append("--stride")
+    if getattr(args, "start_seconds", 0.0):
+        conflicts.append("--start-seconds")
+    if getattr(args, "time_budget", None) is not None:
+        conflicts.append("--time-budget")
+    if not conflicts:
+        return None
+    verb = "applies" if len(conflicts) == 1 else "apply"
+    return (
+        f"{', '.join(conflicts)} only {verb} to video files; "
+        "live sources always process the newest frame."
+    )
 
 
 def parse_args() -> argparse.Namespace:
@@ -17,9 +80,9 @@ def parse_args() -> argparse.Namespace:
     )
     parser.add_argument(
         "--source",
-        type=Path,
+        type=parse_source,
         default=DEFAULT_SOURCE,
-        help="Path to a video file or RTSP URL.",
+        help="Path to a video file, a stream URL (rtsp://, http://...) or a camera index.",
     )
     parser.add_argument(
         "--weights",
@@ -42,13 +105,31 @@ def parse_args() -> argparse.Namespace:
         "--end-seconds",
         type=float,
         default=None,
-        help="Stop once this timestamp (seconds) is reached.",
+        help="Stop once this timestamp (seconds) is reached (run duration for live sources).",
     )
     parser.add_argument(
         "--stride",
         type=int,
         default=1,
-        help="Run inference every N frames (use 30 for ~1 FPS on 30 FPS video).",
+        help=(
+            "Run inference every N frames (use 30 for ~1 FPS on 30 FPS video). "
+            "With --time-budget this is the smallest stride used."
+        ),
+    )
+    parser.add_argument(
+        "--time-budget",
+        type=parse_time_budget,
+        default=None,
+        help=(
+            "Finish the clip within this wall time (600, 10m, 1h) or 'realtime': the stride "
+            "adapts to the measured per-frame cost and to how fast detections change."
+        ),
+    )
+    parser.add_argument(
+        "--max-stride",
+        type=int,
+        default=None,
+        help="Largest stride --time-budget may use (default: 10 seconds of video).",
     )
     parser.add_argument(
         "--tracker",
@@ -72,4 +153,74 @@ def parse_args() -> argparse.Namespace:
         default=0,
         help="Print progress every N processed frames (0 disables progress logs).",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--frame-cache",
+        type=Path,
+        default=None,
+        help=(
+            "Decode the clip once into this memory-mapped frame file and read frames "
+            "from it on later runs (rebuilt when the source or sampling changes)."
+        ),
+    )
+    parser.add_argument(
+        "--cache-width",
+        type=int,
+        default=None,
+        help="Downscale cached frames to at most this width (boxes are logged in source pixels).",
+    )
+    parser.add_argument(
+        "--raw-cache",
+        type=Path,
+        nargs="?",
+        const=DEFAULT_RAW_CACHE_DIR,
+        default=None,
+        help=(
+            "Store low-threshold raw detections keyed by video/weights hash for offline "
+            "re-filtering (see analyze_detections.py --conf-grid). "
+            "Omit a path to use dataset/outputs/raw_cache/."
+        ),
+    )
+    parser.add_argument(
+        "--save-video",
+        type=Path,
+        nargs="?",
+        const=DEFAULT_VIDEO_DIR,
+        default=None,
+        help=(
+            "Write the annotated frames to an MP4 encoded in a separate process. "
+            "Omit a path to drop files under dataset/outputs/videos/."
+        ),
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        nargs="?",
+        const=DEFAULT_PROFILE_DIR,
+        default=None,
+        help=(
+            "Time decode/inference/tracking/plot/log/display stages, print a summary and "
+            "write a JSON report. Omit a path to drop files under dataset/outputs/profiles/."
+        ),
+    )
+    parser.add_argument(
+        "--reconnect-max-delay",
+        type=float,
+        default=30.0,
+        help="Upper bound (seconds) of the reconnect backoff for live sources.",
+    )
+    parser.add_argument(
+        "--daemon",
+        type=Path,
+        nargs="?",
+        const=DEFAULT_DAEMON_SOCKET,
+        default=None,
+        help=(
+            "Submit the run to a warm inference daemon (inference_daemon.py serve) and "
+            "return immediately. Omit a path to use the default socket."
+        ),
+    )
+    args = parser.parse_args()
+    conflicts = live_conflicts(args)
+    if conflicts:
+        parser.error(conflicts)
+    return args
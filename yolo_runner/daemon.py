@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import json
+import os
+import queue
+import socket
+import socketserver
+import threading
+import time
+from argparse import Namespace
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .args import is_live_source, parse_source
+
+# Namespace attributes holding paths; they are made absolute by the client
+# because the daemon's working directory is not the caller's.
+PATH_FIELDS = ("weights", "log_parquet", "frame_cache", "raw_cache", "save_video", "profile")
+REQUEST_TIMEOUT = 5.0
+WARMUP_SIZE = 640
+
+
+def encode_args(args: Namespace) -> Dict[str, Any]:
+    """JSON-safe copy of the run arguments with every path resolved for the daemon."""
+    payload: Dict[str, Any] = {}
+    for key, value in vars(args).items():
+        if key == "daemon":
+            continue
+        if key == "source" and not is_live_source(value):
+            value = str(Path(value).expanduser().resolve())
+        elif key in PATH_FIELDS and value is not None:
+            value = str(Path(value).expanduser().resolve())
+        payload[key] = value
+    return payload
+
+
+def decode_args(payload: Dict[str, Any]) -> Namespace:
+    values = dict(payload)
+    values["source"] = parse_source(values["source"])
+    for key in PATH_FIELDS:
+        if values.get(key) is not None:
+            values[key] = Path(values[key])
+    return Namespace(**values)
+
+
+class ModelPool:
+    """Loaded and warmed models keyed by checkpoint path, modification time and mode.
+
+    ``model.track`` attaches tracking callbacks to the model for good, so
+    tracking jobs and plain detection jobs never share a model instance.
+    """
+
+    def __init__(self) -> None:
+        self._models: Dict[Tuple[str, float, bool], Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, weights: Path, tracking: bool = False):
+        key = (str(weights.resolve()), weights.stat().st_mtime, tracking)
+        with self._lock:
+            model = self._models.get(key)
+            if model is None:
+                model = self._models[key] = self._load(weights)
+        reset_tracking(model)
+        return model
+
+    def loader(self, args: Namespace) -> Callable[[Path], Any]:
+        """``run``'s model loader for a job, picking the pool entry for its mode."""
+        tracking = bool(getattr(args, "tracker", False)) and getattr(args, "raw_cache", None) is None
+        return lambda weights: self.get(weights, tracking)
+
+    def _load(self, weights: Path):
+        import numpy as np
+
+        from .main import load_model
+
+        start = time.perf_counter()
+        model = load_model(weights)
+        # the first predict builds the predictor and initialises the device
+        model.predict(np.zeros((WARMUP_SIZE, WARMUP_SIZE, 3), dtype=np.uint8), verbose=False)
+        print(f"Loaded and warmed {weights} in {time.perf_counter() - start:.1f}s")
+        return model
+
+    def loaded(self) -> List[str]:
+        with self._lock:
+            return [f"{path} ({'track' if tracking else 'detect'})" for path, _, tracking in self._models]
+
+
+def reset_tracking(model) -> None:
+    """Clear ByteTrack state left by the previous job (``persist=True`` keeps it on the predictor).
+
+    The trackers are reset in place: deleting them would make ``Model.track``
+    register its callbacks a second time, and every frame would then be
+    tracked twice.
+    """
+    predictor = getattr(model, "predictor", None)
+    for tracker in getattr(predictor, "trackers", None) or ():
+        tracker.reset()
+
+
+@dataclass
+class Job:
+    id: int
+    args: Dict[str, Any]
+    status: str = "queued"
+    submitted: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    result: Optional[str] = None
+    error: Optional[str] = None
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        try:
+            request = json.loads(self.rfile.readline())
+            response = self.server.inference_daemon.handle(request)
+        except Exception as exc:  # pragma: no cover - runtime path
+            response = {"ok": False, "error": str(exc)}
+        self.wfile.write((json.dumps(response) + "\n").encode())
+
+
+class InferenceDaemon:
+    """Serve run requests over a Unix socket, reusing warm models between jobs.
+
+    Jobs run one at a time on a single worker thread so concurrent clients
+    never contend for the same model or GPU; ``submit`` only queues the job.
+    """
+
+    def __init__(self, socket_path: Path, preload: Iterable[Path] = ()) -> None:
+        self.socket_path = socket_path
+        self.preload = list(preload)
+        self.models = ModelPool()
+        self.jobs: Dict[int, Job] = {}
+        self._queue: "queue.Queue[Optional[Job]]" = queue.Queue()
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self._server: Optional[socketserver.ThreadingUnixStreamServer] = None
+
+    def serve_forever(self) -> None:
+        _claim_socket(self.socket_path)
+        self._server = socketserver.ThreadingUnixStreamServer(str(self.socket_path), _Handler)
+        self._server.inference_daemon = self
+        os.chmod(self.socket_path, 0o600)
+        worker = threading.Thread(target=self._work, name="inference-worker", daemon=True)
+        worker.start()
+        for weights in self.preload:
+            self.models.get(weights)
+        print(f"Inference daemon listening on {self.socket_path}")
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            print("Stopping inference daemon.")
+        finally:
+            self._server.server_close()
+            self.socket_path.unlink(missing_ok=True)
+            self._queue.put(None)
+            worker.join()
+        pending = sum(job.status == "queued" for job in self.jobs.values())
+        if pending:
+            print(f"Dropped {pending} queued jobs.")
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        op = request.get("op")
+        if op == "submit":
+            with self._lock:
+                job = Job(id=self._next_id, args=request["args"])
+                self._next_id += 1
+                self.jobs[job.id] = job
+            self._queue.put(job)
+            return {"ok": True, "job": job.id, "queued": self._queue.qsize()}
+        if op == "status":
+            with self._lock:
+                jobs = [asdict(job) for job in self.jobs.values()]
+            return {"ok": True, "jobs": jobs, "models": self.models.loaded()}
+        if op == "shutdown":
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+            return {"ok": True}
+        return {"ok": False, "error": f"Unknown op: {op!r}"}
+
+    def _work(self) -> None:
+        from .main import run
+
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            job.status, job.started = "running", time.time()
+            print(f"[job {job.id}] {job.args.get('source')}")
+            try:
+                args = decode_args(job.args)
+                result = run(args, model_loader=self.models.loader(args))
+                job.result = str(result) if result is not None else None
+                job.status = "done"
+            except Exception as exc:
+                job.error, job.status = str(exc), "failed"
+            job.finished = time.time()
+            print(
+                f"[job {job.id}] {job.status} in {job.finished - job.started:.1f}s"
+                + (f": {job.error or job.result}" if job.error or job.result else "")
+            )
+
+
+def _claim_socket(socket_path: Path) -> None:
+    """Remove a stale socket file, refusing to start over a live daemon."""
+    if not socket_path.exists():
+        socket_path.parent.mkdir(parents=True, exist_ok=True)
+        return
+    try:
+        request(socket_path, {"op": "status"})
+    except RuntimeError:
+        socket_path.unlink()
+        return
+    raise RuntimeError(f"An inference daemon is already listening on {socket_path}")
+
+
+def request(socket_path: Path, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Send one JSON request to the daemon and return its JSON reply."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(REQUEST_TIMEOUT)
+        try:
+            client.connect(str(socket_path))
+        except (FileNotFoundError, ConnectionRefusedError) as exc:
+            raise RuntimeError(f"No inference daemon listening on {socket_path}") from exc
+        client.sendall((json.dumps(payload) + "\n").encode())
+        with client.makefile("rb") as reader:
+            line = reader.readline()
+    if not line:
+        raise RuntimeError(f"Inference daemon at {socket_path} closed the connection")
+    response = json.loads(line)
+    if not response.get("ok"):
+        raise RuntimeError(f"Inference daemon error: {response.get('error')}")
+    return response
+
+
+def submit(args: Namespace, socket_path: Path) -> int:
+    """Queue ``args`` on the daemon and return the job id without waiting for it."""
+    if args.display:
+        raise ValueError("--display cannot be combined with --daemon (the daemon has no window).")
+    if is_live_source(args.source) and args.end_seconds is None:
+        # jobs run one at a time, so an endless capture would block every later job
+        raise ValueError("Live sources submitted with --daemon need --end-seconds.")
+    response = request(socket_path, {"op": "submit", "args": encode_args(args)})
+    return response["job"]
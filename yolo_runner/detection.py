@@ -1,18 +1,53 @@
 from __future__ import annotations
 
+import time
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Iterator, Optional, Tuple
 
-import cv2
-from ultralytics import YOLO
+import numpy as np
 
 from .display import close_window, show_frame
+from .frame_cache import FrameCache
+from .live import LatestFrameReader
+from .profiling import NULL_PROFILER, StageProfiler
+from .raw_cache import RawDetectionCache
 from .records import DetectionLogger
-from .video_utils import seek_to_frame
+from .schedule import StrideSchedule, iter_scheduled_frames
+from .video_utils import iter_video_frames
+from .video_writer import AsyncVideoWriter
+
+if TYPE_CHECKING:
+    from ultralytics import YOLO
 
 TRACKER_CONFIG = "ultralytics/cfg/trackers/bytetrack.yaml"
 
 
+def render(
+    result,
+    window_name: str,
+    display: bool,
+    video_writer: Optional[AsyncVideoWriter],
+    profiler: StageProfiler,
+    repeat: int = 1,
+) -> bool:
+    """Draw the result only if a window or video consumes it; False when the user quits.
+
+    ``repeat`` writes the frame that many times, so adaptive-stride videos
+    keep the source frame rate and stay aligned with the log timestamps.
+    """
+    if not display and video_writer is None:
+        return True
+    with profiler.stage("plot"):
+        annotated = result.plot()
+    if video_writer is not None:
+        with profiler.stage("video_write"):
+            video_writer.write(annotated, repeat)
+    if display:
+        with profiler.stage("display"):
+            return show_frame(window_name, annotated)
+    return True
+
+
 def run_tracker_mode(
     model: YOLO,
     source: Path,
@@ -22,35 +57,93 @@ def run_tracker_mode(
     fps: float,
     start_frame: int,
     end_frame: Optional[int],
+    frame_cache: Optional[FrameCache] = None,
+    profiler: StageProfiler = NULL_PROFILER,
+    video_writer: Optional[AsyncVideoWriter] = None,
+    schedule: Optional[StrideSchedule] = None,
 ) -> None:
     window_name = "YOLO ByteTrack"
+    if schedule is not None:
+        frames = iter_scheduled_frames(source, schedule, start_frame, end_frame, frame_cache)
+        box_scale = 1.0 / frame_cache.meta.scale if frame_cache is not None else 1.0
+    elif frame_cache is not None:
+        frames = frame_cache.iter_frames(stride, start_frame, end_frame)
+        box_scale = 1.0 / frame_cache.meta.scale
+    else:
+        frames = None
+    if frames is not None:
+        _run_frame_tracker(
+            model, frames, box_scale, display, logger, fps, profiler, video_writer, schedule
+        )
+        return
     frame_idx = 0
+    results = model.track(
+        source=str(source),
+        tracker=TRACKER_CONFIG,
+        vid_stride=stride,
+        stream=True,
+        show=False,
+        save=False,
+        verbose=False,
+        persist=True,
+    )
     try:
-        for result in model.track(
-            source=str(source),
-            tracker=TRACKER_CONFIG,
-            vid_stride=stride,
-            stream=True,
-            show=False,
-            save=False,
-            verbose=False,
-            persist=True,
-        ):
+        # decoding happens inside model.track, so "model" includes it here
+        for result in profiler.iter("model", results):
             current_frame = frame_idx
             frame_idx += stride
             if current_frame < start_frame:
                 continue
             if end_frame is not None and current_frame > end_frame:
                 break
+            profiler.record_speed(result)
+
+            if not render(result, window_name, display, video_writer, profiler):
+                break
+            with profiler.stage("log"):
+                logger.add(result, current_frame, fps)
+            profiler.frame_done()
+    finally:
+        if display:
+            close_window(window_name)
+    with profiler.stage("log_flush"):
+        logger.flush()
+
 
-            annotated = result.plot()
-            if display and not show_frame(window_name, annotated):
+def _run_frame_tracker(
+    model: YOLO,
+    frames: Iterator[Tuple[int, np.ndarray]],
+    box_scale: float,
+    display: bool,
+    logger: DetectionLogger,
+    fps: float,
+    profiler: StageProfiler = NULL_PROFILER,
+    video_writer: Optional[AsyncVideoWriter] = None,
+    schedule: Optional[StrideSchedule] = None,
+) -> None:
+    """Track frames we decode ourselves (frame cache or adaptive stride)."""
+    window_name = "YOLO ByteTrack"
+    try:
+        for current_frame, frame in profiler.iter("decode", frames):
+            with profiler.stage("model"):
+                result = model.track(
+                    frame, tracker=TRACKER_CONFIG, persist=True, verbose=False
+                )[0]
+            profiler.record_speed(result)
+            sample_gap = _advance(schedule, current_frame, result, profiler)
+            if not render(result, window_name, display, video_writer, profiler, sample_gap or 1):
                 break
-            logger.add(result, current_frame, fps)
+            with profiler.stage("log"):
+                logger.add(result, current_frame, fps, box_scale, sample_gap=sample_gap)
+            profiler.frame_done()
     finally:
+        frames.close()
         if display:
             close_window(window_name)
-    logger.flush()
+        if schedule is not None:
+            print(schedule.summary())
+    with profiler.stage("log_flush"):
+        logger.flush()
 
 
 def run_detection_mode(
@@ -62,40 +155,146 @@ def run_detection_mode(
     fps: float,
     start_frame: int,
     end_frame: Optional[int],
+    frame_cache: Optional[FrameCache] = None,
+    profiler: StageProfiler = NULL_PROFILER,
+    video_writer: Optional[AsyncVideoWriter] = None,
+    schedule: Optional[StrideSchedule] = None,
 ) -> None:
-    cap = cv2.VideoCapture(str(source))
-    if not cap.isOpened():
-        raise RuntimeError(f"Could not open video: {source}")
-
-    if start_frame:
-        seek_to_frame(cap, start_frame)
+    if schedule is not None:
+        frames = iter_scheduled_frames(source, schedule, start_frame, end_frame, frame_cache)
+        box_scale = 1.0 / frame_cache.meta.scale if frame_cache is not None else 1.0
+    elif frame_cache is not None:
+        frames = frame_cache.iter_frames(stride, start_frame, end_frame)
+        box_scale = 1.0 / frame_cache.meta.scale
+    else:
+        frames = iter_video_frames(source, stride, start_frame, end_frame)
+        box_scale = 1.0
 
     window_name = "YOLO detections"
-    frame_idx = start_frame
     try:
-        while True:
-            if end_frame is not None and frame_idx > end_frame:
-                break
+        for current_frame, frame in profiler.iter("decode", frames):
+            with profiler.stage("model"):
+                results = model.predict(frame, verbose=False)
+            result = results[0]
+            profiler.record_speed(result)
+            sample_gap = _advance(schedule, current_frame, result, profiler)
 
-            ret, frame = cap.read()
-            if not ret:
+            with profiler.stage("log"):
+                logger.add(result, current_frame, fps, box_scale, sample_gap=sample_gap)
+
+            if not render(result, window_name, display, video_writer, profiler, sample_gap or 1):
                 break
-            current_frame = frame_idx
+            profiler.frame_done()
+    finally:
+        frames.close()
+        if display:
+            close_window(window_name)
+        if schedule is not None:
+            print(schedule.summary())
+    with profiler.stage("log_flush"):
+        logger.flush()
 
-            results = model.predict(frame, verbose=False)
-            result = results[0]
-            annotated = result.plot()
 
-            logger.add(result, current_frame, fps)
+def _advance(
+    schedule: Optional[StrideSchedule],
+    frame_idx: int,
+    result,
+    profiler: StageProfiler,
+) -> Optional[int]:
+    """Let the schedule pick the next stride; returns the gap to log for this sample."""
+    if schedule is None:
+        return None
+    with profiler.stage("schedule"):
+        schedule.update(frame_idx, result)
+    profiler.gauge("stride", schedule.stride)
+    return schedule.last_gap
 
-            if display and not show_frame(window_name, annotated):
-                break
 
-            frame_idx += stride
-            if stride > 1:
-                seek_to_frame(cap, frame_idx)
+def run_raw_detection_mode(
+    model: YOLO,
+    source: Path,
+    stride: int,
+    cache: RawDetectionCache,
+    start_frame: int,
+    end_frame: Optional[int],
+    frame_cache: Optional[FrameCache] = None,
+    profiler: StageProfiler = NULL_PROFILER,
+) -> None:
+    """Store low-threshold, lightly suppressed detections for offline re-filtering."""
+    if frame_cache is not None:
+        frames = frame_cache.iter_frames(stride, start_frame, end_frame)
+        box_scale = 1.0 / frame_cache.meta.scale
+    else:
+        frames = iter_video_frames(source, stride, start_frame, end_frame)
+        box_scale = 1.0
+
+    try:
+        for current_frame, frame in profiler.iter("decode", frames):
+            with profiler.stage("model"):
+                result = model.predict(
+                    frame,
+                    conf=cache.meta.raw_conf,
+                    iou=cache.meta.raw_iou,
+                    verbose=False,
+                )[0]
+            profiler.record_speed(result)
+            with profiler.stage("log"):
+                cache.add(result, current_frame, box_scale)
+            profiler.frame_done()
+    finally:
+        frames.close()
+    with profiler.stage("log_flush"):
+        cache.flush()
+
+
+def run_live_mode(
+    model: YOLO,
+    reader: LatestFrameReader,
+    tracker: bool,
+    display: bool,
+    logger: DetectionLogger,
+    duration: Optional[float],
+    profiler: StageProfiler = NULL_PROFILER,
+    video_writer: Optional[AsyncVideoWriter] = None,
+) -> None:
+    """Process the newest frame of a live source until stopped or ``duration`` elapses.
+
+    Logged frames are capture sequence numbers and timestamps are wall-clock
+    capture times (seconds since the epoch).
+    """
+    window_name = "YOLO live"
+    deadline = time.monotonic() + duration if duration is not None else None
+    stats = reader.stats
+    try:
+        while deadline is None or time.monotonic() < deadline:
+            with profiler.stage("wait_frame"):
+                item = reader.read(timeout=1.0)
+            if item is None:
+                continue
+            seq, wall_time, frame = item
+            if video_writer is not None and reader.fps:
+                # only takes effect before the first frame starts the encoder
+                video_writer.fps = reader.fps
+            with profiler.stage("model"):
+                if tracker:
+                    result = model.track(
+                        frame, tracker=TRACKER_CONFIG, persist=True, verbose=False
+                    )[0]
+                else:
+                    result = model.predict(frame, verbose=False)[0]
+            profiler.record_speed(result)
+            stats.processed += 1
+            stats.record_latency(time.time() - wall_time)
+            profiler.gauge("dropped_frames", stats.dropped)
+            with profiler.stage("log"):
+                logger.add(result, seq, reader.fps, timestamp=wall_time)
+            if not render(result, window_name, display, video_writer, profiler):
+                break
+            profiler.frame_done()
+    except KeyboardInterrupt:
+        print("Interrupted; stopping live capture.")
     finally:
-        cap.release()
         if display:
             close_window(window_name)
-    logger.flush()
+    with profiler.stage("log_flush"):
+        logger.flush()
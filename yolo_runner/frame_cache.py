@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import json
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .video_utils import seek_to_frame
+
+HEADER_SIZE = 4096
+MAGIC = b"FISHFRM1"
+
+
+@dataclass
+class FrameCacheMeta:
+    source: str
+    source_size: int
+    source_mtime: float
+    fps: float
+    start_frame: int
+    stride: int
+    count: int
+    width: int
+    height: int
+    scale: float
+    max_width: Optional[int] = None
+    complete: bool = False
+
+    def source_frame(self, position: int) -> int:
+        return self.start_frame + position * self.stride
+
+    def matches(self, source: Path, stride: int, start_frame: int, end_frame: Optional[int]) -> bool:
+        """True when this cache was built from ``source`` and covers the requested sampling."""
+        stat = source.stat()
+        if (stat.st_size, stat.st_mtime) != (self.source_size, self.source_mtime):
+            return False
+        if stride % self.stride or start_frame < self.start_frame:
+            return False
+        if (start_frame - self.start_frame) % self.stride:
+            return False
+        if end_frame is None:
+            return self.complete
+        return self.complete or end_frame <= self.source_frame(self.count - 1)
+
+
+class FrameCache:
+    """Decoded frames stored as a memory-mapped ``(count, height, width, 3)`` uint8 array.
+
+    The file is a fixed-size JSON header followed by the raw BGR frames, so
+    reading a frame is a zero-copy slice of the mapping.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        with path.open("rb") as handle:
+            header = handle.read(HEADER_SIZE)
+        if not header.startswith(MAGIC):
+            raise ValueError(f"Not a frame cache: {path}")
+        payload = header[len(MAGIC):].rstrip(b"\0")
+        self.meta = FrameCacheMeta(**json.loads(payload))
+        shape = (self.meta.count, self.meta.height, self.meta.width, 3)
+        self.frames = (
+            np.memmap(path, dtype=np.uint8, mode="r", offset=HEADER_SIZE, shape=shape)
+            if self.meta.count
+            else np.empty(shape, dtype=np.uint8)
+        )
+
+    def __len__(self) -> int:
+        return self.meta.count
+
+    def iter_frames(
+        self, stride: int, start_frame: int, end_frame: Optional[int]
+    ) -> Iterator[Tuple[int, np.ndarray]]:
+        """Yield ``(source_frame_idx, frame)`` for the requested sampling of the cached clip."""
+        meta = self.meta
+        step = max(1, stride // meta.stride)
+        first = max(0, -(-(start_frame - meta.start_frame) // meta.stride))
+        for position in range(first, meta.count, step):
+            frame_idx = meta.source_frame(position)
+            if end_frame is not None and frame_idx > end_frame:
+                break
+            yield frame_idx, self.frames[position]
+
+
+def _write_header(handle, meta: FrameCacheMeta) -> None:
+    payload = MAGIC + json.dumps(asdict(meta)).encode()
+    if len(payload) > HEADER_SIZE:
+        raise ValueError("Frame cache metadata does not fit in the header.")
+    handle.seek(0)
+    handle.write(payload.ljust(HEADER_SIZE, b"\0"))
+
+
+def build_frame_cache(
+    source: Path,
+    output: Path,
+    stride: int = 1,
+    start_frame: int = 0,
+    end_frame: Optional[int] = None,
+    max_width: Optional[int] = None,
+) -> FrameCache:
+    """Decode ``source`` once (every ``stride`` frames, optionally downscaled) into ``output``."""
+    cap = cv2.VideoCapture(str(source))
+    if not cap.isOpened():
+        raise RuntimeError(f"Could not open video: {source}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    if start_frame:
+        seek_to_frame(cap, start_frame)
+
+    stat = source.stat()
+    meta = FrameCacheMeta(
+        source=str(source),
+        source_size=stat.st_size,
+        source_mtime=stat.st_mtime,
+        fps=fps,
+        start_frame=start_frame,
+        stride=max(1, stride),
+        count=0,
+        width=0,
+        height=0,
+        scale=1.0,
+        max_width=max_width,
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output.with_name(output.name + ".tmp")
+    frame_idx = start_frame
+    try:
+        with tmp_path.open("wb") as handle:
+            _write_header(handle, meta)
+            while end_frame is None or frame_idx <= end_frame:
+                ret, frame = cap.read()
+                if not ret:
+                    meta.complete = True
+                    break
+                if meta.count == 0:
+                    height, width = frame.shape[:2]
+                    if max_width and width > max_width:
+                        meta.scale = max_width / width
+                    meta.width = int(round(width * meta.scale))
+                    meta.height = int(round(height * meta.scale))
+                if meta.scale != 1.0:
+                    frame = cv2.resize(
+                        frame, (meta.width, meta.height), interpolation=cv2.INTER_AREA
+                    )
+                handle.write(np.ascontiguousarray(frame).tobytes())
+                meta.count += 1
+                # grab() skips the colour conversion for frames we do not keep
+                for _ in range(meta.stride - 1):
+                    if not cap.grab():
+                        break
+                frame_idx += meta.stride
+            _write_header(handle, meta)
+    finally:
+        cap.release()
+    tmp_path.replace(output)
+    print(f"Cached {meta.count} frames ({meta.width}x{meta.height}) to {output}")
+    return FrameCache(output)
+
+
+def open_or_build_frame_cache(
+    path: Path,
+    source: Path,
+    stride: int,
+    start_frame: int,
+    end_frame: Optional[int],
+    max_width: Optional[int] = None,
+) -> FrameCache:
+    """Reuse ``path`` when it covers the requested run, otherwise (re)build it."""
+    if path.exists():
+        cache = FrameCache(path)
+        if (
+            cache.meta.max_width == max_width
+            and cache.meta.matches(source, stride, start_frame, end_frame)
+        ):
+            return cache
+        del cache
+    return build_frame_cache(source, path, stride, start_frame, end_frame, max_width)
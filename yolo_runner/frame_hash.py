@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import cv2
+import numpy as np
+
+HASH_SIZE = 8
+# popcount of every byte value, for numpy versions without np.bitwise_count
+_POPCOUNT8 = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+
+def dhash(frame: np.ndarray) -> int:
+    """64-bit difference hash: sign of horizontal gradients on a 9x8 grayscale thumbnail."""
+    gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (HASH_SIZE + 1, HASH_SIZE), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int(np.packbits(bits).view(">u8")[0])
+
+
+def hamming(hashes: np.ndarray, value: int) -> np.ndarray:
+    """Bit distance between ``value`` and every entry of a ``uint64`` array."""
+    xor = hashes ^ np.uint64(value)
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(xor)
+    return _POPCOUNT8[xor.view(np.uint8)].reshape(-1, 8).sum(axis=1)
+
+
+class HashIndex:
+    """Perceptual hashes of accepted frames with a vectorized nearest-distance query."""
+
+    def __init__(self, capacity: int = 1024) -> None:
+        self._hashes = np.zeros(capacity, dtype=np.uint64)
+        self.size = 0
+
+    def nearest(self, value: int) -> int:
+        """Smallest Hamming distance to any stored hash (65 when empty)."""
+        if not self.size:
+            return HASH_SIZE * HASH_SIZE + 1
+        return int(hamming(self._hashes[: self.size], value).min())
+
+    def add(self, value: int) -> None:
+        if self.size == len(self._hashes):
+            self._hashes = np.concatenate([self._hashes, np.zeros_like(self._hashes)])
+        self._hashes[self.size] = value
+        self.size += 1
+
+    def add_if_new(self, value: int, threshold: int) -> bool:
+        """Store ``value`` unless a stored hash is within ``threshold`` bits."""
+        if self.nearest(value) <= threshold:
+            return False
+        self.add(value)
+        return True
@@ -0,0 +1,382 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .overlay import PALETTE
+
+HEATMAP_COLUMNS = ("frame", "timestamp", "track_id", "x1", "y1", "x2", "y2")
+DEFAULT_CELL = 8
+# consecutive samples of a track further apart than this are not joined
+MAX_TRAJECTORY_GAP = 300
+# layer keys are (log index << TRACK_KEY_BITS) | track id or window index
+TRACK_KEY_BITS = 32
+STATE_VERSION = 2
+
+
+class SparseLayers:
+    """Per-key grid counts stored only for the cells a key actually visited.
+
+    Counts live in one sorted array of ``slot * size + cell`` codes, so
+    thousands of short tracks cost what they touch rather than a full grid
+    each. ``layer`` expands a single key to a dense grid for rendering.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.keys: List[int] = []
+        self._slots: Dict[int, int] = {}
+        self.codes = np.zeros(0, dtype=np.int64)
+        self.counts = np.zeros(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __bool__(self) -> bool:
+        return bool(self.keys)
+
+    def add(self, keys: np.ndarray, cells: np.ndarray) -> None:
+        if not len(keys):
+            return
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        slots = np.empty(len(unique_keys), dtype=np.int64)
+        for index, key in enumerate(unique_keys.tolist()):
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = self._slots[key] = len(self.keys)
+                self.keys.append(key)
+            slots[index] = slot
+        codes = np.concatenate([self.codes, slots[inverse] * self.size + cells])
+        counts = np.concatenate([self.counts, np.ones(len(cells), dtype=np.int64)])
+        order = np.argsort(codes, kind="stable")
+        codes, counts = codes[order], counts[order]
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        self.codes = codes[starts]
+        self.counts = np.add.reduceat(counts, starts)
+
+    def layer(self, key: int) -> np.ndarray:
+        slot = self._slots[key]
+        low, high = np.searchsorted(self.codes, [slot * self.size, (slot + 1) * self.size])
+        dense = np.zeros(self.size, dtype=np.int64)
+        dense[self.codes[low:high] - slot * self.size] = self.counts[low:high]
+        return dense
+
+    def totals(self) -> Dict[int, int]:
+        sums = np.bincount(self.codes // self.size, weights=self.counts, minlength=len(self.keys))
+        return {key: int(total) for key, total in zip(self.keys, sums.tolist())}
+
+    def to_arrays(self, prefix: str) -> Dict[str, np.ndarray]:
+        return {
+            f"{prefix}_keys": np.array(self.keys, dtype=np.int64),
+            f"{prefix}_codes": self.codes,
+            f"{prefix}_counts": self.counts,
+        }
+
+    @classmethod
+    def from_arrays(cls, size: int, data, prefix: str) -> "SparseLayers":
+        layers = cls(size)
+        if f"{prefix}_keys" in data.files:
+            layers.keys = data[f"{prefix}_keys"].tolist()
+            layers._slots = {key: slot for slot, key in enumerate(layers.keys)}
+            layers.codes = data[f"{prefix}_codes"]
+            layers.counts = data[f"{prefix}_counts"]
+        return layers
+
+
+class OccupancyAccumulator:
+    """Bin box centres into a fixed grid, chunk by chunk and file by file.
+
+    Memory is the grid, the trajectory canvas and the sparse per-window and
+    per-track counts (one entry per visited cell), independent of how many
+    detections are folded in. Counts of each chunk are one ``np.bincount``.
+    Track ids restart and video time restarts in every log, so both layer
+    kinds are keyed by ``(log, track)`` and ``(log, window)``.
+    """
+
+    def __init__(
+        self,
+        size: Tuple[int, int],
+        cell: int = DEFAULT_CELL,
+        window_seconds: Optional[float] = None,
+        track_layers: bool = False,
+        trajectories: bool = False,
+    ) -> None:
+        self.width, self.height = size
+        self.cell = cell
+        self.cols = -(-self.width // cell)
+        self.rows = -(-self.height // cell)
+        self.window_seconds = window_seconds
+        self.track_layers = track_layers
+        self.total = np.zeros(self.rows * self.cols, dtype=np.int64)
+        self.windows = SparseLayers(self.total.size)
+        self.tracks = SparseLayers(self.total.size)
+        self.canvas = np.zeros((self.height, self.width, 3), dtype=np.uint8) if trajectories else None
+        self.sources: List[Dict[str, float]] = []
+        self.detections = 0
+        self._last_point: Dict[int, Tuple[int, int, int]] = {}
+
+    def begin_log(self, path: Path) -> None:
+        """Track ids restart in every log, so open trajectories end here."""
+        stat = path.stat()
+        self.sources.append({"path": str(path), "size": stat.st_size, "mtime": stat.st_mtime})
+        self._last_point.clear()
+
+    def has_log(self, path: Path) -> bool:
+        """Whether ``path`` is already folded in; a known log that changed since is an error.
+
+        Counts cannot be subtracted again, so adding the new contents would
+        count the rewritten log twice.
+        """
+        stat = path.stat()
+        for source in self.sources:
+            if source["path"] != str(path):
+                continue
+            if source["size"] == stat.st_size and source["mtime"] == stat.st_mtime:
+                return True
+            raise ValueError(
+                f"{path} changed after it was added to the saved grids; "
+                "rebuild the --state file to include the new version."
+            )
+        return False
+
+    def add(
+        self,
+        frames: np.ndarray,
+        timestamps: np.ndarray,
+        tracks: np.ndarray,
+        valid: np.ndarray,
+        boxes: np.ndarray,
+    ) -> None:
+        if not len(frames):
+            return
+        self.detections += len(frames)
+        cx = (boxes[:, 0] + boxes[:, 2]) / 2
+        cy = (boxes[:, 1] + boxes[:, 3]) / 2
+        col = np.clip((cx // self.cell).astype(np.int64), 0, self.cols - 1)
+        row = np.clip((cy // self.cell).astype(np.int64), 0, self.rows - 1)
+        cells = row * self.cols + col
+        self.total += np.bincount(cells, minlength=self.total.size)
+        log_key = max(len(self.sources) - 1, 0) << TRACK_KEY_BITS
+        if self.window_seconds:
+            known = ~np.isnan(timestamps)
+            windows = (timestamps[known] // self.window_seconds).astype(np.int64)
+            self.windows.add(log_key | windows, cells[known])
+        if self.track_layers and valid.any():
+            self.tracks.add(log_key | tracks[valid], cells[valid])
+        if self.canvas is not None and valid.any():
+            self._draw(frames[valid], tracks[valid], cx[valid], cy[valid])
+
+    def _draw(self, frames: np.ndarray, tracks: np.ndarray, cx: np.ndarray, cy: np.ndarray) -> None:
+        order = np.lexsort((frames, tracks))
+        frames, tracks = frames[order], tracks[order]
+        points = np.stack([cx[order], cy[order]], axis=1).round().astype(np.int32)
+        starts = np.flatnonzero(np.r_[True, tracks[1:] != tracks[:-1]])
+        for start, stop in zip(starts, np.r_[starts[1:], len(tracks)]):
+            track_id = int(tracks[start])
+            segment, seg_frames = points[start:stop], frames[start:stop]
+            previous = self._last_point.get(track_id)
+            if previous is not None and seg_frames[0] - previous[0] <= MAX_TRAJECTORY_GAP:
+                segment = np.vstack([[previous[1:]], segment])
+                seg_frames = np.r_[previous[0], seg_frames]
+            # split the polyline wherever the track disappeared for too long
+            breaks = np.flatnonzero(np.diff(seg_frames) > MAX_TRAJECTORY_GAP) + 1
+            pieces = [piece for piece in np.split(segment, breaks) if len(piece) > 1]
+            if pieces:
+                color = PALETTE[track_id % len(PALETTE)]
+                cv2.polylines(self.canvas, pieces, False, color, 1, cv2.LINE_AA)
+            self._last_point[track_id] = (int(seg_frames[-1]), *segment[-1].tolist())
+
+    def _split_key(self, key: int) -> Tuple[str, int]:
+        log_index, value = key >> TRACK_KEY_BITS, key & ((1 << TRACK_KEY_BITS) - 1)
+        return Path(self.sources[log_index]["path"]).stem, value
+
+    def track_layer_name(self, key: int) -> str:
+        stem, track_id = self._split_key(key)
+        return f"{stem}_track{track_id}"
+
+    def window_layer_name(self, key: int) -> str:
+        stem, window = self._split_key(key)
+        return f"{stem}_window_{int(window * self.window_seconds):06d}s"
+
+    def settings_mismatch(
+        self,
+        size: Optional[Tuple[int, int]] = None,
+        cell: Optional[int] = None,
+        window_seconds: Optional[float] = None,
+        track_layers: bool = False,
+        trajectories: bool = False,
+    ) -> List[str]:
+        """Requested settings that differ from the ones these grids were built with."""
+        problems = []
+        if size is not None and tuple(size) != (self.width, self.height):
+            problems.append(f"size {size[0]}x{size[1]} (saved {self.width}x{self.height})")
+        if cell is not None and cell != self.cell:
+            problems.append(f"cell {cell} (saved {self.cell})")
+        if window_seconds is not None and window_seconds != self.window_seconds:
+            problems.append(f"window {window_seconds:g}s (saved {self.window_seconds})")
+        if track_layers and not self.track_layers:
+            problems.append("track layers (not saved)")
+        if trajectories and self.canvas is None:
+            problems.append("trajectories (not saved)")
+        return problems
+
+    def grid(self, layer: Optional[np.ndarray] = None) -> np.ndarray:
+        values = self.total if layer is None else layer
+        return values.reshape(self.rows, self.cols)
+
+    def save(self, path: Path) -> None:
+        """Persist the grids so later runs can fold in only new logs."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        arrays = {"total": self.total}
+        arrays.update(self.windows.to_arrays("windows"))
+        arrays.update(self.tracks.to_arrays("tracks"))
+        if self.canvas is not None:
+            arrays["canvas"] = self.canvas
+        meta = {
+            "size": [self.width, self.height],
+            "cell": self.cell,
+            "window_seconds": self.window_seconds,
+            "track_layers": self.track_layers,
+            "trajectories": self.canvas is not None,
+            "sources": self.sources,
+            "detections": self.detections,
+            "version": STATE_VERSION,
+        }
+        with path.open("wb") as handle:
+            np.savez_compressed(handle, meta=np.array(json.dumps(meta)), **arrays)
+
+    @classmethod
+    def load(cls, path: Path) -> "OccupancyAccumulator":
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("version") != STATE_VERSION:
+                raise ValueError(f"{path} was saved by an older version; rebuild it without --state.")
+            accumulator = cls(
+                tuple(meta["size"]),
+                meta["cell"],
+                meta["window_seconds"],
+                meta["track_layers"],
+                meta["trajectories"],
+            )
+            accumulator.total = data["total"]
+            accumulator.windows = SparseLayers.from_arrays(accumulator.total.size, data, "windows")
+            accumulator.tracks = SparseLayers.from_arrays(accumulator.total.size, data, "tracks")
+            if "canvas" in data.files:
+                accumulator.canvas = data["canvas"]
+        accumulator.sources = meta["sources"]
+        accumulator.detections = meta["detections"]
+        return accumulator
+
+
+def batch_arrays(batch) -> Tuple[np.ndarray, ...]:
+    """``frames, timestamps, tracks, valid, boxes`` from an Arrow batch of a detection log."""
+    import pyarrow as pa
+
+    frames = batch.column("frame").to_numpy(zero_copy_only=False).astype(np.int64)
+    names = batch.schema.names
+    column = batch.column("timestamp") if "timestamp" in names else None
+    if column is None or pa.types.is_null(column.type):
+        timestamps = np.full(len(frames), np.nan)
+    else:
+        timestamps = column.cast(pa.float64()).fill_null(np.nan).to_numpy(zero_copy_only=False)
+    # raw detection caches have neither timestamps nor track ids
+    column = batch.column("track_id") if "track_id" in names else None
+    if column is None or pa.types.is_null(column.type):
+        valid = np.zeros(len(frames), dtype=bool)
+        tracks = np.zeros(len(frames), dtype=np.int64)
+    else:
+        valid = column.is_valid().to_numpy(zero_copy_only=False)
+        tracks = column.fill_null(0).cast(pa.int64()).to_numpy(zero_copy_only=False)
+    boxes = np.stack(
+        [
+            batch.column(name).cast(pa.float32()).to_numpy(zero_copy_only=False)
+            for name in ("x1", "y1", "x2", "y2")
+        ],
+        axis=1,
+    )
+    return frames, timestamps, tracks, valid, boxes
+
+
+def accumulate_logs(
+    accumulator: OccupancyAccumulator,
+    paths: Iterable[Path],
+    batch_rows: int = 1 << 18,
+) -> int:
+    """Stream every log into ``accumulator``; logs it already holds are skipped."""
+    import pyarrow.parquet as pq
+
+    # check every log first so a changed one fails before anything is added
+    todo = [path for path in paths if not accumulator.has_log(path)]
+    for path in todo:
+        accumulator.begin_log(path)
+        parquet = pq.ParquetFile(path)
+        columns = [name for name in HEATMAP_COLUMNS if name in parquet.schema_arrow.names]
+        for batch in parquet.iter_batches(batch_size=batch_rows, columns=columns):
+            accumulator.add(*batch_arrays(batch))
+    return len(todo)
+
+
+def frame_size_from_logs(paths: Iterable[Path]) -> Tuple[int, int]:
+    """Bounding size of all boxes, read from Parquet column statistics (no row scan)."""
+    import pyarrow.parquet as pq
+
+    width = height = 0.0
+    for path in paths:
+        metadata = pq.ParquetFile(path).metadata
+        names = metadata.schema.names
+        for group in range(metadata.num_row_groups):
+            row_group = metadata.row_group(group)
+            for name in ("x2", "y2"):
+                stats = row_group.column(names.index(name)).statistics
+                if stats is None or not stats.has_min_max:
+                    continue
+                if name == "x2":
+                    width = max(width, stats.max)
+                else:
+                    height = max(height, stats.max)
+    if not width or not height:
+        raise ValueError("Could not infer the frame size; pass --reference or --size.")
+    return int(np.ceil(width)), int(np.ceil(height))
+
+
+def render_heatmap(
+    accumulator: OccupancyAccumulator,
+    layer: Optional[np.ndarray] = None,
+    background: Optional[np.ndarray] = None,
+    alpha: float = 0.6,
+) -> np.ndarray:
+    """Colour-map a grid (log-scaled) at frame size, blended over ``background``."""
+    grid = accumulator.grid(layer).astype(np.float32)
+    scaled = np.log1p(grid)
+    peak = scaled.max()
+    if peak > 0:
+        scaled /= peak
+    image = cv2.resize(
+        (scaled * 255).astype(np.uint8),
+        (accumulator.cols * accumulator.cell, accumulator.rows * accumulator.cell),
+        interpolation=cv2.INTER_NEAREST,
+    )[: accumulator.height, : accumulator.width]
+    colored = cv2.applyColorMap(image, cv2.COLORMAP_INFERNO)
+    if background is None:
+        return colored
+    base = cv2.resize(background, (accumulator.width, accumulator.height))
+    mask = (image > 0)[..., None]
+    blended = cv2.addWeighted(base, 1 - alpha, colored, alpha, 0)
+    return np.where(mask, blended, base)
+
+
+def render_trajectories(
+    accumulator: OccupancyAccumulator, background: Optional[np.ndarray] = None
+) -> np.ndarray:
+    if accumulator.canvas is None:
+        raise ValueError("Trajectories were not accumulated.")
+    if background is None:
+        return accumulator.canvas.copy()
+    base = cv2.resize(background, (accumulator.width, accumulator.height))
+    base = (base * 0.5).astype(np.uint8)
+    drawn = accumulator.canvas.any(axis=2)[..., None]
+    return np.where(drawn, accumulator.canvas, base)
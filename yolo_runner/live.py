@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+STATS_WINDOW = 10_000
+
+
+@dataclass
+class LiveStats:
+    captured: int = 0
+    processed: int = 0
+    dropped: int = 0
+    reconnects: int = 0
+    latencies: List[float] = field(default_factory=list)
+
+    def record_latency(self, seconds: float) -> None:
+        if len(self.latencies) >= STATS_WINDOW:
+            del self.latencies[: STATS_WINDOW // 2]
+        self.latencies.append(seconds)
+
+    def summary(self) -> str:
+        lines = [
+            f"Frames captured: {self.captured}",
+            f"Frames processed: {self.processed}",
+            f"Frames dropped (superseded by newer frames): {self.dropped}",
+            f"Reconnects: {self.reconnects}",
+        ]
+        if self.latencies:
+            values = np.asarray(self.latencies) * 1000
+            lines.append(
+                "Capture-to-result latency ms: "
+                f"p50={np.percentile(values, 50):.1f} "
+                f"p95={np.percentile(values, 95):.1f} max={values.max():.1f}"
+            )
+        return "\n".join(lines)
+
+
+class LatestFrameReader:
+    """Capture thread that keeps only the newest frame of a live source.
+
+    Older frames are overwritten (and counted as dropped) when inference is
+    slower than the stream, so the consumer never falls behind real time.
+    Lost connections are retried with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        max_backoff: float = 30.0,
+        initial_backoff: float = 0.5,
+    ) -> None:
+        self.source = int(source) if source.isdigit() else source
+        self.max_backoff = max_backoff
+        self.initial_backoff = initial_backoff
+        self.stats = LiveStats()
+        self.fps = 0.0
+        self._cond = threading.Condition()
+        self._frame: Optional[np.ndarray] = None
+        self._seq = -1
+        self._wall_time = 0.0
+        self._delivered_seq = -1
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="live-capture", daemon=True)
+
+    def start(self) -> "LatestFrameReader":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+        with self._cond:
+            self._cond.notify_all()
+        self._thread.join(timeout=5)
+
+    def __enter__(self) -> "LatestFrameReader":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _open(self) -> Optional[cv2.VideoCapture]:
+        cap = cv2.VideoCapture(self.source)
+        if not cap.isOpened():
+            cap.release()
+            return None
+        # ask the backend not to queue frames on our behalf
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        self.fps = cap.get(cv2.CAP_PROP_FPS) or self.fps
+        return cap
+
+    def _run(self) -> None:
+        backoff = self.initial_backoff
+        first = True
+        while not self._stopped.is_set():
+            cap = self._open()
+            if cap is None:
+                print(f"Could not open {self.source}; retrying in {backoff:.1f}s")
+                self._stopped.wait(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+                continue
+            if not first:
+                self.stats.reconnects += 1
+                print(f"Reconnected to {self.source}")
+            first = False
+            try:
+                while not self._stopped.is_set():
+                    ret, frame = cap.read()
+                    if not ret:
+                        print(f"Lost stream {self.source}; reconnecting")
+                        break
+                    # only a stream that delivers frames resets the backoff
+                    backoff = self.initial_backoff
+                    self._publish(frame)
+            finally:
+                cap.release()
+            self._stopped.wait(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    def _publish(self, frame: np.ndarray) -> None:
+        with self._cond:
+            if self._seq > self._delivered_seq:
+                self.stats.dropped += 1
+            self._seq += 1
+            self._frame = frame
+            self._wall_time = time.time()
+            self.stats.captured += 1
+            self._cond.notify()
+
+    def read(self, timeout: Optional[float] = None) -> Optional[Tuple[int, float, np.ndarray]]:
+        """Block until a frame newer than the last one returned is available.
+
+        Returns ``(sequence, capture_wall_time, frame)`` or ``None`` once stopped
+        or when ``timeout`` elapses.
+        """
+        with self._cond:
+            ready = self._cond.wait_for(
+                lambda: self._seq > self._delivered_seq or self._stopped.is_set(),
+                timeout=timeout,
+            )
+            if not ready or self._stopped.is_set():
+                return None
+            self._delivered_seq = self._seq
+            return self._seq, self._wall_time, self._frame
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import glob
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .raw_cache import read_raw_meta
+from .summary import FrameCoverage, LogSummary, SummaryBuilder, load_summary, write_summary
+
+SCAN_COLUMNS = ("frame", "timestamp", "track_id", "class_id")
+BATCH_ROWS = 1 << 18
+
+
+def resolve_logs(specs: Iterable[str]) -> List[Path]:
+    """Expand files, directories (``*.parquet`` inside) and glob patterns into log paths."""
+    paths: List[Path] = []
+    for spec in specs:
+        path = Path(spec).expanduser()
+        if path.is_dir():
+            matches = sorted(path.glob("*.parquet"))
+        elif path.exists():
+            matches = [path]
+        else:
+            matches = sorted(Path(match) for match in glob.glob(str(path), recursive=True))
+        if not matches:
+            raise FileNotFoundError(f"No Parquet logs found for {spec}")
+        paths.extend(matches)
+    # keep the first occurrence when patterns overlap
+    return list(dict.fromkeys(paths))
+
+
+def _batch_arrays(batch) -> Tuple[np.ndarray, ...]:
+    import pyarrow as pa
+
+    frames = batch.column("frame").to_numpy(zero_copy_only=False).astype(np.int64)
+    names = batch.schema.names
+    if "track_id" in names and not pa.types.is_null(batch.column("track_id").type):
+        column = batch.column("track_id")
+        valid = column.is_valid().to_numpy(zero_copy_only=False)
+        tracks = column.fill_null(0).cast(pa.int64()).to_numpy(zero_copy_only=False)
+    else:
+        valid = np.zeros(len(frames), dtype=bool)
+        tracks = np.zeros(len(frames), dtype=np.int64)
+    if "class_id" in names:
+        classes = batch.column("class_id").fill_null(-1).cast(pa.int64()).to_numpy(zero_copy_only=False)
+    else:
+        classes = np.zeros(len(frames), dtype=np.int64)
+    if "timestamp" in names and not pa.types.is_null(batch.column("timestamp").type):
+        timestamps = (
+            batch.column("timestamp")
+            .cast(pa.float64())
+            .fill_null(np.nan)
+            .to_numpy(zero_copy_only=False)
+        )
+    else:
+        timestamps = np.full(len(frames), np.nan)
+    return frames, tracks, valid, classes, timestamps
+
+
+def scan_log(path: Path, batch_rows: int = BATCH_ROWS) -> LogSummary:
+    """Summarise one log, streamed in ``batch_rows`` batches.
+
+    Only ``frame``/``timestamp``/``track_id``/``class_id`` are read. Logs are written in
+    frame order, so everything before the last frame of a batch is final and
+    only that frame's rows are carried into the next batch. A log that turns
+    out not to be frame-ordered is re-counted in one pass.
+    """
+    import pyarrow.parquet as pq
+
+    parquet = pq.ParquetFile(path)
+    columns = [name for name in SCAN_COLUMNS if name in parquet.schema_arrow.names]
+    if "frame" not in columns:
+        raise ValueError(f"{path} has no 'frame' column; is it a detection log?")
+    builder = SummaryBuilder()
+    pending: Optional[Tuple[np.ndarray, ...]] = None
+    for batch in parquet.iter_batches(batch_size=batch_rows, columns=columns):
+        arrays = _batch_arrays(batch)
+        if pending is not None:
+            arrays = tuple(np.concatenate([old, new]) for old, new in zip(pending, arrays))
+        frames = arrays[0]
+        if not len(frames):
+            continue
+        if np.any(frames[1:] < frames[:-1]):
+            return _scan_unordered(parquet, columns)
+        split = int(np.searchsorted(frames, frames[-1]))
+        builder.add(*(array[:split] for array in arrays))
+        pending = tuple(array[split:] for array in arrays)
+    if pending is not None:
+        builder.add(*pending)
+    return builder.build()
+
+
+def _scan_unordered(parquet, columns: List[str]) -> LogSummary:
+    parts = [_batch_arrays(batch) for batch in parquet.iter_batches(columns=columns)]
+    builder = SummaryBuilder()
+    builder.add(*(np.concatenate(arrays) for arrays in zip(*parts)))
+    return builder.build()
+
+
+def load_or_scan(path: Path, batch_rows: int = BATCH_ROWS, rescan: bool = False) -> LogSummary:
+    """Answer from the log's summary sidecar when it is current, else scan and refresh it."""
+    if not rescan:
+        summary = load_summary(path)
+        if summary is not None:
+            return summary
+    return _scan_and_store(path, batch_rows)
+
+
+def _scan_and_store(path: Path, batch_rows: int) -> LogSummary:
+    summary = scan_log(path, batch_rows)
+    try:
+        write_summary(path, summary)
+    except OSError as exc:  # read-only archives still get analysed
+        print(f"Could not write summary sidecar for {path}: {exc}")
+    return summary
+
+
+def scan_logs(
+    paths: Sequence[Path],
+    workers: Optional[int] = None,
+    batch_rows: int = BATCH_ROWS,
+    rescan: bool = False,
+    raw: Optional[Callable[[Path], FrameCoverage]] = None,
+) -> List[FrameCoverage]:
+    """Coverage of several logs, scanned concurrently; pyarrow decoding releases the GIL.
+
+    With ``raw``, raw detection caches among ``paths`` are recognised by the
+    workers (logs with a current summary never need their footer read) and
+    handed to it.
+    """
+
+    def coverage(path: Path) -> FrameCoverage:
+        summary = None if rescan else load_summary(path)
+        if summary is None:
+            if raw is not None and read_raw_meta(path) is not None:
+                return raw(path)
+            summary = _scan_and_store(path, batch_rows)
+        return summary.coverage(path)
+
+    if len(paths) == 1 or workers == 1:
+        return [coverage(path) for path in paths]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(coverage, paths))
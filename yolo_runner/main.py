@@ -1,52 +1,217 @@
 from pathlib import Path
-from ultralytics import YOLO
-from .args import parse_args
-from .detection import run_detection_mode, run_tracker_mode
+from typing import Callable, Optional
+
+from .args import REALTIME, is_live_source, live_conflicts
+from .detection import (
+    run_detection_mode,
+    run_live_mode,
+    run_raw_detection_mode,
+    run_tracker_mode,
+)
+from .frame_cache import open_or_build_frame_cache
+from .live import LatestFrameReader
+from .profiling import StageProfiler, set_active_profiler
+from .raw_cache import RawCacheMeta, RawDetectionCache, raw_cache_path, read_raw_meta
 from .records import DetectionLogger
-from .video_utils import compute_frame_bounds, read_fps
+from .schedule import StrideSchedule
+from .video_utils import compute_frame_bounds, read_fps, read_frame_count
+from .video_writer import AsyncVideoWriter
+
+
+def load_model(weights: Path):
+    """Import ultralytics (and torch) only once a model is actually needed."""
+    from ultralytics import YOLO
+
+    return YOLO(str(weights))
 
 
-def run_cli() -> None:
-    args = parse_args()
-    run(args)
+def run(args, model_loader: Callable[[Path], object] = load_model):
+    profile_dest = getattr(args, "profile", None)
+    profiler = StageProfiler(
+        enabled=profile_dest is not None or getattr(args, "metrics", False)
+    )
+    set_active_profiler(profiler)
+    try:
+        return _run(args, profiler, model_loader)
+    finally:
+        profiler.finish()
+        if profile_dest is not None:
+            print(profiler.summary())
+            report = profiler.write_json(profile_dest)
+            print(f"Wrote profile to {report}")
 
 
-def run(args):
+def _run(args, profiler: StageProfiler, model_loader: Callable[[Path], object]):
     source: Path = args.source
     weights: Path = args.weights
 
+    time_budget = getattr(args, "time_budget", None)
+    if is_live_source(source):
+        # the CLI rejects these already; callers passing a Namespace directly may not
+        conflicts = live_conflicts(args)
+        if conflicts:
+            raise ValueError(conflicts)
+        return run_live(args, profiler, model_loader)
     if not source.exists():
         raise FileNotFoundError(f"Video source does not exist: {source}")
     if not weights.exists():
         raise FileNotFoundError(f"Missing model weights: {weights}")
 
-    model = YOLO(str(weights))
     fps = read_fps(source)
     start_frame, end_frame = compute_frame_bounds(
         fps, args.start_seconds, args.end_seconds
     )
-    logger = DetectionLogger(args.log_parquet, args.progress_interval)
+    raw_cache_dir = getattr(args, "raw_cache", None)
+    if raw_cache_dir is not None and time_budget is not None:
+        raise ValueError("--raw-cache needs a fixed --stride; drop --time-budget.")
+    raw_path = None
+    if raw_cache_dir is not None:
+        raw_path = raw_cache_path(raw_cache_dir, source, weights)
+        meta = read_raw_meta(raw_path) if raw_path.exists() else None
+        if meta is not None and meta.covers(args.stride, start_frame, end_frame):
+            print(f"Raw detections already cached at {raw_path}")
+            return raw_path
 
-    if args.tracker:
-        log_path = run_tracker_mode(
-            model=model,
-            source=source,
-            stride=args.stride,
-            display=args.display,
-            logger=logger,
-            fps=fps,
-            start_frame=start_frame,
-            end_frame=end_frame,
+    # built only once we know there is work to do; decoding the clip is the expensive part
+    frame_cache = None
+    cache_path = getattr(args, "frame_cache", None)
+    if cache_path is not None:
+        frame_cache = open_or_build_frame_cache(
+            cache_path,
+            source,
+            args.stride,
+            start_frame,
+            end_frame,
+            getattr(args, "cache_width", None),
+        )
+
+    with profiler.stage("model_load"):
+        model = model_loader(weights)
+    if raw_path is not None:
+        cache = RawDetectionCache(
+            raw_path,
+            RawCacheMeta(
+                source=str(source),
+                fps=fps,
+                stride=args.stride,
+                start_frame=start_frame,
+                end_frame=end_frame,
+            ),
         )
-    else:
-        log_path = run_detection_mode(
+        run_raw_detection_mode(
             model=model,
             source=source,
             stride=args.stride,
-            display=args.display,
-            logger=logger,
-            fps=fps,
+            cache=cache,
             start_frame=start_frame,
             end_frame=end_frame,
+            frame_cache=frame_cache,
+            profiler=profiler,
         )
+        return raw_path
+
+    logger = DetectionLogger(args.log_parquet, args.progress_interval)
+    video_path = getattr(args, "save_video", None)
+    # adaptive runs repeat each sample for its gap, so they are written at the source rate
+    video_fps = fps if time_budget is not None else fps / max(1, args.stride)
+    video_writer = (
+        AsyncVideoWriter(video_path, video_fps) if video_path is not None else None
+    )
+
+    schedule = None
+    if time_budget is not None:
+        schedule = build_schedule(args, source, fps, start_frame, end_frame)
+
+    try:
+        if args.tracker:
+            run_tracker_mode(
+                model=model,
+                source=source,
+                stride=args.stride,
+                display=args.display,
+                logger=logger,
+                fps=fps,
+                start_frame=start_frame,
+                end_frame=end_frame,
+                frame_cache=frame_cache,
+                profiler=profiler,
+                video_writer=video_writer,
+                schedule=schedule,
+            )
+        else:
+            run_detection_mode(
+                model=model,
+                source=source,
+                stride=args.stride,
+                display=args.display,
+                logger=logger,
+                fps=fps,
+                start_frame=start_frame,
+                end_frame=end_frame,
+                frame_cache=frame_cache,
+                profiler=profiler,
+                video_writer=video_writer,
+                schedule=schedule,
+            )
+    finally:
+        if video_writer is not None:
+            video_writer.close()
+    return logger.log_path
+
+
+def build_schedule(
+    args, source: Path, fps: float, start_frame: int, end_frame: Optional[int]
+) -> StrideSchedule:
+    """Adaptive stride for ``--time-budget``; the clock starts after the model is loaded."""
+    if end_frame is None:
+        count = read_frame_count(source)
+        if not count:
+            raise ValueError(
+                f"{source} does not report its length; pass --end-seconds with --time-budget."
+            )
+        end_frame = count - 1
+    # "realtime": spend no more wall time than the clip lasts
+    budget = (end_frame - start_frame + 1) / fps if args.time_budget == REALTIME else args.time_budget
+    max_stride = getattr(args, "max_stride", None) or max(1, round(fps * 10))
+    schedule = StrideSchedule(start_frame, end_frame, budget, args.stride, max_stride)
+    print(
+        f"Adaptive stride: {end_frame - start_frame + 1} frames in {budget:.1f}s, "
+        f"stride {schedule.min_stride}-{schedule.max_stride}"
+    )
+    return schedule
+
+
+def run_live(args, profiler: StageProfiler, model_loader: Callable[[Path], object]):
+    weights: Path = args.weights
+    if not weights.exists():
+        raise FileNotFoundError(f"Missing model weights: {weights}")
+
+    with profiler.stage("model_load"):
+        model = model_loader(weights)
+    logger = DetectionLogger(args.log_parquet, args.progress_interval)
+    reader = LatestFrameReader(
+        args.source, max_backoff=getattr(args, "reconnect_max_delay", 30.0)
+    )
+    video_path = getattr(args, "save_video", None)
+    video_writer = (
+        AsyncVideoWriter(video_path, 0.0, drop_when_full=True)
+        if video_path is not None
+        else None
+    )
+    try:
+        with reader:
+            run_live_mode(
+                model=model,
+                reader=reader,
+                tracker=args.tracker,
+                display=args.display,
+                logger=logger,
+                duration=args.end_seconds,
+                profiler=profiler,
+                video_writer=video_writer,
+            )
+    finally:
+        if video_writer is not None:
+            video_writer.close()
+    print(reader.stats.summary())
     return logger.log_path
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, List, Optional, Sequence, Tuple, Union
+
+from .args import is_live_source
+from .display import close_window, show_frame
+from .live import LatestFrameReader
+from .profiling import NULL_PROFILER, StageProfiler
+from .records import DetectionLogger
+from .retrack import StreamTracker
+from .video_utils import compute_frame_bounds, iter_video_frames, read_fps
+
+PREFETCH_FRAMES = 4
+IDLE_SLEEP = 0.002
+# how long a partial batch may wait for other streams to catch up
+BATCH_FILL_WAIT = 0.01
+_END = object()
+
+Item = Tuple[int, Optional[float], Any]
+
+
+@dataclass
+class Stream:
+    """One camera/video: its frame supply, logger and (optional) tracker state."""
+
+    name: str
+    source: Union[Path, str]
+    logger: DetectionLogger
+    fps: float = 0.0
+    tracker: Optional[StreamTracker] = None
+    reader: Optional[LatestFrameReader] = None
+    frames: "queue.Queue[Any]" = field(default_factory=lambda: queue.Queue(PREFETCH_FRAMES))
+    done: bool = False
+    processed: int = 0
+
+    def poll(self) -> Optional[Item]:
+        """Return the next ready frame without blocking (``None`` if nothing is ready)."""
+        if self.reader is not None:
+            item = self.reader.read(timeout=0)
+            if item is None:
+                return None
+            seq, wall_time, frame = item
+            return seq, wall_time, frame
+        try:
+            item = self.frames.get_nowait()
+        except queue.Empty:
+            return None
+        if item is _END:
+            self.done = True
+            return None
+        return item
+
+    def handle(self, result, item: Item) -> None:
+        frame_idx, timestamp, _ = item
+        self.processed += 1
+        if timestamp is None:
+            timestamp = frame_idx / self.fps if self.fps else None
+        if self.tracker is not None:
+            self.logger.add_records(
+                self.tracker.update_result(result, frame_idx, timestamp), frame_idx, timestamp
+            )
+        else:
+            self.logger.add(result, frame_idx, self.fps, timestamp=timestamp)
+
+
+def _produce_file_frames(
+    stream: Stream,
+    stride: int,
+    start_frame: int,
+    end_frame: Optional[int],
+    stop: threading.Event,
+    profiler: StageProfiler,
+) -> None:
+    def put(item: Any) -> bool:
+        while not stop.is_set():
+            try:
+                stream.frames.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    frames = iter_video_frames(Path(stream.source), stride, start_frame, end_frame)
+    try:
+        for frame_idx, frame in profiler.iter("decode", frames):
+            if not put((frame_idx, None, frame)):
+                break
+    finally:
+        frames.close()
+        put(_END)
+
+
+def _stream_name(source: Union[Path, str], index: int) -> str:
+    if is_live_source(source):
+        return f"stream{index}"
+    return f"{Path(source).name.split('.')[0]}{index}"
+
+
+def _stream_log_path(log_dir: Optional[Path], name: str, stamp: str) -> Optional[Path]:
+    if log_dir is None:
+        return None
+    return log_dir / f"detections_{stamp}_{name}.parquet"
+
+
+def next_batch(streams: Sequence[Stream], batch_size: int, offset: int) -> List[Tuple[Stream, Item]]:
+    """Round-robin batch assembly: one frame per stream per round, starting at ``offset``.
+
+    A busy stream can never take more than its share of a batch while other
+    streams have frames ready, and the rotating offset stops the first
+    stream from always leading partially filled batches.
+    """
+    batch: List[Tuple[Stream, Item]] = []
+    count = len(streams)
+    while len(batch) < batch_size:
+        added = False
+        for i in range(count):
+            stream = streams[(offset + i) % count]
+            if stream.done:
+                continue
+            item = stream.poll()
+            if item is None:
+                continue
+            batch.append((stream, item))
+            added = True
+            if len(batch) >= batch_size:
+                break
+        if not added:
+            break
+    return batch
+
+
+def run_multi_stream(
+    model,
+    sources: Sequence[Union[Path, str]],
+    stride: int,
+    batch_size: int,
+    tracker: bool,
+    display: bool,
+    log_dir: Optional[Path],
+    progress_interval: int,
+    start_seconds: float,
+    end_seconds: Optional[float],
+    profiler: StageProfiler = NULL_PROFILER,
+) -> List[Stream]:
+    """Read several sources concurrently and batch their frames through one shared model."""
+    stop = threading.Event()
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    streams: List[Stream] = []
+    producers: List[threading.Thread] = []
+    deadline = None
+    for index, source in enumerate(sources):
+        name = _stream_name(source, index)
+        stream = Stream(
+            name=name,
+            source=source,
+            logger=DetectionLogger(_stream_log_path(log_dir, name, stamp), progress_interval),
+            tracker=StreamTracker() if tracker else None,
+        )
+        if is_live_source(source):
+            stream.reader = LatestFrameReader(str(source)).start()
+            if end_seconds is not None:
+                deadline = time.monotonic() + end_seconds
+        else:
+            if not Path(source).exists():
+                raise FileNotFoundError(f"Video source does not exist: {source}")
+            stream.fps = read_fps(Path(source))
+            start_frame, end_frame = compute_frame_bounds(stream.fps, start_seconds, end_seconds)
+            producer = threading.Thread(
+                target=_produce_file_frames,
+                args=(stream, stride, start_frame, end_frame, stop, profiler),
+                name=f"decode-{name}",
+                daemon=True,
+            )
+            producer.start()
+            producers.append(producer)
+        streams.append(stream)
+
+    offset = 0
+    try:
+        while not all(stream.done for stream in streams):
+            if deadline is not None and time.monotonic() >= deadline:
+                # the duration bounds live captures only; files run to their end frame
+                for stream in streams:
+                    if stream.reader is not None:
+                        stream.reader.stop()
+                        stream.done = True
+                deadline = None
+            batch = next_batch(streams, batch_size, offset)
+            offset = (offset + 1) % len(streams)
+            if not batch:
+                time.sleep(IDLE_SLEEP)
+                continue
+            fill_deadline = time.monotonic() + BATCH_FILL_WAIT
+            while len(batch) < batch_size and time.monotonic() < fill_deadline:
+                time.sleep(IDLE_SLEEP)
+                batch.extend(next_batch(streams, batch_size - len(batch), offset))
+            if profiler.enabled:
+                profiler.gauge("batch_size", len(batch))
+                for stream in streams:
+                    profiler.gauge(f"queue_{stream.name}", stream.frames.qsize())
+            with profiler.stage("model"):
+                results = model.predict([item[2] for _, item in batch], verbose=False)
+            for (stream, item), result in zip(batch, results):
+                profiler.record_speed(result)
+                if stream.reader is not None:
+                    stream.fps = stream.reader.fps
+                with profiler.stage("track+log" if stream.tracker else "log"):
+                    stream.handle(result, item)
+                if display:
+                    with profiler.stage("plot"):
+                        annotated = result.plot()
+                    with profiler.stage("display"):
+                        keep_going = show_frame(f"YOLO {stream.name}", annotated)
+                    if not keep_going:
+                        raise KeyboardInterrupt
+                profiler.frame_done()
+    except KeyboardInterrupt:
+        print("Stopping streams.")
+    finally:
+        stop.set()
+        for stream in streams:
+            if stream.reader is not None:
+                stream.reader.stop()
+            # unblock producers waiting on a full queue
+            while not stream.frames.empty():
+                stream.frames.get_nowait()
+            if display:
+                close_window(f"YOLO {stream.name}")
+        for producer in producers:
+            producer.join(timeout=5)
+    for stream in streams:
+        with profiler.stage("log_flush"):
+            stream.logger.flush()
+        print(f"{stream.name}: {stream.processed} frames processed ({stream.source})")
+    return streams
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import cv2
+
+PALETTE = [
+    (56, 56, 255),
+    (151, 157, 255),
+    (31, 112, 255),
+    (29, 178, 255),
+    (49, 210, 207),
+    (10, 249, 72),
+    (23, 204, 146),
+    (134, 219, 61),
+    (211, 188, 0),
+    (255, 115, 0),
+]
+
+
+def _color(key: Optional[int]) -> Tuple[int, int, int]:
+    if key is None:
+        return PALETTE[0]
+    return PALETTE[int(key) % len(PALETTE)]
+
+
+def draw_records(frame, records: Iterable[Dict[str, Any]]):
+    """Draw logged detection rows (x1/y1/x2/y2, confidence, track_id) onto a copy of ``frame``."""
+    annotated = frame.copy()
+    for row in records:
+        track_id = row.get("track_id")
+        if track_id is not None and track_id != track_id:  # NaN from pandas
+            track_id = None
+        color = _color(track_id if track_id is not None else row.get("class_id"))
+        p1 = (int(row["x1"]), int(row["y1"]))
+        p2 = (int(row["x2"]), int(row["y2"]))
+        cv2.rectangle(annotated, p1, p2, color, 2)
+        label = f"{row.get('confidence', 0.0):.2f}"
+        if track_id is not None:
+            label = f"id:{int(track_id)} {label}"
+        cv2.putText(
+            annotated,
+            label,
+            (p1[0], max(p1[1] - 4, 10)),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            0.5,
+            color,
+            1,
+            cv2.LINE_AA,
+        )
+    return annotated
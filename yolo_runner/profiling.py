@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import bisect
+import json
+import resource
+import sys
+import threading
+import time
+from contextlib import nullcontext
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+# log-spaced latency buckets from 50 µs to ~100 s (upper bounds, seconds)
+BUCKETS: List[float] = [5e-5 * (1.5 ** i) for i in range(36)]
+
+T = TypeVar("T")
+_NULL_CONTEXT = nullcontext()
+
+
+class Histogram:
+    """Fixed log-bucket latency histogram; recording is a bisect and two adds."""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the ``q`` quantile."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        running = 0
+        for bound, count in zip(BUCKETS + [self.max], self.counts):
+            running += count
+            if running >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def copy(self) -> "Histogram":
+        clone = Histogram()
+        clone.counts = list(self.counts)
+        clone.count, clone.total, clone.max = self.count, self.total, self.max
+        return clone
+
+    def to_dict(self) -> Dict[str, float]:
+        mean = self.total / self.count if self.count else 0.0
+        return {
+            "count": self.count,
+            "total_s": self.total,
+            "mean_ms": mean * 1000,
+            "p50_ms": self.quantile(0.5) * 1000,
+            "p95_ms": self.quantile(0.95) * 1000,
+            "p99_ms": self.quantile(0.99) * 1000,
+            "max_ms": self.max * 1000,
+        }
+
+
+class _StageTimer:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler: "StageProfiler", name: str) -> None:
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> "_StageTimer":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+
+
+class StageProfiler:
+    """Per-stage latency histograms, frame throughput, gauges and memory for one run.
+
+    When ``enabled`` is false every hook returns a shared no-op, so the
+    instrumented loops pay only an attribute lookup.
+    """
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        # decode threads and the main loop record concurrently
+        self._lock = threading.Lock()
+        self.stages: Dict[str, Histogram] = {}
+        self.gauges: Dict[str, Dict[str, float]] = {}
+        self.frames = 0
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    def stage(self, name: str):
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return _StageTimer(self, name)
+
+    def record(self, name: str, seconds: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.stages.get(name)
+            if histogram is None:
+                histogram = self.stages[name] = Histogram()
+            histogram.record(seconds)
+
+    def record_speed(self, result) -> None:
+        """Fold ultralytics' own ``result.speed`` (ms) into preprocess/inference/postprocess."""
+        if not self.enabled:
+            return
+        for name, millis in (getattr(result, "speed", None) or {}).items():
+            if millis is not None:
+                self.record(name, millis / 1000)
+
+    def iter(self, name: str, iterable: Iterable[T]) -> Iterator[T]:
+        """Time each ``next()`` of ``iterable`` (e.g. frame decoding) under ``name``."""
+        if not self.enabled:
+            return iter(iterable)
+        return self._timed_iter(name, iterable)
+
+    def _timed_iter(self, name: str, iterable: Iterable[T]) -> Iterator[T]:
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            self.record(name, time.perf_counter() - start)
+            yield item
+
+    def frame_done(self) -> None:
+        if self.enabled:
+            with self._lock:
+                self.frames += 1
+
+    def gauge(self, name: str, value: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            entry = self.gauges.get(name)
+            if entry is None:
+                self.gauges[name] = {"last": value, "max": value}
+            else:
+                entry["last"] = value
+                if value > entry["max"]:
+                    entry["max"] = value
+
+    def finish(self) -> None:
+        if self.enabled and self.finished is None:
+            self.finished = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return end - self.started
+
+    def snapshot(self) -> Tuple[int, Dict[str, Histogram], Dict[str, Dict[str, float]]]:
+        """Consistent copy of frames, stages and gauges (safe while the run loop records)."""
+        with self._lock:
+            stages = {name: hist.copy() for name, hist in self.stages.items()}
+            gauges = {name: dict(entry) for name, entry in self.gauges.items()}
+            return self.frames, stages, gauges
+
+    def to_dict(self) -> Dict[str, Any]:
+        frames, stages, gauges = self.snapshot()
+        elapsed = self.elapsed
+        return {
+            "elapsed_s": elapsed,
+            "frames": frames,
+            "fps": frames / elapsed if elapsed > 0 else 0.0,
+            "stages": {name: hist.to_dict() for name, hist in stages.items()},
+            "gauges": gauges,
+            "memory": memory_usage(),
+            "running": self.finished is None,
+        }
+
+    def summary(self) -> str:
+        data = self.to_dict()
+        lines = [
+            f"Profile: {data['frames']} frames in {data['elapsed_s']:.2f}s "
+            f"({data['fps']:.2f} fps)",
+            f"{'stage':<14}{'count':>8}{'total s':>10}{'mean ms':>10}{'p95 ms':>10}{'max ms':>10}",
+        ]
+        for name, stats in sorted(
+            data["stages"].items(), key=lambda item: -item[1]["total_s"]
+        ):
+            lines.append(
+                f"{name:<14}{stats['count']:>8}{stats['total_s']:>10.2f}"
+                f"{stats['mean_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['max_ms']:>10.2f}"
+            )
+        for name, gauge in data["gauges"].items():
+            lines.append(f"{name}: last={gauge['last']:g} max={gauge['max']:g}")
+        memory = data["memory"]
+        lines.append(
+            f"Memory: rss={memory['rss_mb']:.1f} MB peak={memory['peak_rss_mb']:.1f} MB"
+        )
+        return "\n".join(lines)
+
+    def write_json(self, destination: Path) -> Path:
+        if destination.suffix.lower() != ".json":
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            destination = destination / f"profile_{timestamp}.json"
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        destination.write_text(json.dumps(self.to_dict(), indent=2))
+        return destination
+
+    def to_prometheus(self, prefix: str = "fisheye") -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        frames, stages, gauges = self.snapshot()
+        elapsed = self.elapsed
+        lines = [
+            f"# TYPE {prefix}_frames_total counter",
+            f"{prefix}_frames_total {frames}",
+            f"# TYPE {prefix}_fps gauge",
+            f"{prefix}_fps {frames / elapsed if elapsed > 0 else 0.0}",
+            f"# TYPE {prefix}_stage_seconds histogram",
+        ]
+        for name, hist in stages.items():
+            running = 0
+            for bound, count in zip(BUCKETS, hist.counts):
+                running += count
+                lines.append(f'{prefix}_stage_seconds_bucket{{stage="{name}",le="{bound:.6g}"}} {running}')
+            lines.append(f'{prefix}_stage_seconds_bucket{{stage="{name}",le="+Inf"}} {hist.count}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {hist.total}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {hist.count}')
+        if gauges:
+            lines.append(f"# TYPE {prefix}_gauge gauge")
+            for name, gauge in gauges.items():
+                lines.append(f'{prefix}_gauge{{name="{name}"}} {gauge["last"]}')
+        memory = memory_usage()
+        lines.append(f"# TYPE {prefix}_rss_bytes gauge")
+        lines.append(f"{prefix}_rss_bytes {memory['rss_mb'] * 1024 * 1024:.0f}")
+        lines.append(f"# TYPE {prefix}_peak_rss_bytes gauge")
+        lines.append(f"{prefix}_peak_rss_bytes {memory['peak_rss_mb'] * 1024 * 1024:.0f}")
+        return "\n".join(lines) + "\n"
+
+
+def memory_usage() -> Dict[str, float]:
+    """Current and peak resident set size in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux but bytes on macOS
+    peak_mb = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    rss_mb = peak_mb
+    try:
+        with open("/proc/self/statm") as handle:
+            pages = int(handle.read().split()[1])
+        rss_mb = pages * resource.getpagesize() / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        pass
+    return {"rss_mb": rss_mb, "peak_rss_mb": peak_mb}
+
+
+NULL_PROFILER = StageProfiler(enabled=False)
+_ACTIVE = NULL_PROFILER
+
+
+def set_active_profiler(profiler: StageProfiler) -> None:
+    """Make ``profiler`` the one reported by ``/metrics``."""
+    global _ACTIVE
+    _ACTIVE = profiler
+
+
+def active_profiler() -> StageProfiler:
+    return _ACTIVE
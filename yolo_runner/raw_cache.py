@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+RAW_CONF = 0.01
+RAW_IOU = 0.9
+FINGERPRINT_CHUNK = 1 << 20
+COLUMNS = ("frame", "class_id", "confidence", "x1", "y1", "x2", "y2")
+
+
+def file_fingerprint(path: Path, full: bool = False) -> str:
+    """SHA1 of a file; large videos hash size plus the first/last MiB unless ``full``."""
+    digest = hashlib.sha1()
+    size = path.stat().st_size
+    digest.update(str(size).encode())
+    with path.open("rb") as handle:
+        if full or size <= 2 * FINGERPRINT_CHUNK:
+            for chunk in iter(lambda: handle.read(FINGERPRINT_CHUNK), b""):
+                digest.update(chunk)
+        else:
+            digest.update(handle.read(FINGERPRINT_CHUNK))
+            handle.seek(-FINGERPRINT_CHUNK, 2)
+            digest.update(handle.read(FINGERPRINT_CHUNK))
+    return digest.hexdigest()
+
+
+def raw_cache_path(cache_dir: Path, source: Path, weights: Path) -> Path:
+    video_hash = file_fingerprint(source)
+    weights_hash = file_fingerprint(weights, full=True)
+    return cache_dir / f"raw_{video_hash[:12]}_{weights_hash[:12]}.parquet"
+
+
+@dataclass
+class RawCacheMeta:
+    source: str
+    fps: float
+    stride: int
+    start_frame: int
+    end_frame: Optional[int]
+    raw_conf: float = RAW_CONF
+    raw_iou: float = RAW_IOU
+    frames_processed: int = 0
+
+    def covers(self, stride: int, start_frame: int, end_frame: Optional[int]) -> bool:
+        return (
+            self.stride == stride
+            and self.start_frame == start_frame
+            and self.end_frame == end_frame
+        )
+
+
+@dataclass
+class RawDetectionCache:
+    """Columnar store of low-threshold detections, written once per video/weights pair."""
+
+    path: Path
+    meta: RawCacheMeta
+    columns: Dict[str, List[np.ndarray]] = field(
+        default_factory=lambda: {name: [] for name in COLUMNS}
+    )
+
+    def add(self, result, frame_idx: int, box_scale: float = 1.0) -> None:
+        self.meta.frames_processed += 1
+        boxes = result.boxes
+        if boxes is None or boxes.data.shape[0] == 0:
+            return
+        xyxy = boxes.xyxy.cpu().numpy().astype(np.float32) * np.float32(box_scale)
+        count = len(xyxy)
+        self.columns["frame"].append(np.full(count, frame_idx, dtype=np.int32))
+        self.columns["class_id"].append(boxes.cls.cpu().numpy().astype(np.int16))
+        self.columns["confidence"].append(boxes.conf.cpu().numpy().astype(np.float32))
+        for offset, name in enumerate(("x1", "y1", "x2", "y2")):
+            self.columns[name].append(xyxy[:, offset])
+
+    def flush(self) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        arrays = {
+            name: np.concatenate(chunks) if chunks else np.empty(0, dtype=np.float32)
+            for name, chunks in self.columns.items()
+        }
+        table = pa.table(arrays).replace_schema_metadata(
+            {"fisheye_raw_cache": json.dumps(asdict(self.meta))}
+        )
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        pq.write_table(table, self.path)
+        print(
+            f"Cached {table.num_rows} raw detections from "
+            f"{self.meta.frames_processed} frames to {self.path}"
+        )
+
+
+def read_raw_meta(path: Path) -> Optional[RawCacheMeta]:
+    import pyarrow.parquet as pq
+
+    metadata = pq.read_schema(path).metadata or {}
+    payload = metadata.get(b"fisheye_raw_cache")
+    if payload is None:
+        return None
+    return RawCacheMeta(**json.loads(payload))
+
+
+def load_raw_detections(path: Path):
+    """Return ``(DataFrame, RawCacheMeta)`` for a raw cache file."""
+    import pandas as pd
+
+    meta = read_raw_meta(path)
+    if meta is None:
+        raise ValueError(f"{path} is not a raw detection cache (run with --raw-cache).")
+    return pd.read_parquet(path), meta
+
+
+def refilter(
+    df,
+    conf: float = 0.25,
+    iou: float = 0.7,
+    classes: Optional[Iterable[int]] = None,
+    fps: Optional[float] = None,
+):
+    """Apply a confidence threshold, class filter and class-aware NMS to cached boxes.
+
+    Returns a DataFrame with the same columns as ``DetectionLogger`` output.
+    """
+    import pandas as pd
+
+    mask = df["confidence"].to_numpy() >= conf
+    if classes is not None:
+        mask &= df["class_id"].isin(list(classes)).to_numpy()
+    subset = df.loc[mask]
+    keep = nms_keep(
+        subset["frame"].to_numpy(),
+        subset["class_id"].to_numpy(),
+        subset["confidence"].to_numpy(),
+        subset[["x1", "y1", "x2", "y2"]].to_numpy(dtype=np.float32),
+        iou,
+    )
+    out = subset.iloc[keep].sort_values(["frame", "confidence"], ascending=[True, False])
+    out = out.reset_index(drop=True)
+    timestamps = out["frame"] / fps if fps else None
+    return pd.DataFrame(
+        {
+            "frame": out["frame"].astype(int),
+            "timestamp": timestamps,
+            "track_id": pd.Series([None] * len(out), dtype=object),
+            "class_id": out["class_id"].astype(int),
+            "confidence": out["confidence"].astype(float),
+            "x1": out["x1"].astype(float),
+            "y1": out["y1"].astype(float),
+            "x2": out["x2"].astype(float),
+            "y2": out["y2"].astype(float),
+        }
+    )
+
+
+def nms_keep(
+    frames: np.ndarray,
+    classes: np.ndarray,
+    scores: np.ndarray,
+    boxes: np.ndarray,
+    iou_threshold: float,
+    chunk_bytes: int = 16 << 20,
+) -> np.ndarray:
+    """Greedy per-frame, per-class NMS vectorized across frames.
+
+    Boxes are packed into a ``(groups, K, 4)`` array sorted by score, so the
+    greedy pass loops over the K slots while every frame is handled at once.
+    Returns indices into the input arrays.
+    """
+    if len(scores) == 0:
+        return np.empty(0, dtype=np.int64)
+    order = np.lexsort((-scores, classes, frames))
+    group_keys = np.stack([frames[order], classes[order]], axis=1)
+    starts = np.flatnonzero(np.r_[True, np.any(group_keys[1:] != group_keys[:-1], axis=1)])
+    sizes = np.diff(np.r_[starts, len(order)])
+    slot = np.arange(len(order)) - np.repeat(starts, sizes)
+
+    kept: List[np.ndarray] = []
+    # process groups of similar size together to bound the K x K matrices
+    by_size = np.argsort(sizes, kind="stable")
+    begin = 0
+    while begin < len(by_size):
+        end = begin + 1
+        while (
+            end < len(by_size)
+            and (end - begin + 1) * int(sizes[by_size[end]]) ** 2 * 4 <= chunk_bytes
+        ):
+            end += 1
+        group_ids = by_size[begin:end]
+        kept.append(_greedy_nms(order, starts, sizes, slot, group_ids, boxes, iou_threshold))
+        begin = end
+    return np.sort(np.concatenate(kept))
+
+
+def _greedy_nms(order, starts, sizes, slot, group_ids, boxes, iou_threshold) -> np.ndarray:
+    count = len(group_ids)
+    group_sizes = sizes[group_ids]
+    k = int(group_sizes.max())
+    packed = np.zeros((count, k, 4), dtype=np.float32)
+    valid = np.zeros((count, k), dtype=bool)
+    index = np.full((count, k), -1, dtype=np.int64)
+    member = np.repeat(np.arange(count), group_sizes)
+    first = np.repeat(np.cumsum(group_sizes) - group_sizes, group_sizes)
+    positions = np.repeat(starts[group_ids], group_sizes) + np.arange(len(member)) - first
+    packed[member, slot[positions]] = boxes[order[positions]]
+    valid[member, slot[positions]] = True
+    index[member, slot[positions]] = order[positions]
+
+    x1, y1, x2, y2 = (packed[..., i] for i in range(4))
+    area = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    inter_w = np.clip(
+        np.minimum(x2[:, :, None], x2[:, None, :]) - np.maximum(x1[:, :, None], x1[:, None, :]),
+        0,
+        None,
+    )
+    inter_h = np.clip(
+        np.minimum(y2[:, :, None], y2[:, None, :]) - np.maximum(y1[:, :, None], y1[:, None, :]),
+        0,
+        None,
+    )
+    inter = inter_w * inter_h
+    union = area[:, :, None] + area[:, None, :] - inter
+    overlap = np.divide(inter, union, out=np.zeros_like(inter), where=union > 0) > iou_threshold
+
+    keep = valid.copy()
+    for i in range(k - 1):
+        suppress = keep[:, i, None] & overlap[:, i, i + 1 :]
+        keep[:, i + 1 :] &= ~suppress
+    return index[keep]
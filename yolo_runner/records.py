@@ -3,9 +3,14 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .summary import summarize_frame, write_summary
 
 DEFAULT_LOG_DIR = Path("dataset/outputs/logs")
+SAMPLES_SUFFIX = ".samples.npz"
 
 
 @dataclass
@@ -13,6 +18,9 @@ class DetectionLogger:
     log_path: Optional[Path]
     progress_interval: int = 0
     records: List[Dict[str, Any]] = field(default_factory=list)
+    # every processed frame, with or without detections (see ``write_samples``)
+    sample_frames: List[int] = field(default_factory=list)
+    sample_times: List[float] = field(default_factory=list)
 
     def __post_init__(self) -> None:
         if self.log_path is not None and self.log_path.suffix.lower() != ".parquet":
@@ -25,10 +33,34 @@ class DetectionLogger:
     def enabled(self) -> bool:
         return self.log_path is not None
 
-    def add(self, result, frame_idx: int, fps: float) -> None:
+    def add(
+        self,
+        result,
+        frame_idx: int,
+        fps: float,
+        box_scale: float = 1.0,
+        timestamp: Optional[float] = None,
+        sample_gap: Optional[int] = None,
+    ) -> None:
+        if not self.enabled:
+            return
+        if timestamp is None:
+            timestamp = frame_idx / fps if fps else None
+        self.add_records(
+            build_records(result, frame_idx, fps, box_scale, timestamp, sample_gap),
+            frame_idx,
+            timestamp,
+        )
+
+    def add_records(
+        self, records: List[Dict[str, Any]], frame_idx: int, timestamp: Optional[float] = None
+    ) -> None:
+        """Append already-built rows (e.g. from an offline tracker) for one processed frame."""
         if not self.enabled:
             return
-        self.records.extend(build_records(result, frame_idx, fps))
+        self.sample_frames.append(frame_idx)
+        self.sample_times.append(float("nan") if timestamp is None else timestamp)
+        self.records.extend(records)
         self._maybe_print(frame_idx)
 
     def _maybe_print(self, frame_idx: int) -> None:
@@ -57,15 +89,69 @@ class DetectionLogger:
             ) from exc
         df = pd.DataFrame(self.records)
         df.to_parquet(self.log_path)
+        # the summary sidecar lets analyze_detections.py skip rescanning this log
+        write_summary(self.log_path, summarize_frame(df))
+        write_samples(self.log_path, self.sample_frames, self.sample_times)
         print(f"Wrote {len(df)} detections to {self.log_path}")
 
 
-def build_records(result, frame_idx: int, fps: float) -> List[Dict[str, Any]]:
+def samples_path(log_path: Path) -> Path:
+    return log_path.with_name(log_path.name + SAMPLES_SUFFIX)
+
+
+def write_samples(log_path: Path, frames: Sequence[int], timestamps: Sequence[float]) -> Path:
+    """Store the frame and time of every processed sample next to the log.
+
+    Frames without detections have no rows in the log itself, so with an
+    adaptive stride this is the only record of when the video was sampled.
+    """
+    destination = samples_path(log_path)
+    np.savez(
+        destination,
+        frames=np.asarray(frames, dtype=np.int64),
+        timestamps=np.asarray(timestamps, dtype=np.float64),
+    )
+    return destination
+
+
+def load_samples(log_path: Path, logged_frames: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+    """Sorted sample frames of ``log_path``, or None without a (matching) sidecar.
+
+    A sidecar that lacks any of ``logged_frames`` belongs to another run.
+    """
+    try:
+        with np.load(samples_path(log_path)) as data:
+            frames = np.unique(data["frames"])
+    except (OSError, KeyError, ValueError):
+        return None
+    if logged_frames is not None and not np.isin(logged_frames, frames).all():
+        return None
+    return frames
+
+
+def build_records(
+    result,
+    frame_idx: int,
+    fps: float,
+    box_scale: float = 1.0,
+    timestamp: Optional[float] = None,
+    sample_gap: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Flatten a YOLO result into log rows.
+
+    ``timestamp`` overrides the ``frame_idx / fps`` video time, e.g. with the
+    wall-clock capture time of a live stream. ``sample_gap`` (frames since
+    the previous processed frame) is added as a column for adaptive-stride
+    runs, where it varies from sample to sample.
+    """
     boxes = result.boxes
     if boxes is None or boxes.data.shape[0] == 0:
         return []
 
     xyxy = boxes.xyxy.cpu().numpy()
+    if box_scale != 1.0:
+        # frames decoded at reduced resolution; log boxes in source pixels
+        xyxy = xyxy * box_scale
     confs = boxes.conf.cpu().numpy()
     classes = boxes.cls.cpu().numpy().astype(int)
     ids: Optional[List[Optional[int]]]
@@ -74,7 +160,8 @@ def build_records(result, frame_idx: int, fps: float) -> List[Dict[str, Any]]:
     else:
         ids = [None] * len(xyxy)
 
-    timestamp = frame_idx / fps if fps else None
+    if timestamp is None:
+        timestamp = frame_idx / fps if fps else None
     records: List[Dict[str, Any]] = []
     for (x1, y1, x2, y2), conf, cls_id, track_id in zip(xyxy, confs, classes, ids):
         records.append(
@@ -90,4 +177,7 @@ def build_records(result, frame_idx: int, fps: float) -> List[Dict[str, Any]]:
                 "y2": float(y2),
             }
         )
+    if sample_gap is not None:
+        for record in records:
+            record["sample_gap"] = sample_gap
     return records
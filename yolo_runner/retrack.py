@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .detection import TRACKER_CONFIG
+
+# ultralytics creates its ByteTrack instances with a fixed 30 FPS frame rate
+TRACKER_FRAME_RATE = 30
+# below this, frame / timestamp is not a video frame rate: the log holds
+# capture sequence numbers with wall-clock times (live sources)
+MIN_VIDEO_FPS = 1.0
+
+
+class FrameDetections:
+    """Minimal stand-in for ``ultralytics.engine.results.Boxes`` as consumed by BYTETracker."""
+
+    def __init__(self, xyxy: np.ndarray, conf: np.ndarray, cls: np.ndarray) -> None:
+        self.xyxy = xyxy
+        self.conf = conf
+        self.cls = cls
+
+    @property
+    def xywh(self) -> np.ndarray:
+        xywh = self.xyxy.copy()
+        xywh[:, 2:] = self.xyxy[:, 2:] - self.xyxy[:, :2]
+        xywh[:, :2] = self.xyxy[:, :2] + xywh[:, 2:] / 2
+        return xywh
+
+    def __len__(self) -> int:
+        return len(self.conf)
+
+    def __getitem__(self, index) -> "FrameDetections":
+        return FrameDetections(self.xyxy[index], self.conf[index], self.cls[index])
+
+
+@dataclass
+class LoggedDetections:
+    """Detection-log columns as contiguous arrays, sorted by frame."""
+
+    frames: np.ndarray
+    xyxy: np.ndarray
+    conf: np.ndarray
+    cls: np.ndarray
+    fps: Optional[float]
+    # every processed frame, including those without detections, when known
+    samples: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_frame(
+        cls, df, fps: Optional[float] = None, samples: Optional[np.ndarray] = None
+    ) -> "LoggedDetections":
+        df = df.sort_values("frame", kind="stable")
+        if fps is None and "timestamp" in df and df["timestamp"].notna().any():
+            sample = df[(df["frame"] > 0) & df["timestamp"].notna()].head(1)
+            if not sample.empty:
+                fps = float(sample["frame"].iloc[0] / sample["timestamp"].iloc[0])
+                if not fps >= MIN_VIDEO_FPS:
+                    raise ValueError(
+                        "Log timestamps are not video time (a live capture?); "
+                        "pass the frame rate explicitly with --fps."
+                    )
+        return cls(
+            frames=df["frame"].to_numpy(dtype=np.int64),
+            xyxy=df[["x1", "y1", "x2", "y2"]].to_numpy(dtype=np.float32),
+            conf=df["confidence"].to_numpy(dtype=np.float32),
+            cls=df["class_id"].to_numpy(dtype=np.float32),
+            fps=fps,
+            samples=samples if samples is not None else _gap_samples(df),
+        )
+
+    def sample_frames(self) -> np.ndarray:
+        """The frames that were processed, with or without detections.
+
+        Without recorded samples a fixed stride is assumed: the gcd of the
+        gaps between logged frames.
+        """
+        unique = np.unique(self.frames)
+        if self.samples is not None:
+            return np.union1d(self.samples, unique)
+        if len(unique) < 2:
+            return unique
+        step = int(np.gcd.reduce(np.diff(unique)))
+        return np.arange(unique[0], unique[-1] + 1, step)
+
+    def iter_frames(self) -> Iterator[Tuple[int, FrameDetections]]:
+        """Yield every sampled frame in order, including frames with no detections."""
+        samples = self.sample_frames()
+        lows = np.searchsorted(self.frames, samples, side="left")
+        highs = np.searchsorted(self.frames, samples, side="right")
+        for frame_idx, lo, hi in zip(samples.tolist(), lows.tolist(), highs.tolist()):
+            yield frame_idx, FrameDetections(self.xyxy[lo:hi], self.conf[lo:hi], self.cls[lo:hi])
+
+
+def _gap_samples(df) -> Optional[np.ndarray]:
+    """Sample frames recoverable from the ``sample_gap`` column of adaptive-stride logs.
+
+    Each row points back at the previous sample, so empty samples directly
+    before a sample with detections are found; longer empty runs are not.
+    """
+    if "sample_gap" not in df or df["sample_gap"].isna().all():
+        return None
+    rows = df[df["sample_gap"].fillna(0) > 0]
+    previous = (rows["frame"] - rows["sample_gap"]).to_numpy(dtype=np.int64)
+    return np.union1d(df["frame"].to_numpy(dtype=np.int64), previous)
+
+
+def load_tracker_config(overrides: Optional[Dict[str, Any]] = None):
+    from ultralytics.utils import IterableSimpleNamespace, yaml_load
+    from ultralytics.utils.checks import check_yaml
+
+    cfg = yaml_load(check_yaml(Path(TRACKER_CONFIG).name))
+    cfg.update(overrides or {})
+    return IterableSimpleNamespace(**cfg)
+
+
+def tracks_to_records(
+    tracks: np.ndarray, frame_idx: int, timestamp: Optional[float]
+) -> List[Dict[str, Any]]:
+    """Convert BYTETracker output rows (x1, y1, x2, y2, id, score, cls, ...) to log records."""
+    return [
+        {
+            "frame": frame_idx,
+            "timestamp": timestamp,
+            "track_id": int(track_id),
+            "class_id": int(cls_id),
+            "confidence": float(score),
+            "x1": float(x1),
+            "y1": float(y1),
+            "x2": float(x2),
+            "y2": float(y2),
+        }
+        for x1, y1, x2, y2, track_id, score, cls_id, *_ in tracks
+    ]
+
+
+class StreamTracker:
+    """A ByteTrack instance fed with plain detections instead of ``model.track``."""
+
+    def __init__(
+        self,
+        overrides: Optional[Dict[str, Any]] = None,
+        frame_rate: int = TRACKER_FRAME_RATE,
+    ) -> None:
+        from ultralytics.trackers.byte_tracker import BYTETracker
+
+        self.tracker = BYTETracker(load_tracker_config(overrides), frame_rate=frame_rate)
+
+    def update(
+        self, dets: FrameDetections, frame_idx: int, timestamp: Optional[float]
+    ) -> List[Dict[str, Any]]:
+        tracks = self.tracker.update(dets)
+        if len(tracks) == 0:
+            return []
+        return tracks_to_records(tracks, frame_idx, timestamp)
+
+    def update_result(
+        self, result, frame_idx: int, timestamp: Optional[float], box_scale: float = 1.0
+    ) -> List[Dict[str, Any]]:
+        """Track the boxes of a YOLO detection result."""
+        boxes = result.boxes
+        if boxes is None:
+            dets = FrameDetections(
+                np.empty((0, 4), np.float32), np.empty(0, np.float32), np.empty(0, np.float32)
+            )
+        else:
+            dets = FrameDetections(
+                boxes.xyxy.cpu().numpy().astype(np.float32) * np.float32(box_scale),
+                boxes.conf.cpu().numpy().astype(np.float32),
+                boxes.cls.cpu().numpy().astype(np.float32),
+            )
+        return self.update(dets, frame_idx, timestamp)
+
+
+def retrack(
+    detections: LoggedDetections,
+    overrides: Optional[Dict[str, Any]] = None,
+    frame_rate: int = TRACKER_FRAME_RATE,
+) -> List[Dict[str, Any]]:
+    """Replay logged detections through ByteTrack and return tracked log records."""
+    tracker = StreamTracker(overrides, frame_rate)
+    fps = detections.fps
+    records: List[Dict[str, Any]] = []
+    for frame_idx, dets in detections.iter_frames():
+        timestamp = frame_idx / fps if fps else None
+        records.extend(tracker.update(dets, frame_idx, timestamp))
+    return records
+
+
+def score_tracks(records: List[Dict[str, Any]], total_frames: int, min_fish: int) -> Dict[str, float]:
+    """Ground-truth-free tracking quality proxies.
+
+    ``id_births`` counts track ids first seen after the first tracked frame,
+    which for a closed tank is dominated by ID switches and re-acquisitions.
+    """
+    if not records:
+        return {"tracks": 0, "id_births": 0, "coverage": 0.0, "mean_track_frames": 0.0}
+    frames = np.fromiter((r["frame"] for r in records), dtype=np.int64, count=len(records))
+    ids = np.fromiter((r["track_id"] for r in records), dtype=np.int64, count=len(records))
+    unique_ids, first_index, lengths = np.unique(ids, return_index=True, return_counts=True)
+    births = int((frames[first_index] > frames.min()).sum())
+    per_frame = np.unique(frames, return_counts=True)[1]
+    complete = int((per_frame >= min_fish).sum())
+    return {
+        "tracks": int(len(unique_ids)),
+        "id_births": births,
+        "coverage": (complete / total_frames) * 100 if total_frames else 0.0,
+        "mean_track_frames": float(lengths.mean()),
+    }
+
+
+_WORKER_DETECTIONS: Optional[LoggedDetections] = None
+
+
+def _init_worker(detections: LoggedDetections) -> None:
+    global _WORKER_DETECTIONS
+    _WORKER_DETECTIONS = detections
+
+
+def _score_config(args: Tuple[Dict[str, Any], int, int, int]) -> Dict[str, Any]:
+    overrides, frame_rate, total_frames, min_fish = args
+    assert _WORKER_DETECTIONS is not None
+    records = retrack(_WORKER_DETECTIONS, overrides, frame_rate)
+    return {**overrides, **score_tracks(records, total_frames, min_fish)}
+
+
+def expand_grid(grid: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*grid.values())]
+
+
+def run_grid(
+    detections: LoggedDetections,
+    grid: Dict[str, Sequence[Any]],
+    min_fish: int,
+    workers: int,
+    frame_rate: int = TRACKER_FRAME_RATE,
+) -> List[Dict[str, Any]]:
+    """Score every tracker configuration of ``grid`` in parallel worker processes."""
+    total_frames = sum(1 for _ in detections.iter_frames())
+    jobs = [(overrides, frame_rate, total_frames, min_fish) for overrides in expand_grid(grid)]
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(detections,)
+    ) as pool:
+        results = list(pool.map(_score_config, jobs))
+    return sorted(results, key=lambda row: (-row["coverage"], row["id_births"]))
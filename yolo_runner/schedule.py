@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import Callable, Iterator, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .frame_cache import FrameCache
+from .video_utils import seek_to_frame
+
+# smoothing of the per-sample cost and the decode cost per frame advanced
+COST_ALPHA = 0.2
+# time constants (frames) of the recent and long-run detection change rate
+FAST_FRAMES = 15
+SLOW_FRAMES = 9000
+# how far activity may pull the stride away from what the budget allows
+MAX_DENSIFY = 2.0
+MAX_THIN = 2.0
+
+
+def change_rate(previous: np.ndarray, current: np.ndarray, gap: int) -> float:
+    """How fast the detections change, per frame.
+
+    Each current box contributes its distance to the nearest previous
+    centre in units of its own size (capped at 1); appearing or vanishing
+    boxes count fully.
+    """
+    if not len(previous) and not len(current):
+        return 0.0
+    if not len(previous) or not len(current):
+        return 1.0 / gap
+    prev_centres = (previous[:, :2] + previous[:, 2:]) / 2
+    centres = (current[:, :2] + current[:, 2:]) / 2
+    sizes = np.maximum((current[:, 2:] - current[:, :2]).mean(axis=1), 1.0)
+    distances = np.linalg.norm(centres[:, None] - prev_centres[None], axis=2).min(axis=1)
+    motion = np.minimum(distances / sizes, 1.0).mean()
+    count = abs(len(current) - len(previous)) / max(len(current), len(previous))
+    return float(motion + count) / gap
+
+
+class StrideSchedule:
+    """Choose the next sampling stride from the time left and how busy the video is.
+
+    After every sample the stride that would spend exactly the remaining
+    budget on the remaining frames is recomputed from the measured cost of
+    a sample (``proc``) and of decoding each frame advanced past (``skip``).
+    It is then scaled by up to ``MAX_DENSIFY``/``MAX_THIN`` depending on how
+    the recent change rate compares to its long-run average. Recomputing
+    from the remaining budget every time pays back busy stretches in calm
+    ones.
+    """
+
+    def __init__(
+        self,
+        start_frame: int,
+        end_frame: int,
+        budget: float,
+        min_stride: int = 1,
+        max_stride: int = 300,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        self.end_frame = end_frame
+        self.budget = budget
+        self.min_stride = max(1, min_stride)
+        self.max_stride = max(self.min_stride, max_stride)
+        self.clock = clock
+        self.stride = self.min_stride
+        self.proc: Optional[float] = None
+        self.skip = 0.0
+        self.fast: Optional[float] = None
+        self.slow: Optional[float] = None
+        self.samples = 0
+        # frames between the last two samples the iterator actually yielded
+        self.last_gap = 0
+        self._yielded: Optional[int] = None
+        self._previous_frame: Optional[int] = None
+        self._previous_boxes = np.zeros((0, 4), dtype=np.float32)
+        self._decode_pending = 0.0
+        self._start_frame = start_frame
+        self._started = clock()
+        self._last_update = self._started
+
+    def record_decode(self, seconds: float, frames: int, frame_idx: int) -> None:
+        """Called by the frame iterator: time spent reaching the sample it yields next.
+
+        ``frame_idx`` is the frame really yielded, which may differ from the
+        last sample plus ``stride`` (e.g. a frame cache only holds every
+        n-th frame), so ``last_gap`` is measured here.
+        """
+        self._decode_pending += seconds
+        if frames > 0:
+            self.skip += COST_ALPHA * (seconds / frames - self.skip)
+        self.last_gap = frame_idx - self._yielded if self._yielded is not None else 0
+        self._yielded = frame_idx
+
+    def update(self, frame_idx: int, result) -> int:
+        """Fold in a processed sample and return the stride to the next one."""
+        now = self.clock()
+        proc = max(now - self._last_update - self._decode_pending, 0.0)
+        self._last_update, self._decode_pending = now, 0.0
+        # the first sample includes model warm-up; it seeds the average anyway
+        self.proc = proc if self.proc is None else self.proc + COST_ALPHA * (proc - self.proc)
+
+        boxes = _result_boxes(result)
+        gap = frame_idx - self._previous_frame if self._previous_frame is not None else 0
+        if gap > 0:
+            rate = change_rate(self._previous_boxes, boxes, gap)
+            self.fast = _decay(self.fast, rate, gap, FAST_FRAMES)
+            self.slow = _decay(self.slow, rate, gap, SLOW_FRAMES)
+        self._previous_frame, self._previous_boxes = frame_idx, boxes
+        self.samples += 1
+
+        self.stride = self._next_stride(frame_idx, now)
+        return self.stride
+
+    def _next_stride(self, frame_idx: int, now: float) -> int:
+        remaining_frames = self.end_frame - frame_idx
+        remaining_time = self.budget - (now - self._started)
+        spare = remaining_time - remaining_frames * self.skip
+        if remaining_frames <= 0 or spare <= 0:
+            return self.max_stride
+        stride = remaining_frames * (self.proc or 0.0) / spare
+        if self.fast is not None and self.slow is not None:
+            # busier than usual -> smaller stride, calmer -> larger
+            eps = 1e-6
+            stride *= float(np.clip((self.slow + eps) / (self.fast + eps), 1 / MAX_DENSIFY, MAX_THIN))
+        return int(np.clip(round(stride), self.min_stride, self.max_stride))
+
+    def summary(self) -> str:
+        elapsed = self.clock() - self._started
+        covered = (self._previous_frame or self._start_frame) - self._start_frame
+        mean = covered / max(self.samples - 1, 1)
+        return (
+            f"Adaptive stride: {self.samples} samples, mean stride {mean:.1f} "
+            f"(range {self.min_stride}-{self.max_stride}), {elapsed:.1f}s of a {self.budget:.1f}s budget"
+        )
+
+
+def _decay(average: Optional[float], value: float, frames: int, time_constant: float) -> float:
+    """Exponential average whose weights decay with video frames, not samples."""
+    if average is None:
+        return value
+    return average + (1 - np.exp(-frames / time_constant)) * (value - average)
+
+
+def _result_boxes(result) -> np.ndarray:
+    boxes = result.boxes
+    if boxes is None or not len(boxes):
+        return np.zeros((0, 4), dtype=np.float32)
+    return boxes.xyxy.cpu().numpy().astype(np.float32)
+
+
+def iter_scheduled_frames(
+    source: Path,
+    schedule: StrideSchedule,
+    start_frame: int,
+    end_frame: Optional[int],
+    frame_cache: Optional[FrameCache] = None,
+    seek_gap: int = 300,
+) -> Iterator[Tuple[int, np.ndarray]]:
+    """Like ``iter_video_frames``, but the step after each frame is ``schedule.stride``.
+
+    The stride is read when the next frame is requested, i.e. after the
+    caller has passed the current sample to ``schedule.update``.
+    """
+    if frame_cache is not None:
+        yield from _iter_scheduled_cache(frame_cache, schedule, start_frame, end_frame)
+        return
+    cap = cv2.VideoCapture(str(source))
+    if not cap.isOpened():
+        raise RuntimeError(f"Could not open video: {source}")
+    if start_frame:
+        seek_to_frame(cap, start_frame)
+    position = target = start_frame
+    try:
+        while end_frame is None or target <= end_frame:
+            began = time.perf_counter()
+            skipped = target - position
+            if skipped > seek_gap:
+                seek_to_frame(cap, target)
+                position = target
+            while position < target:
+                if not cap.grab():
+                    return
+                position += 1
+            ret, frame = cap.read()
+            if not ret:
+                return
+            position += 1
+            schedule.record_decode(time.perf_counter() - began, skipped + 1, target)
+            yield target, frame
+            target += schedule.stride
+    finally:
+        cap.release()
+
+
+def _iter_scheduled_cache(
+    frame_cache: FrameCache,
+    schedule: StrideSchedule,
+    start_frame: int,
+    end_frame: Optional[int],
+) -> Iterator[Tuple[int, np.ndarray]]:
+    meta = frame_cache.meta
+    position = max(0, -(-(start_frame - meta.start_frame) // meta.stride))
+    while position < meta.count:
+        frame_idx = meta.source_frame(position)
+        if end_frame is not None and frame_idx > end_frame:
+            break
+        # skipping cached frames costs nothing; the real gap is a multiple of meta.stride
+        schedule.record_decode(0.0, 0, frame_idx)
+        yield frame_idx, frame_cache.frames[position]
+        position += max(1, round(schedule.stride / meta.stride))
@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+SEQUENCE_COLUMNS = ("frame", "timestamp", "track_id", "confidence", "x1", "y1", "x2", "y2")
+# per-sample features, in shard column order
+FEATURES = ("cx", "cy", "w", "h", "vx", "vy", "confidence")
+BACKGROUND = "none"
+SHARD_ROWS = 1 << 20
+MANIFEST_NAME = "manifest.json"
+WINDOWS_NAME = "windows.npy"
+WINDOW_DTYPE = np.dtype(
+    [
+        ("shard", np.int32),
+        ("offset", np.int64),
+        ("label", np.int16),
+        ("log", np.int32),
+        ("track", np.int64),
+        ("start", np.float64),
+        ("end", np.float64),
+    ]
+)
+
+
+@dataclass
+class LabelIntervals:
+    """``behavior_labels`` rows for one log: ``[start, end]`` times per track (-1: every track)."""
+
+    tracks: np.ndarray
+    starts: np.ndarray
+    ends: np.ndarray
+    classes: np.ndarray
+
+    def label_samples(self, track_id: int, times: np.ndarray) -> np.ndarray:
+        labels = np.zeros(len(times), dtype=np.int16)
+        mine = (self.tracks == track_id) | (self.tracks == -1)
+        for start, end, class_id in zip(self.starts[mine], self.ends[mine], self.classes[mine]):
+            labels[(times >= start) & (times <= end)] = class_id
+        return labels
+
+
+def load_labels(path: Path) -> Tuple[Dict[str, LabelIntervals], List[str]]:
+    """Read a ``behavior_labels`` table (CSV or Parquet).
+
+    Columns: ``log`` (log file name or stem), ``track_id`` (empty for every
+    track), ``start``/``end`` (seconds of the log's ``timestamp``) and an
+    optional ``label`` (default ``feeding``). Class 0 is ``none``.
+    """
+    import pandas as pd
+
+    if not path.exists():
+        raise FileNotFoundError(f"Labels not found: {path}")
+    table = pd.read_parquet(path) if path.suffix.lower() == ".parquet" else pd.read_csv(path)
+    missing = {"log", "start", "end"} - set(table.columns)
+    if missing:
+        raise ValueError(f"{path} is missing columns: {', '.join(sorted(missing))}")
+    if "label" not in table.columns:
+        table["label"] = "feeding"
+    if "track_id" not in table.columns:
+        table["track_id"] = None
+    classes = [BACKGROUND] + sorted(set(table["label"].astype(str)) - {BACKGROUND})
+    class_ids = table["label"].astype(str).map(classes.index).to_numpy(dtype=np.int16)
+    tracks = pd.to_numeric(table["track_id"], errors="coerce").fillna(-1).to_numpy(dtype=np.int64)
+    keys = table["log"].astype(str).map(lambda name: Path(name).stem).to_numpy()
+    intervals = {}
+    for key in np.unique(keys):
+        rows = keys == key
+        intervals[key] = LabelIntervals(
+            tracks[rows],
+            table["start"].to_numpy(dtype=np.float64)[rows],
+            table["end"].to_numpy(dtype=np.float64)[rows],
+            class_ids[rows],
+        )
+    return intervals, classes
+
+
+def track_features(
+    frames: np.ndarray, times: np.ndarray, confidence: np.ndarray, boxes: np.ndarray
+) -> np.ndarray:
+    """``FEATURES`` for one track's samples in frame order, as float32 rows."""
+    cx = (boxes[:, 0] + boxes[:, 2]) / 2
+    cy = (boxes[:, 1] + boxes[:, 3]) / 2
+    dt = np.diff(times, prepend=times[0])
+    dt[dt <= 0] = np.inf
+    features = np.empty((len(frames), len(FEATURES)), dtype=np.float32)
+    features[:, 0] = cx
+    features[:, 1] = cy
+    features[:, 2] = boxes[:, 2] - boxes[:, 0]
+    features[:, 3] = boxes[:, 3] - boxes[:, 1]
+    features[:, 4] = np.diff(cx, prepend=cx[0]) / dt
+    features[:, 5] = np.diff(cy, prepend=cy[0]) / dt
+    features[:, 6] = confidence
+    return features
+
+
+def _read_tracks(path: Path) -> Iterator[Tuple[int, np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+    """``track_id, frames, times, confidence, boxes`` per track of a tracked log."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    parquet = pq.ParquetFile(path)
+    names = parquet.schema_arrow.names
+    if "track_id" not in names:
+        raise ValueError(f"{path} has no track ids; run retrack_detections.py first.")
+    table = pq.read_table(path, columns=[name for name in SEQUENCE_COLUMNS if name in names])
+    table = table.filter(table.column("track_id").is_valid())
+    if not table.num_rows:
+        return
+    frames = table.column("frame").to_numpy().astype(np.int64)
+    tracks = table.column("track_id").cast(pa.int64()).to_numpy()
+    if "timestamp" in names and not pa.types.is_null(table.column("timestamp").type):
+        times = table.column("timestamp").cast(pa.float64()).fill_null(np.nan).to_numpy()
+    else:
+        times = np.full(len(frames), np.nan)
+    if np.isnan(times).any():
+        # logs without timestamps are labelled and differentiated in frames
+        times = frames.astype(np.float64)
+    confidence = table.column("confidence").cast(pa.float32()).to_numpy()
+    boxes = np.stack(
+        [table.column(name).cast(pa.float32()).to_numpy() for name in ("x1", "y1", "x2", "y2")],
+        axis=1,
+    )
+    order = np.lexsort((frames, tracks))
+    tracks = tracks[order]
+    starts = np.flatnonzero(np.r_[True, tracks[1:] != tracks[:-1]])
+    for start, stop in zip(starts, np.r_[starts[1:], len(tracks)]):
+        rows = order[start:stop]
+        yield int(tracks[start]), frames[rows], times[rows], confidence[rows], boxes[rows]
+
+
+class ShardWriter:
+    """Append per-track sequences to float32 ``.npy`` shards of about ``shard_rows`` rows.
+
+    A track never straddles two shards, so every window is one contiguous
+    slice of one file.
+    """
+
+    def __init__(self, output: Path, shard_rows: int = SHARD_ROWS) -> None:
+        self.output = output
+        self.shard_rows = shard_rows
+        self.shards: List[str] = []
+        self._pending: List[np.ndarray] = []
+        self._rows = 0
+
+    def append(self, features: np.ndarray) -> Tuple[int, int]:
+        """Queue ``features``; returns ``(shard, offset)`` of its first row."""
+        if self._rows and self._rows + len(features) > self.shard_rows:
+            self.flush()
+        location = len(self.shards), self._rows
+        self._pending.append(features)
+        self._rows += len(features)
+        return location
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        name = f"shard_{len(self.shards):05d}.npy"
+        np.save(self.output / name, np.concatenate(self._pending))
+        self.shards.append(name)
+        self._pending, self._rows = [], 0
+
+
+def build_shards(
+    log_paths: Sequence[Path],
+    labels_path: Path,
+    output: Path,
+    window: int,
+    stride: int,
+    shard_rows: int = SHARD_ROWS,
+) -> Dict[str, object]:
+    """Turn tracked logs into sequence shards plus a window index; returns the manifest.
+
+    Each window is ``window`` consecutive samples of one track, taking the
+    label of its centre sample. Tracks shorter than ``window`` are skipped.
+    """
+    if window < 1 or stride < 1:
+        raise ValueError("window and stride must be positive")
+    intervals, classes = load_labels(labels_path)
+    output.mkdir(parents=True, exist_ok=True)
+    writer = ShardWriter(output, shard_rows)
+    windows: List[np.ndarray] = []
+    no_labels = LabelIntervals(*(np.zeros(0, dtype=dtype) for dtype in (np.int64, float, float, np.int16)))
+    for log_index, path in enumerate(log_paths):
+        log_labels = intervals.get(path.stem, no_labels)
+        for track_id, frames, times, confidence, boxes in _read_tracks(path):
+            if len(frames) < window:
+                continue
+            shard, offset = writer.append(track_features(frames, times, confidence, boxes))
+            starts = np.arange(0, len(frames) - window + 1, stride)
+            entries = np.zeros(len(starts), dtype=WINDOW_DTYPE)
+            entries["shard"] = shard
+            entries["offset"] = offset + starts
+            entries["label"] = log_labels.label_samples(track_id, times[starts + window // 2])
+            entries["log"] = log_index
+            entries["track"] = track_id
+            entries["start"] = times[starts]
+            entries["end"] = times[starts + window - 1]
+            windows.append(entries)
+    writer.flush()
+    index = np.concatenate(windows) if windows else np.zeros(0, dtype=WINDOW_DTYPE)
+    np.save(output / WINDOWS_NAME, index)
+    manifest = {
+        "features": list(FEATURES),
+        "window": window,
+        "stride": stride,
+        "classes": classes,
+        "shards": writer.shards,
+        "logs": [str(path) for path in log_paths],
+        "windows": int(len(index)),
+        "class_counts": np.bincount(index["label"], minlength=len(classes)).tolist(),
+    }
+    (output / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2))
+    return manifest
+
+
+class SequenceWindows:
+    """Map-style dataset of ``(sequence, label)`` windows read straight from the shards.
+
+    ``sequence`` is a ``(window, len(FEATURES))`` float32 view into a
+    memory-mapped shard, so nothing is decoded or copied until the batch is
+    collated. Shards are mapped lazily in each process, so a
+    ``torch.utils.data.DataLoader`` can use it with any number of workers.
+    """
+
+    def __init__(self, root: Path, indices: Optional[np.ndarray] = None) -> None:
+        manifest_path = root / MANIFEST_NAME
+        if not manifest_path.exists():
+            raise FileNotFoundError(f"No sequence shards in {root}; run build_behavior_shards.py")
+        self.root = root
+        self.manifest = json.loads(manifest_path.read_text())
+        self.window = int(self.manifest["window"])
+        self.classes: List[str] = self.manifest["classes"]
+        windows = np.load(root / WINDOWS_NAME)
+        self.windows = windows if indices is None else windows[indices]
+        self._shards: Dict[int, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.windows)
+
+    def shard(self, index: int) -> np.ndarray:
+        array = self._shards.get(index)
+        if array is None:
+            # copy-on-write: writable views for torch.from_numpy, the file is never modified
+            array = np.load(self.root / self.manifest["shards"][index], mmap_mode="c")
+            self._shards[index] = array
+        return array
+
+    def __getitem__(self, item: int) -> Tuple[np.ndarray, int]:
+        entry = self.windows[item]
+        offset = int(entry["offset"])
+        return self.shard(int(entry["shard"]))[offset : offset + self.window], int(entry["label"])
+
+    def split(self, val_logs: Sequence[int]) -> Tuple["SequenceWindows", "SequenceWindows"]:
+        """Train/validation datasets holding out whole logs (by manifest log index)."""
+        held_out = np.isin(self.windows["log"], list(val_logs))
+        return (
+            SequenceWindows(self.root, np.flatnonzero(~held_out)),
+            SequenceWindows(self.root, np.flatnonzero(held_out)),
+        )
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_shards"] = {}
+        return state
+
+
+class ShardBatchSampler:
+    """Shuffled batches that each read from a single shard.
+
+    Shard order and window order within a shard are reshuffled every
+    epoch, so batches stay random while a worker's reads stay within one
+    mapped file. Pass it as ``DataLoader(dataset, batch_sampler=...)``.
+    """
+
+    def __init__(
+        self,
+        dataset: SequenceWindows,
+        batch_size: int,
+        shuffle: bool = True,
+        drop_last: bool = False,
+        seed: int = 0,
+    ) -> None:
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.seed = seed
+        self.epoch = 0
+        shards = dataset.windows["shard"]
+        order = np.argsort(shards, kind="stable")
+        bounds = np.flatnonzero(np.r_[True, shards[order][1:] != shards[order][:-1], True])
+        self.groups = [order[start:stop] for start, stop in zip(bounds[:-1], bounds[1:])]
+
+    def set_epoch(self, epoch: int) -> None:
+        self.epoch = epoch
+
+    def _batches(self) -> List[np.ndarray]:
+        rng = np.random.default_rng((self.seed, self.epoch))
+        batches = []
+        for group in self.groups:
+            if self.shuffle:
+                group = rng.permutation(group)
+            for start in range(0, len(group), self.batch_size):
+                batch = group[start : start + self.batch_size]
+                if len(batch) == self.batch_size or not self.drop_last:
+                    batches.append(batch)
+        if self.shuffle:
+            rng.shuffle(batches)
+        return batches
+
+    def __iter__(self) -> Iterator[List[int]]:
+        for batch in self._batches():
+            yield batch.tolist()
+
+    def __len__(self) -> int:
+        if self.drop_last:
+            return sum(len(group) // self.batch_size for group in self.groups)
+        return sum(-(-len(group) // self.batch_size) for group in self.groups)
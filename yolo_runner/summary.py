@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import json
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .raw_cache import file_fingerprint
+
+SUMMARY_VERSION = 1
+SUMMARY_SUFFIX = ".summary.json"
+
+
+@dataclass
+class FrameCoverage:
+    """How many frames of a log had 0, 1, 2... unique fish (``histogram[count] = frames``)."""
+
+    path: Optional[Path]
+    histogram: Dict[int, int] = field(default_factory=dict)
+    counted: str = "tracks"
+    rows: int = 0
+    tracks: int = 0
+
+    @property
+    def frames(self) -> int:
+        return sum(self.histogram.values())
+
+    def complete(self, min_fish: int) -> int:
+        return sum(frames for count, frames in self.histogram.items() if count >= min_fish)
+
+    def coverage(self, min_fish: int) -> float:
+        total = self.frames
+        return self.complete(min_fish) / total * 100 if total else 0.0
+
+    @classmethod
+    def from_counts(cls, path: Optional[Path], counts, counted: str, rows: int) -> "FrameCoverage":
+        """Build from a per-frame count Series (``analyze_detections.frame_counts``)."""
+        histogram = {int(count): int(frames) for count, frames in counts.value_counts().items()}
+        return cls(path=path, histogram=histogram, counted=counted, rows=rows)
+
+    @classmethod
+    def combine(cls, parts: Sequence["FrameCoverage"]) -> "FrameCoverage":
+        """Sum per-file coverages; frames of different logs never coincide.
+
+        Counts of tracks, classes and raw detections are different units, so
+        parts must all count the same thing.
+        """
+        counted = {part.counted for part in parts}
+        if len(counted) > 1:
+            raise ValueError(f"Cannot combine coverages counting {', '.join(sorted(counted))}.")
+        histogram: Dict[int, int] = {}
+        for part in parts:
+            for count, frames in part.histogram.items():
+                histogram[count] = histogram.get(count, 0) + frames
+        return cls(
+            path=None,
+            histogram=histogram,
+            counted=counted.pop() if counted else "tracks",
+            rows=sum(part.rows for part in parts),
+            tracks=sum(part.tracks for part in parts),
+        )
+
+
+@dataclass
+class LogSummary:
+    """Compact per-log aggregates stored next to the log as ``<log>.summary.json``.
+
+    ``log_size``/``log_mtime``/``log_hash`` describe the Parquet file the
+    summary was computed from; ``tracks`` maps track id to
+    ``[first_frame, last_frame, rows]``.
+    """
+
+    rows: int
+    counted: str
+    histogram: Dict[int, int]
+    frame_range: Optional[Tuple[int, int]] = None
+    time_range: Optional[Tuple[float, float]] = None
+    tracks: Dict[int, List[int]] = field(default_factory=dict)
+    log_size: int = 0
+    log_mtime: float = 0.0
+    log_hash: str = ""
+    version: int = SUMMARY_VERSION
+
+    def coverage(self, path: Optional[Path]) -> FrameCoverage:
+        return FrameCoverage(
+            path=path,
+            histogram=dict(self.histogram),
+            counted=self.counted,
+            rows=self.rows,
+            tracks=len(self.tracks),
+        )
+
+
+class SummaryBuilder:
+    """Fold log rows into a ``LogSummary``; every call must contain whole frames."""
+
+    def __init__(self) -> None:
+        self.track_hist = np.zeros(0, dtype=np.int64)
+        self.class_hist = np.zeros(0, dtype=np.int64)
+        self.tracks: Dict[int, List[int]] = {}
+        self.frame_range: Optional[Tuple[int, int]] = None
+        self.time_range: Optional[Tuple[float, float]] = None
+        self.rows = 0
+
+    def add(
+        self,
+        frames: np.ndarray,
+        tracks: np.ndarray,
+        valid: np.ndarray,
+        classes: np.ndarray,
+        timestamps: np.ndarray,
+    ) -> None:
+        if not len(frames):
+            return
+        self.rows += len(frames)
+        unique_frames = _distinct(np.sort(frames))
+        self.track_hist = _add_hist(
+            self.track_hist, _per_frame_unique(unique_frames, frames[valid], tracks[valid])
+        )
+        self.class_hist = _add_hist(self.class_hist, _per_frame_unique(unique_frames, frames, classes))
+        self.frame_range = _widen(self.frame_range, int(unique_frames[0]), int(unique_frames[-1]))
+        if len(timestamps) and not np.isnan(timestamps).all():
+            self.time_range = _widen(
+                self.time_range, float(np.nanmin(timestamps)), float(np.nanmax(timestamps))
+            )
+        if valid.any():
+            self._add_tracks(frames[valid], tracks[valid])
+
+    def _add_tracks(self, frames: np.ndarray, tracks: np.ndarray) -> None:
+        order = np.argsort(tracks, kind="stable")
+        tracks, frames = tracks[order], frames[order]
+        starts = np.flatnonzero(np.r_[True, tracks[1:] != tracks[:-1]])
+        firsts = np.minimum.reduceat(frames, starts)
+        lasts = np.maximum.reduceat(frames, starts)
+        sizes = np.diff(np.r_[starts, len(tracks)])
+        for track_id, first, last, size in zip(
+            tracks[starts].tolist(), firsts.tolist(), lasts.tolist(), sizes.tolist()
+        ):
+            entry = self.tracks.get(track_id)
+            if entry is None:
+                self.tracks[track_id] = [first, last, size]
+            else:
+                entry[0] = min(entry[0], first)
+                entry[1] = max(entry[1], last)
+                entry[2] += size
+
+    def build(self) -> LogSummary:
+        # tracked logs count unique ids per frame, untracked logs unique classes
+        hist, counted = (self.track_hist, "tracks") if self.tracks else (self.class_hist, "classes")
+        return LogSummary(
+            rows=self.rows,
+            counted=counted,
+            histogram={count: int(frames) for count, frames in enumerate(hist) if frames},
+            frame_range=self.frame_range,
+            time_range=self.time_range,
+            tracks=self.tracks,
+        )
+
+
+def summarize_frame(df) -> LogSummary:
+    """Summarise an in-memory log DataFrame (``DetectionLogger`` rows)."""
+    import pandas as pd
+
+    builder = SummaryBuilder()
+    track_ids = pd.to_numeric(df["track_id"], errors="coerce")
+    valid = track_ids.notna().to_numpy()
+    builder.add(
+        df["frame"].to_numpy(dtype=np.int64),
+        track_ids.fillna(0).to_numpy(dtype=np.int64),
+        valid,
+        df["class_id"].to_numpy(dtype=np.int64),
+        pd.to_numeric(df["timestamp"], errors="coerce").to_numpy(dtype=np.float64),
+    )
+    return builder.build()
+
+
+def summary_path(log_path: Path) -> Path:
+    return log_path.with_name(log_path.name + SUMMARY_SUFFIX)
+
+
+def write_summary(log_path: Path, summary: LogSummary) -> Path:
+    """Stamp ``summary`` with the log's size/mtime/hash and store it as a sidecar."""
+    stat = log_path.stat()
+    summary.log_size = stat.st_size
+    summary.log_mtime = stat.st_mtime
+    summary.log_hash = file_fingerprint(log_path, full=True)
+    destination = summary_path(log_path)
+    payload = asdict(summary)
+    payload["histogram"] = {str(count): frames for count, frames in summary.histogram.items()}
+    payload["tracks"] = {str(track): entry for track, entry in summary.tracks.items()}
+    _write_payload(destination, payload)
+    return destination
+
+
+def _write_payload(destination: Path, payload: dict) -> None:
+    temp = destination.with_name(destination.name + ".tmp")
+    temp.write_text(json.dumps(payload))
+    temp.replace(destination)
+
+
+def load_summary(log_path: Path) -> Optional[LogSummary]:
+    """Return the sidecar summary if it still describes ``log_path``.
+
+    A matching size and mtime is trusted as is; when only the mtime moved
+    (copies, restores) the content hash decides.
+    """
+    sidecar = summary_path(log_path)
+    try:
+        payload = json.loads(sidecar.read_text())
+    except (OSError, ValueError):
+        return None
+    if payload.get("version") != SUMMARY_VERSION:
+        return None
+    stat = log_path.stat()
+    if payload["log_size"] != stat.st_size:
+        return None
+    if payload["log_mtime"] != stat.st_mtime:
+        if payload["log_hash"] != file_fingerprint(log_path, full=True):
+            return None
+        # same content under a new mtime: remember it so the hash is not recomputed
+        payload["log_mtime"] = stat.st_mtime
+        try:
+            _write_payload(sidecar, payload)
+        except OSError:
+            pass
+    payload["histogram"] = {int(count): frames for count, frames in payload["histogram"].items()}
+    payload["tracks"] = {int(track): entry for track, entry in payload["tracks"].items()}
+    for key in ("frame_range", "time_range"):
+        if payload[key] is not None:
+            payload[key] = tuple(payload[key])
+    return LogSummary(**payload)
+
+
+def _widen(bounds: Optional[Tuple], low, high) -> Tuple:
+    if bounds is None:
+        return low, high
+    return min(bounds[0], low), max(bounds[1], high)
+
+
+def _per_frame_unique(unique_frames: np.ndarray, frames: np.ndarray, keys: np.ndarray) -> np.ndarray:
+    """Histogram of distinct ``keys`` per frame over ``unique_frames`` (frames with none count 0)."""
+    if not len(frames):
+        return np.bincount(np.zeros(len(unique_frames), dtype=np.int64))
+    # one int64 code per (frame, key) pair; both ranges are small
+    low = keys.min()
+    span = int(keys.max() - low) + 1
+    codes = _distinct(np.sort(np.searchsorted(unique_frames, frames) * span + (keys - low)))
+    per_frame = np.bincount(codes // span, minlength=len(unique_frames))
+    return np.bincount(per_frame)
+
+
+def _distinct(values: np.ndarray) -> np.ndarray:
+    """Unique values of an already sorted array (cheaper than ``np.unique``)."""
+    if not len(values):
+        return values
+    keep = np.empty(len(values), dtype=bool)
+    keep[0] = True
+    np.not_equal(values[1:], values[:-1], out=keep[1:])
+    return values[keep]
+
+
+def _add_hist(total: np.ndarray, part: np.ndarray) -> np.ndarray:
+    if len(part) > len(total):
+        total, part = part, total
+    total = total.copy()
+    total[: len(part)] += part
+    return total
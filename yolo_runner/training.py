@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import MethodType
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+IMAGE_CACHE_VERSION = 1
+
+
+def file_key(path: Path) -> str:
+    stat = path.stat()
+    return f"{path.resolve()}|{stat.st_size}|{stat.st_mtime_ns}"
+
+
+def dataset_hash(keys: Sequence[str], imgsz: int) -> str:
+    """Changes whenever an image is added, removed, replaced or touched, or imgsz changes."""
+    digest = hashlib.sha1(f"{IMAGE_CACHE_VERSION}|{imgsz}".encode())
+    for key in sorted(keys):
+        digest.update(key.encode())
+    return digest.hexdigest()
+
+
+def resize_long_side(image: np.ndarray, imgsz: int) -> np.ndarray:
+    """Same long-side resize ultralytics applies in ``BaseDataset.load_image(rect_mode=True)``."""
+    h0, w0 = image.shape[:2]
+    ratio = imgsz / max(h0, w0)
+    if ratio != 1:
+        size = (min(math.ceil(w0 * ratio), imgsz), min(math.ceil(h0 * ratio), imgsz))
+        image = cv2.resize(image, size, interpolation=cv2.INTER_LINEAR)
+    return image
+
+
+class ImageCache:
+    """Decoded, resized training images in one memory-mapped ``.npy`` file.
+
+    Every image occupies a fixed ``imgsz x imgsz`` slot, top-left aligned
+    with zero padding, so slot ``i`` is a plain offset into the file.
+    ``shapes[i]`` holds the original and resized ``(h, w)``. The memmap is
+    opened lazily so dataloader workers each map the file themselves.
+    """
+
+    def __init__(self, path: Path, index: Dict[str, int], shapes: np.ndarray) -> None:
+        self.path = path
+        self.index = index
+        self.shapes = shapes
+        self._images: Optional[np.ndarray] = None
+
+    @property
+    def images(self) -> np.ndarray:
+        if self._images is None:
+            self._images = np.load(self.path, mmap_mode="r")
+        return self._images
+
+    def get(self, image_file: str) -> Optional[Tuple[np.ndarray, Tuple[int, int], Tuple[int, int]]]:
+        slot = self.index.get(image_file)
+        if slot is None:
+            return None
+        h0, w0, h, w = self.shapes[slot].tolist()
+        # copy: augmentations (e.g. HSV) write into the returned array
+        return np.array(self.images[slot, :h, :w]), (h0, w0), (h, w)
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_images"] = None
+        return state
+
+
+def open_or_build_image_cache(
+    cache_dir: Path, image_files: Sequence[str], imgsz: int, split: str, workers: int = 8
+) -> ImageCache:
+    """Reuse the cache for this exact image set, or build it (copying slots from the last one)."""
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    files = [Path(name) for name in image_files]
+    keys = [file_key(path) for path in files]
+    digest = dataset_hash(keys, imgsz)[:16]
+    path = cache_dir / f"{split}_{imgsz}_{digest}.npy"
+    meta_path = path.with_suffix(".json")
+    if path.exists() and meta_path.exists():
+        meta = json.loads(meta_path.read_text())
+        print(f"Using image cache {path} ({len(files)} images)")
+        return ImageCache(path, {name: slot for slot, name in enumerate(meta["files"])}, np.array(meta["shapes"]))
+
+    previous = _previous_cache(cache_dir, split, imgsz, exclude=path)
+    images = np.lib.format.open_memmap(
+        path.with_suffix(".tmp.npy"), mode="w+", dtype=np.uint8, shape=(len(files), imgsz, imgsz, 3)
+    )
+    shapes = np.zeros((len(files), 4), dtype=np.int64)
+    reused = _copy_previous(previous, keys, images, shapes)
+
+    def fill(slot: int) -> None:
+        image = cv2.imread(str(files[slot]))
+        if image is None:
+            raise FileNotFoundError(f"Image Not Found {files[slot]}")
+        resized = resize_long_side(image, imgsz)
+        h, w = resized.shape[:2]
+        images[slot, :h, :w] = resized
+        shapes[slot] = (*image.shape[:2], h, w)
+
+    todo = [slot for slot in range(len(files)) if slot not in reused]
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        list(pool.map(fill, todo))
+    images.flush()
+    del images
+    path.with_suffix(".tmp.npy").replace(path)
+    meta_path.write_text(
+        json.dumps({"files": list(image_files), "keys": keys, "shapes": shapes.tolist(), "imgsz": imgsz})
+    )
+    if previous is not None:
+        for stale in (previous, previous.with_suffix(".json")):
+            stale.unlink(missing_ok=True)
+    print(
+        f"Built image cache {path}: {len(todo)} images decoded, {len(reused)} reused "
+        f"({path.stat().st_size / (1 << 20):.0f} MB)"
+    )
+    return ImageCache(path, {name: slot for slot, name in enumerate(image_files)}, shapes)
+
+
+def _previous_cache(cache_dir: Path, split: str, imgsz: int, exclude: Path) -> Optional[Path]:
+    candidates = [
+        candidate
+        for candidate in cache_dir.glob(f"{split}_{imgsz}_*.npy")
+        if candidate != exclude
+        and not candidate.name.endswith(".tmp.npy")
+        and candidate.with_suffix(".json").exists()
+    ]
+    return max(candidates, key=lambda candidate: candidate.stat().st_mtime, default=None)
+
+
+def _copy_previous(
+    previous: Optional[Path], keys: List[str], images: np.ndarray, shapes: np.ndarray
+) -> set:
+    """Copy unchanged images out of an older cache instead of decoding them again."""
+    if previous is None:
+        return set()
+    meta = json.loads(previous.with_suffix(".json").read_text())
+    old_slots = {key: slot for slot, key in enumerate(meta["keys"])}
+    old_images = np.load(previous, mmap_mode="r")
+    reused = set()
+    for slot, key in enumerate(keys):
+        old = old_slots.get(key)
+        if old is None:
+            continue
+        images[slot] = old_images[old]
+        shapes[slot] = meta["shapes"][old]
+        reused.add(slot)
+    return reused
+
+
+def _load_cached_image(dataset, i: int, rect_mode: bool = True, resize_short: bool = False):
+    """``load_image`` replacement that reads from the memmap and keeps the mosaic buffer filled."""
+    cached = dataset.image_cache.get(dataset.im_files[i]) if rect_mode and not resize_short else None
+    if cached is None:
+        return type(dataset).load_image(dataset, i, rect_mode, resize_short)
+    if dataset.augment:
+        dataset.buffer.append(i)
+        if 1 < len(dataset.buffer) >= dataset.max_buffer_length:
+            dataset.buffer.pop(0)
+    return cached
+
+
+def attach_image_cache(dataset, cache: ImageCache) -> None:
+    dataset.image_cache = cache
+    dataset.load_image = MethodType(_load_cached_image, dataset)
+
+
+def cached_detection_trainer(cache_dir: Path):
+    """A ``DetectionTrainer`` whose datasets read images from an ``ImageCache``."""
+    from ultralytics.models.yolo.detect import DetectionTrainer
+
+    class CachedDetectionTrainer(DetectionTrainer):
+        def build_dataset(self, img_path, mode="train", batch=None):
+            dataset = super().build_dataset(img_path, mode, batch)
+            cache = open_or_build_image_cache(
+                cache_dir, dataset.im_files, dataset.imgsz, split=mode, workers=self.args.workers
+            )
+            attach_image_cache(dataset, cache)
+            return dataset
+
+    return CachedDetectionTrainer
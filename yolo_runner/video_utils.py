@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Iterable, Iterator, Optional, Tuple
 
 import cv2
 
@@ -15,6 +15,16 @@ def read_fps(source: Path) -> float:
     return fps
 
 
+def read_frame_count(source: Path) -> int:
+    """Container frame count (0 when the container does not report one)."""
+    cap = cv2.VideoCapture(str(source))
+    if not cap.isOpened():
+        raise RuntimeError(f"Could not open video: {source}")
+    count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+    cap.release()
+    return max(count, 0)
+
+
 def compute_frame_bounds(
     fps: float, start_seconds: float, end_seconds: Optional[float]
 ) -> Tuple[int, Optional[int]]:
@@ -30,3 +40,66 @@ def compute_frame_bounds(
 def seek_to_frame(cap: cv2.VideoCapture, frame_idx: int) -> None:
     if frame_idx > 0:
         cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+
+
+def iter_frames_at(
+    source: Path, frame_indices: Iterable[int], seek_gap: int = 300
+) -> Iterator[Tuple[int, "cv2.typing.MatLike"]]:
+    """Yield ``(frame_idx, frame)`` for the requested frames in one forward pass.
+
+    Indices are de-duplicated and sorted. Short gaps are skipped with
+    ``cap.grab()`` (no colour conversion); gaps longer than ``seek_gap`` frames
+    fall back to a seek so sparse selections over long videos stay cheap.
+    """
+    wanted = sorted({int(idx) for idx in frame_indices if idx >= 0})
+    if not wanted:
+        return
+    cap = cv2.VideoCapture(str(source))
+    if not cap.isOpened():
+        raise RuntimeError(f"Could not open video: {source}")
+    position = 0
+    try:
+        for target in wanted:
+            if target - position > seek_gap:
+                seek_to_frame(cap, target)
+                position = target
+            while position < target:
+                if not cap.grab():
+                    return
+                position += 1
+            ret, frame = cap.read()
+            if not ret:
+                return
+            position += 1
+            yield target, frame
+    finally:
+        cap.release()
+
+
+def iter_video_frames(
+    source: Path, stride: int, start_frame: int, end_frame: Optional[int]
+) -> Iterator[Tuple[int, "cv2.typing.MatLike"]]:
+    """Yield ``(frame_idx, frame)`` every ``stride`` frames between the bounds."""
+    cap = cv2.VideoCapture(str(source))
+    if not cap.isOpened():
+        raise RuntimeError(f"Could not open video: {source}")
+
+    if start_frame:
+        seek_to_frame(cap, start_frame)
+
+    frame_idx = start_frame
+    try:
+        while True:
+            if end_frame is not None and frame_idx > end_frame:
+                break
+
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield frame_idx, frame
+
+            frame_idx += stride
+            if stride > 1:
+                seek_to_frame(cap, frame_idx)
+    finally:
+        cap.release()
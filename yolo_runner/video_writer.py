@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import queue
+from datetime import datetime
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+
+RING_SLOTS = 32
+# shared memory the ring may use; large frames get fewer slots
+RING_BYTES = 64 << 20
+MIN_RING_SLOTS = 2
+FOURCC = "mp4v"
+# how long to wait on the encoder before checking that it is still alive
+WAIT_SECONDS = 1.0
+START_TIMEOUT = 30.0
+
+
+def resolve_video_path(destination: Path) -> Path:
+    if destination.suffix:
+        return destination
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return destination / f"annotated_{timestamp}.mp4"
+
+
+def ring_slots(shape: Tuple[int, int, int], max_slots: int, ring_bytes: int) -> int:
+    """Slots that fit in ``ring_bytes``, between ``MIN_RING_SLOTS`` and ``max_slots``."""
+    frame_bytes = int(np.prod(shape))
+    return max(MIN_RING_SLOTS, min(max_slots, ring_bytes // frame_bytes))
+
+
+def probe_writer(path: Path, fps: float) -> None:
+    """Fail before the first frame if OpenCV cannot encode ``path`` (e.g. an unknown suffix)."""
+    import cv2
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    existed = path.exists()
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*FOURCC), fps, (64, 64))
+    opened = writer.isOpened()
+    writer.release()
+    if not existed:
+        path.unlink(missing_ok=True)
+    if not opened:
+        raise RuntimeError(f"Could not open a {FOURCC} video writer for {path}")
+
+
+def _writer_process(
+    shm_name: str,
+    shape: Tuple[int, int, int],
+    slots: int,
+    path: str,
+    fps: float,
+    filled,
+    free,
+    status,
+) -> None:
+    import cv2
+
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*FOURCC), fps, (shape[1], shape[0]))
+    if not writer.isOpened():
+        status.put(f"Could not open a {FOURCC} video writer for {path}")
+        return
+    status.put(None)
+    shm = SharedMemory(name=shm_name)
+    ring = np.ndarray((slots, *shape), dtype=np.uint8, buffer=shm.buf)
+    try:
+        while True:
+            item = filled.get()
+            if item is None:
+                break
+            slot, repeat = item
+            for _ in range(repeat):
+                writer.write(ring[slot])
+            free.put(slot)
+    finally:
+        writer.release()
+        del ring
+        shm.close()
+
+
+class AsyncVideoWriter:
+    """Encode annotated frames in a separate process.
+
+    Frames are copied into a shared-memory ring and only the slot index
+    crosses the process boundary, so encoding overlaps with inference. The
+    ring holds at most ``slots`` frames and ``ring_bytes`` bytes. When every
+    slot is still in use, ``drop_when_full`` writers (live sources) drop and
+    count the frame; otherwise ``write`` waits for the encoder to free a slot
+    so file exports stay complete. Encoder failures raise ``RuntimeError``.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        fps: float,
+        slots: int = RING_SLOTS,
+        drop_when_full: bool = False,
+        ring_bytes: int = RING_BYTES,
+    ) -> None:
+        self.path = resolve_video_path(path)
+        self.fps = fps or 30.0
+        self.slots = slots
+        self.ring_bytes = ring_bytes
+        self.drop_when_full = drop_when_full
+        probe_writer(self.path, self.fps)
+        self.written = 0
+        self.dropped = 0
+        self._shape: Optional[Tuple[int, int, int]] = None
+        self._shm: Optional[SharedMemory] = None
+        self._ring: Optional[np.ndarray] = None
+        self._process = None
+        self._filled = None
+        self._free = None
+
+    def _start(self, shape: Tuple[int, int, int]) -> None:
+        context = get_context("spawn")
+        self._shape = shape
+        self.slots = ring_slots(shape, self.slots, self.ring_bytes)
+        self._shm = SharedMemory(create=True, size=int(np.prod(shape)) * self.slots)
+        self._ring = np.ndarray((self.slots, *shape), dtype=np.uint8, buffer=self._shm.buf)
+        self._filled = context.Queue()
+        self._free = context.Queue()
+        status = context.Queue()
+        for slot in range(self.slots):
+            self._free.put(slot)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._process = context.Process(
+            target=_writer_process,
+            args=(
+                self._shm.name,
+                shape,
+                self.slots,
+                str(self.path),
+                self.fps,
+                self._filled,
+                self._free,
+                status,
+            ),
+            name="video-writer",
+            daemon=True,
+        )
+        self._process.start()
+        error = self._wait_started(status)
+        if error is not None:
+            self._process.join()
+            self._release()
+            raise RuntimeError(error)
+
+    def _wait_started(self, status) -> Optional[str]:
+        """``None`` once the encoder opened the output, else why it could not."""
+        waited = 0.0
+        while waited < START_TIMEOUT:
+            try:
+                return status.get(timeout=WAIT_SECONDS)
+            except queue.Empty:
+                waited += WAIT_SECONDS
+                if not self._process.is_alive():
+                    return f"Video writer exited with code {self._process.exitcode}"
+        self._process.terminate()
+        return f"Video writer did not start within {START_TIMEOUT:.0f}s"
+
+    def _next_free_slot(self) -> int:
+        while True:
+            try:
+                return self._free.get(timeout=WAIT_SECONDS)
+            except queue.Empty:
+                if not self._process.is_alive():
+                    exitcode = self._process.exitcode
+                    self._release()
+                    raise RuntimeError(
+                        f"Video writer exited with code {exitcode}; {self.path} is incomplete"
+                    ) from None
+
+    def _release(self) -> None:
+        self._ring = None
+        self._shm.close()
+        self._shm.unlink()
+        self._process = None
+
+    def write(self, frame: np.ndarray, repeat: int = 1) -> None:
+        """Queue ``frame``; ``repeat`` > 1 holds it for that many output frames."""
+        if self._shape is None:
+            self._start(frame.shape)
+        if frame.shape != self._shape:
+            raise ValueError(f"Frame shape {frame.shape} differs from {self._shape}")
+        try:
+            slot = self._free.get_nowait()
+        except queue.Empty:
+            if self.drop_when_full:
+                self.dropped += repeat
+                return
+            slot = self._next_free_slot()
+        self._ring[slot] = frame
+        self._filled.put((slot, repeat))
+        self.written += repeat
+
+    def close(self) -> None:
+        if self._process is None:
+            return
+        self._filled.put(None)
+        self._process.join()
+        exitcode = self._process.exitcode
+        self._release()
+        if exitcode:
+            raise RuntimeError(f"Video writer exited with code {exitcode}; {self.path} is incomplete")
+        message = f"Wrote {self.written} annotated frames to {self.path}"
+        if self.dropped:
+            message += f" ({self.dropped} dropped while the encoder was busy)"
+        print(message)
+
+    def __enter__(self) -> "AsyncVideoWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()